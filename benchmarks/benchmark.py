@@ -0,0 +1,825 @@
+from datetime import date, datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import quote, unquote, urlsplit
+import argparse
+import hashlib
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from typing import Iterator
+import numpy as np
+
+ROOT_DIRECTORY:str = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# The modules of the scraper import each other by their flat names.
+sys.path.insert(0, os.path.join(ROOT_DIRECTORY, "scr"))
+
+from data_collector import APPENDED_LAYOUT, COLUMNAR_LAYOUT, DAILY_LAYOUT, DataCollector
+from functions import get_float, get_float_array, get_point_deci
+from http_session import HttpSession, PageNotModified
+from page_parser import parse_pages
+from requests_scraper import BS4_PARSER, LXML_PARSER, RequestsScraper
+from response_cache import CACHE_DIRECTORY, PAGE_SOURCES, REQUESTS_PAGE, RawPages, ResponseCache
+from site_config import CONFIG_CACHE, REQUESTS_METHOD, SELENIUM_METHOD, SiteConfig, load_site_configs
+
+BENCHMARK_GROUP:str = "benchmark"
+BENCHMARK_YEARS:int = 3
+CONFIG_PATH:str = os.path.join(ROOT_DIRECTORY, "data", "webpage_data.csv")
+FIXTURE_DIRECTORY:str = os.path.join(ROOT_DIRECTORY, "data", "benchmark_fixtures")
+CAPTURED_SUFFIX:str = ".html"
+SYNTHETIC_SUFFIX:str = ".synthetic.html"
+FIXTURE_ROWS:dict[str:int] = {"SMARD.DE":24, "finance.yahoo.com":40, "divi Register":17, "dwd":700}
+DEFAULT_FIXTURE_ROWS:int = 100
+RESULTS_PATH:str = os.path.join(ROOT_DIRECTORY, "data", "benchmark_results.jsonl")
+CACHE_PATH:str = os.path.join(ROOT_DIRECTORY, CACHE_DIRECTORY)
+REGRESSION_THRESHOLD:float = 1.2
+STORAGE_CASES:dict[str:tuple[str,dict]] = {"daily": (DAILY_LAYOUT, None),
+                                           "appended gzip": (APPENDED_LAYOUT, None),
+                                           "columnar gzip": (COLUMNAR_LAYOUT, None),
+                                           "columnar gzip no shuffle": (COLUMNAR_LAYOUT, {"shuffle":False}),
+                                           "columnar lzf": (COLUMNAR_LAYOUT, {"compression":"lzf"}),
+                                           "columnar uncompressed": (COLUMNAR_LAYOUT, {"compression":None,
+                                                                                       "shuffle":False})}
+
+def read_wp_data()->dict[str:SiteConfig]:
+    """Reads the configuration of the sites next to the benchmark, wherever it is started from.
+
+    Returns:
+        dict[str, SiteConfig]: The configuration by site name.
+    """
+    return load_site_configs(path=CONFIG_PATH)
+
+def synthetic_snapshot(num_rows:int = 24, num_string_cols:int = 2, num_float_cols:int = 11)->np.array:
+    """Creates a structured array shaped like the output of the scrapers.
+
+    Args:
+        num_rows (int, optional): The number of table rows. Defaults to 24.
+        num_string_cols (int, optional): The number of string columns. Defaults to 2.
+        num_float_cols (int, optional): The number of float columns. Defaults to 11.
+
+    Returns:
+        np.array: The synthetic table data.
+    """
+    data_type = np.dtype([("","S20",(num_string_cols,)),("","f4",(num_float_cols,))])
+    data = np.zeros(num_rows, dtype=data_type)
+    data["f0"] = [[f"row {i} col {j}".encode() for j in range(num_string_cols)] for i in range(num_rows)]
+    data["f1"] = np.random.default_rng(0).random((num_rows, num_float_cols), dtype=np.float32)
+    return data
+
+def fill_collector(data_collector:DataCollector, num_days:int, group_name:str = BENCHMARK_GROUP)->list[date]:
+    """Stores one synthetic snapshot per day for the last num_days days.
+
+    Args:
+        data_collector (DataCollector): The data collector to fill.
+        num_days (int): The number of daily datasets.
+        group_name (str, optional): The group to fill. Defaults to BENCHMARK_GROUP.
+
+    Returns:
+        list[date]: The stored dates.
+    """
+    data = synthetic_snapshot()
+    dates = [date.today() - i*timedelta(days=1) for i in range(num_days)]
+    with data_collector:
+        for day in dates:
+            data_collector.store_data(data=data, group_name=group_name,
+                                      scraping_time=datetime.now(), data_date=day)
+    return dates
+
+def benchmark_session(num_years:int = BENCHMARK_YEARS, num_queries:int = 365)->dict[str:float]:
+    """Compares opening the HDF5 file per call with one session for reads and writes.
+
+    Args:
+        num_years (int, optional): Years of daily datasets in the file. Defaults to BENCHMARK_YEARS.
+        num_queries (int, optional): The number of dates read and written. Defaults to 365.
+
+    Returns:
+        dict[str, float]: The seconds spent by each mode.
+    """
+    results = {}
+    with tempfile.TemporaryDirectory() as directory:
+        data_collector = DataCollector(path=os.path.join(directory, "benchmark.h5"),
+                                       group_names={BENCHMARK_GROUP:"https://example.org"})
+        dates = fill_collector(data_collector=data_collector, num_days=num_years*365)[:num_queries]
+
+        start = time.perf_counter()
+        for day in dates:
+            if data_collector.is_saved_data(BENCHMARK_GROUP, data_date=day):
+                data_collector.get_data(BENCHMARK_GROUP, data_date=day)
+        results["read per call"] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        with data_collector:
+            for day in dates:
+                if data_collector.is_saved_data(BENCHMARK_GROUP, data_date=day):
+                    data_collector.get_data(BENCHMARK_GROUP, data_date=day)
+        results["read session"] = time.perf_counter() - start
+
+        data = synthetic_snapshot()
+        future_dates = [date.today() + (i+1)*timedelta(days=1) for i in range(2*num_queries)]
+
+        start = time.perf_counter()
+        for day in future_dates[:num_queries]:
+            data_collector.store_data(data=data, group_name=BENCHMARK_GROUP,
+                                      scraping_time=datetime.now(), data_date=day)
+        results["write per call"] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        with data_collector:
+            for day in future_dates[num_queries:]:
+                data_collector.store_data(data=data, group_name=BENCHMARK_GROUP,
+                                          scraping_time=datetime.now(), data_date=day)
+        results["write session"] = time.perf_counter() - start
+    return results
+
+def synthetic_history(num_days:int, num_rows:int = 700, num_string_cols:int = 1,
+                      num_float_cols:int = 8)->Iterator[np.array]:
+    """Yields daily snapshots shaped like the output of the scrapers, with values that drift from day to day.
+
+    The row labels stay the same except for a few rows renamed now and then, the values follow a
+    random walk rounded to one decimal like the measurements of the scraped tables.
+
+    Args:
+        num_days (int): The number of snapshots.
+        num_rows (int, optional): The number of table rows. Defaults to 700.
+        num_string_cols (int, optional): The number of string columns. Defaults to 1.
+        num_float_cols (int, optional): The number of float columns. Defaults to 8.
+
+    Yields:
+        np.array: The snapshot of each day.
+    """
+    generator = np.random.default_rng(0)
+    data = synthetic_snapshot(num_rows=num_rows, num_string_cols=num_string_cols, num_float_cols=num_float_cols)
+    values = generator.normal(10, 5, (num_rows, num_float_cols))
+    for day in range(num_days):
+        values += generator.normal(0, 0.5, values.shape)
+        data["f1"] = np.round(values, 1)
+        if day % 90 == 0:
+            data["f0"][generator.integers(num_rows)] = f"renamed {day}".encode()
+        yield data.copy()
+
+def benchmark_storage(num_years:int = BENCHMARK_YEARS)->dict[str:int]:
+    """Compares the bytes on disk of the layouts and filters of DataCollector on a synthetic history.
+
+    Args:
+        num_years (int, optional): Years of daily snapshots. Defaults to BENCHMARK_YEARS.
+
+    Returns:
+        dict[str, int]: The size of the uncompressed snapshots and of the HDF5 file of each case.
+    """
+    num_days = num_years*365
+    results = {"raw snapshots": sum(data.nbytes for data in synthetic_history(num_days=num_days))}
+    with tempfile.TemporaryDirectory() as directory:
+        for case, (layout, filters) in STORAGE_CASES.items():
+            path = os.path.join(directory, f"{case}.h5")
+            data_collector = DataCollector(path=path, group_names={BENCHMARK_GROUP:"https://example.org"},
+                                           layout=layout, filters=filters)
+            with data_collector:
+                for day, data in enumerate(synthetic_history(num_days=num_days)):
+                    data_collector.store_data(data=data, group_name=BENCHMARK_GROUP, scraping_time=datetime.now(),
+                                              data_date=date.today() - (num_days - day)*timedelta(days=1))
+            results[case] = os.path.getsize(path)
+    return results
+
+def benchmark_startup(repeat:int = 5)->dict[str:float]:
+    """Measures the cold start of the entry point and loading the site configurations.
+
+    Every start runs in a new interpreter, so no module is imported before.
+
+    Args:
+        repeat (int, optional): How often each case is run. Defaults to 5.
+
+    Returns:
+        dict[str, float]: The mean seconds of each case.
+    """
+    directory = os.path.join(ROOT_DIRECTORY, "scr")
+    results = {}
+    for case, code in (("interpreter", "pass"), ("import main", "import main"),
+                       ("import main and backends", "import main, collection_engine, data_collector, page_parser, "
+                                                    "requests_scraper, selenium_scraper")):
+        start = time.perf_counter()
+        for _ in range(repeat):
+            subprocess.run([sys.executable, "-c", code], cwd=directory, check=True)
+        results[case] = (time.perf_counter() - start)/repeat
+
+    start = time.perf_counter()
+    for _ in range(repeat):
+        CONFIG_CACHE.clear()
+        read_wp_data()
+    results["site configs parsed"] = (time.perf_counter() - start)/repeat
+    start = time.perf_counter()
+    for _ in range(repeat):
+        read_wp_data()
+    results["site configs cached"] = (time.perf_counter() - start)/repeat
+    return results
+
+def benchmark_deduplication(num_years:int = BENCHMARK_YEARS)->dict[str:float]:
+    """Compares storing a history whose tables do not change over the weekends with and without deduplication.
+
+    Args:
+        num_years (int, optional): Years of daily snapshots. Defaults to BENCHMARK_YEARS.
+
+    Returns:
+        dict[str, float]: The seconds spent writing and the bytes on disk of each case.
+    """
+    num_days = num_years*365
+    snapshots = []
+    for day, data in enumerate(synthetic_history(num_days=num_days)):
+        snapshots.append(data if day % 7 < 5 else snapshots[-1])
+    results = {}
+    with tempfile.TemporaryDirectory() as directory:
+        for layout in (DAILY_LAYOUT, COLUMNAR_LAYOUT):
+            for deduplicate in (False, True):
+                case = f"{layout} {'deduplicated' if deduplicate else 'full'}"
+                path = os.path.join(directory, f"{case}.h5")
+                data_collector = DataCollector(path=path, group_names={BENCHMARK_GROUP:"https://example.org"},
+                                               layout=layout, deduplicate=deduplicate)
+                start = time.perf_counter()
+                with data_collector:
+                    for day, data in enumerate(snapshots):
+                        data_collector.store_data(data=data, group_name=BENCHMARK_GROUP, scraping_time=datetime.now(),
+                                                  data_date=date.today() - (num_days - day)*timedelta(days=1))
+                results[f"{case} write"] = time.perf_counter() - start
+                results[f"{case} bytes"] = os.path.getsize(path)
+    return results
+
+def synthetic_cells(num_cells:int, change_comma:bool)->list[str]:
+    """Creates cell texts as they appear in the scraped tables, including empty and invalid cells.
+
+    Args:
+        num_cells (int): The number of cells.
+        change_comma (bool): Whether the numbers use a decimal comma.
+
+    Returns:
+        list[str]: The cell texts.
+    """
+    values = np.random.default_rng(0).normal(0, 5000, num_cells)
+    pattern = "{:,.2f}"
+    cells = [pattern.format(value) for value in values]
+    if change_comma:
+        cells = [cell.translate(str.maketrans({",":".", ".":","})) for cell in cells]
+    for i in range(0, num_cells, 50):
+        cells[i] = ["", "-", "12 %", "n/a", "3 MW"][(i//50) % 5]
+    return cells
+
+def benchmark_float_parsing(num_cells:int = 100000)->dict[str:float]:
+    """Compares the per cell conversion with get_point_deci and get_float to get_float_array.
+
+    Args:
+        num_cells (int, optional): The number of cells converted. Defaults to 100000.
+
+    Returns:
+        dict[str, float]: The seconds spent by each conversion.
+    """
+    results = {}
+    for change_comma, notation in ((True, "german"), (False, "english")):
+        cells = synthetic_cells(num_cells=num_cells, change_comma=change_comma)
+
+        start = time.perf_counter()
+        values = []
+        for cell in cells:
+            try:
+                values.append(get_float(get_point_deci(cell, change_comma=change_comma)))
+            except ValueError:
+                values.append(None)
+        np.array(values, dtype="f4")
+        results[f"per cell {notation}"] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        get_float_array(texts=cells, change_comma=change_comma)
+        results[f"array {notation}"] = time.perf_counter() - start
+    return results
+
+def synthetic_page(table_name:str, num_rows:int, num_string_cols:int, num_float_cols:int,
+                   is_german:bool = False, page_size:int = 300000, row_headers:bool = False)->bytes:
+    """Creates an HTML page shaped like the configured table pages, padded with navigation and footer markup.
+
+    Args:
+        table_name (str): The class name of the table.
+        num_rows (int): The number of table rows.
+        num_string_cols (int): The number of string columns.
+        num_float_cols (int): The number of float columns.
+        is_german (bool, optional): Whether the numbers use a decimal comma. Defaults to False.
+        page_size (int, optional): The approximate size of the page in bytes. Defaults to 300000.
+        row_headers (bool, optional): Whether the string cells are th cells and no cell is empty, as in
+            the tables read by SeleniumScraper. Defaults to False.
+
+    Returns:
+        bytes: The HTML page.
+    """
+    cells = synthetic_cells(num_cells=num_rows*num_float_cols, change_comma=is_german)
+    if row_headers:
+        cells = [cell or "-" for cell in cells]
+    head = "".join(f"<th><span>Column</span> {i}</th>" for i in range(num_string_cols + num_float_cols))
+    rows = []
+    for row in range(num_rows):
+        cell = "th" if row_headers else "td"
+        strings = "".join(f"<{cell}><a href=\"#{row}\">Row {row}</a><span>{i}</span></{cell}>" for i in range(num_string_cols))
+        floats = "".join(f"<td><fin-streamer>{cell}</fin-streamer></td>"
+                         for cell in cells[row*num_float_cols:(row+1)*num_float_cols])
+        rows.append(f"<tr>{strings}{floats}</tr>")
+    table = f"<table class=\"{table_name}\"><thead><tr>{head}</tr></thead><tbody>{''.join(rows)}</tbody></table>"
+    navigation = "<nav><ul>" + "<li><a href=\"#\">Link</a></li>"*200 + "</ul></nav>"
+    footer = "<div class=\"footer\"><p>Lorem ipsum dolor sit amet.</p></div>"
+    footer = footer*max(1, (page_size - len(table) - len(navigation))//len(footer))
+    return f"<html><head><meta charset=\"utf-8\"></head><body>{navigation}{table}{footer}</body></html>".encode()
+
+def benchmark_requests_parsers(wp_data:dict[str:SiteConfig] = None, fixtures:dict[str:bytes] = None,
+                               repeat:int = 5)->dict[str:float]:
+    """Compares the BeautifulSoup and the lxml parser of RequestsScraper on the fixture pages of the requests sites.
+
+    Args:
+        wp_data (dict[str, SiteConfig], optional): The page configurations by group name. Defaults to the configured sites.
+        fixtures (dict[str, bytes], optional): The page of every site. Defaults to site_fixtures.
+        repeat (int, optional): How often each page is parsed. Defaults to 5.
+
+    Raises:
+        ValueError: If the parsers disagree on a page.
+
+    Returns:
+        dict[str, float]: The mean seconds per page of each parser and site.
+    """
+    if wp_data is None:
+        wp_data = read_wp_data()
+    wp_data = {site: data for site, data in wp_data.items() if data.method == REQUESTS_METHOD}
+    if fixtures is None:
+        fixtures = site_fixtures(wp_data=wp_data, response_cache=ResponseCache(directory=CACHE_PATH))
+    synthetic = synthetic_fixtures(wp_data=wp_data)
+    results = {}
+    for site, data in wp_data.items():
+        outputs = {}
+        for parser in (BS4_PARSER, LXML_PARSER):
+            start = time.perf_counter()
+            for _ in range(repeat):
+                table = RequestsScraper.parse_page(content=fixtures[site], table_name=data.table_name, parser=parser)
+                outputs[parser] = (RequestsScraper.get_column_names(table=table, encoding=data.encoding),
+                                   RequestsScraper.get_table_data(table=table, num_string_cols=data.num_str_cols,
+                                                                  num_float_cols=data.num_float_cols,
+                                                                  is_german=data.is_german, encoding=data.encoding))
+            results[f"{site} {parser}"] = (time.perf_counter() - start)/repeat
+        if not all(bs4_output.tobytes() == lxml_output.tobytes()
+                   for bs4_output, lxml_output in zip(outputs[BS4_PARSER], outputs[LXML_PARSER])):
+            kind = "synthetic" if site in synthetic else "captured"
+            raise ValueError(f"The parsers disagree on the {kind} fixture page of {site}.")
+    return results
+
+def fixture_path(site:str, directory:str = None, synthetic:bool = False)->str:
+    """Returns the file of the fixture of a site.
+
+    Args:
+        site (str): The group name of the site.
+        directory (str, optional): The directory of the fixtures. Defaults to FIXTURE_DIRECTORY.
+        synthetic (bool, optional): Whether the file of the synthetic fallback is meant. Defaults to False.
+
+    Returns:
+        str: The path.
+    """
+    if directory is None:
+        directory = FIXTURE_DIRECTORY
+    return os.path.join(directory, quote(site, safe="") + (SYNTHETIC_SUFFIX if synthetic else CAPTURED_SUFFIX))
+
+def capture_fixtures(wp_data:dict[str:SiteConfig], response_cache:ResponseCache, directory:str = None)->list[str]:
+    """Saves the latest real page of every configured site in the response cache as its fixture.
+
+    Only pages kept as HTML are captured, the tables extracted by script from Selenium sites are not.
+
+    Args:
+        wp_data (dict[str, SiteConfig]): The page configurations by group name.
+        response_cache (ResponseCache): The cache of a collection run.
+        directory (str, optional): The directory of the fixtures. Defaults to FIXTURE_DIRECTORY.
+
+    Returns:
+        list[str]: The captured sites.
+    """
+    cached = dict(response_cache.entries())
+    captured = []
+    for site in wp_data:
+        if not site in cached:
+            continue
+        kind, pages = response_cache.get(site=site, data_date=cached[site])
+        if not kind in (REQUESTS_PAGE, PAGE_SOURCES):
+            continue
+        path = fixture_path(site=site, directory=directory)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "wb") as file:
+            file.write(pages[0])
+        captured.append(site)
+    return captured
+
+def synthetic_fixtures(wp_data:dict[str:SiteConfig], directory:str = None)->list[str]:
+    """Returns the configured sites without a captured fixture, which are benchmarked on a synthetic page.
+
+    Args:
+        wp_data (dict[str, SiteConfig]): The page configurations by group name.
+        directory (str, optional): The directory of the fixtures. Defaults to FIXTURE_DIRECTORY.
+
+    Returns:
+        list[str]: The sites.
+    """
+    return [site for site in wp_data if not os.path.exists(fixture_path(site=site, directory=directory))]
+
+def site_fixtures(wp_data:dict[str:SiteConfig], directory:str = None,
+                  response_cache:ResponseCache = None)->dict[str:bytes]:
+    """Returns a saved HTML page of every configured site, capturing or generating missing pages first.
+
+    A real page captured from a collection run is used if one is saved, see capture_fixtures.
+    Otherwise it is captured from the response cache if that holds a page of the site. Only
+    without a real page, a synthetic page shaped like the configured table is generated and
+    saved with SYNTHETIC_SUFFIX, see synthetic_fixtures. Once saved, a fixture is reused by every
+    later run, so the results of different commits stay comparable.
+
+    Args:
+        wp_data (dict[str, SiteConfig]): The page configurations by group name.
+        directory (str, optional): The directory of the fixtures. Defaults to FIXTURE_DIRECTORY.
+        response_cache (ResponseCache, optional): The cache real pages are taken from. Defaults to None.
+
+    Returns:
+        dict[str, bytes]: The page of every site.
+    """
+    missing = synthetic_fixtures(wp_data=wp_data, directory=directory)
+    if missing and response_cache is not None:
+        capture_fixtures(wp_data={site: wp_data[site] for site in missing}, response_cache=response_cache,
+                         directory=directory)
+    fixtures = {}
+    for site, data in wp_data.items():
+        path = fixture_path(site=site, directory=directory)
+        if not os.path.exists(path):
+            path = fixture_path(site=site, directory=directory, synthetic=True)
+        if not os.path.exists(path):
+            page = synthetic_page(table_name=data.table_name,
+                                  num_rows=FIXTURE_ROWS.get(site, DEFAULT_FIXTURE_ROWS),
+                                  num_string_cols=data.num_str_cols,
+                                  num_float_cols=data.num_float_cols, is_german=data.is_german,
+                                  row_headers=(data.method == SELENIUM_METHOD))
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "wb") as file:
+                file.write(page)
+        with open(path, "rb") as file:
+            fixtures[site] = file.read()
+    return fixtures
+
+class FixtureServer:
+    """A local HTTP server standing in for the scraped sites, it serves every fixture under its quoted site name.
+
+    The pages are sent with an ETag and conditional requests are answered with 304, like the
+    servers HttpSession talks to. Used as a context manager the server runs in a daemon thread.
+
+    Args:
+        fixtures (dict[str, bytes]): The page of every site.
+    """
+
+    def __init__(self, fixtures:dict[str:bytes]):
+        self.fixtures:dict[str:bytes] = fixtures
+        etags = {site: f"\"{hashlib.sha256(page).hexdigest()[:16]}\"" for site, page in fixtures.items()}
+
+        class Handler(BaseHTTPRequestHandler):
+            """Answers the GET requests of the benchmark."""
+
+            def do_GET(self)->None:
+                site = unquote(urlsplit(self.path).path.lstrip("/"))
+                if not site in fixtures:
+                    self.send_error(404)
+                    return
+                if self.headers.get("If-None-Match") == etags[site]:
+                    self.send_response(304)
+                    self.send_header("ETag", etags[site])
+                    self.end_headers()
+                    return
+                self.send_response(200)
+                self.send_header("Content-Type", "text/html; charset=utf-8")
+                self.send_header("Content-Length", str(len(fixtures[site])))
+                self.send_header("ETag", etags[site])
+                self.end_headers()
+                self.wfile.write(fixtures[site])
+
+            def log_message(self, format:str, *args)->None:
+                pass
+
+        self.__server:ThreadingHTTPServer = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.__thread:threading.Thread = threading.Thread(target=self.__server.serve_forever, daemon=True)
+
+    def __enter__(self)->"FixtureServer":
+        self.__thread.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback)->None:
+        self.__server.shutdown()
+        self.__server.server_close()
+
+    def url(self, site:str)->str:
+        """Returns the URL of the fixture of a site.
+
+        Args:
+            site (str): The group name of the site.
+
+        Returns:
+            str: The URL.
+        """
+        host, port = self.__server.server_address[:2]
+        return f"http://{host}:{port}/{quote(site, safe='')}"
+
+def benchmark_pipeline(wp_data:dict[str:SiteConfig] = None, fixtures:dict[str:bytes] = None,
+                       repeat:int = 5)->dict[str:float]:
+    """Measures fetching, parsing and storing the fixture of every configured site, without network access.
+
+    The pages are fetched from a FixtureServer with HttpSession, first downloaded and then
+    answered with 304 after commit. Selenium sites are parsed as saved page sources.
+
+    Args:
+        wp_data (dict[str, SiteConfig], optional): The page configurations by group name. Defaults to the configured sites.
+        fixtures (dict[str, bytes], optional): The page of every site. Defaults to site_fixtures.
+        repeat (int, optional): How often each stage is run. Defaults to 5.
+
+    Returns:
+        dict[str, float]: The mean seconds of each stage and site, and the parsed rows per second.
+    """
+    if wp_data is None:
+        wp_data = read_wp_data()
+    if fixtures is None:
+        fixtures = site_fixtures(wp_data=wp_data, response_cache=ResponseCache(directory=CACHE_PATH))
+    results = {}
+    with tempfile.TemporaryDirectory() as directory, FixtureServer(fixtures=fixtures) as server:
+        http_session = HttpSession(validators_path=os.path.join(directory, "validators.json"))
+        data_collector = DataCollector(path=os.path.join(directory, "pipeline.h5"), layout=COLUMNAR_LAYOUT,
+                                       group_names={site: server.url(site) for site in wp_data})
+        for site, data in wp_data.items():
+            url = server.url(site)
+            start = time.perf_counter()
+            for _ in range(repeat):
+                raw_pages = RequestsScraper.fetch(name=site, url=url, http_session=http_session)
+            results[f"{site} fetch"] = (time.perf_counter() - start)/repeat
+
+            http_session.commit(url=url)
+            start = time.perf_counter()
+            for _ in range(repeat):
+                try:
+                    RequestsScraper.fetch(name=site, url=url, http_session=http_session)
+                except PageNotModified:
+                    pass
+            results[f"{site} fetch unchanged"] = (time.perf_counter() - start)/repeat
+
+            if data.method != REQUESTS_METHOD:
+                raw_pages = raw_pages._replace(kind=PAGE_SOURCES)
+            start = time.perf_counter()
+            for _ in range(repeat):
+                column_names, table_data = parse_pages(data=data, raw_pages=raw_pages)
+            elapsed = (time.perf_counter() - start)/repeat
+            results[f"{site} parse"] = elapsed
+            results[f"{site} parse rows/s"] = int(table_data.shape[0]/elapsed)
+
+            data_collector.store_column_names(column_names=column_names, group_name=site)
+            start = time.perf_counter()
+            with data_collector:
+                for day in range(repeat):
+                    table_data["f1"] += 1
+                    data_collector.store_data(data=table_data, group_name=site, scraping_time=datetime.now(),
+                                              data_date=date.today() - day*timedelta(days=1))
+            results[f"{site} store"] = (time.perf_counter() - start)/repeat
+        http_session.close()
+    return results
+
+def benchmark_hdf5(num_years:int = BENCHMARK_YEARS, layouts:tuple[str] = (DAILY_LAYOUT, COLUMNAR_LAYOUT))->dict[str:float]:
+    """Measures write and range read throughput on a synthetic multi-year HDF5 file.
+
+    Args:
+        num_years (int, optional): Years of daily snapshots. Defaults to BENCHMARK_YEARS.
+        layouts (tuple[str], optional): The layouts measured. Defaults to the daily and the columnar layout.
+
+    Returns:
+        dict[str, float]: The seconds and the snapshots or rows per second of each case.
+    """
+    num_days = num_years*365
+    snapshots = list(synthetic_history(num_days=num_days))
+    num_rows = sum(snapshot.shape[0] for snapshot in snapshots)
+    first_date = date.today() - num_days*timedelta(days=1)
+    results = {}
+    with tempfile.TemporaryDirectory() as directory:
+        for layout in layouts:
+            data_collector = DataCollector(path=os.path.join(directory, f"{layout}.h5"), layout=layout,
+                                           group_names={BENCHMARK_GROUP:"https://example.org"})
+            start = time.perf_counter()
+            with data_collector:
+                for day, data in enumerate(snapshots):
+                    data_collector.store_data(data=data, group_name=BENCHMARK_GROUP, scraping_time=datetime.now(),
+                                              data_date=first_date + day*timedelta(days=1))
+            elapsed = time.perf_counter() - start
+            results[f"{layout} write"] = elapsed
+            results[f"{layout} write snapshots/s"] = int(num_days/elapsed)
+
+            start = time.perf_counter()
+            read_rows = sum(data.shape[0] for _, data in data_collector.get_range(BENCHMARK_GROUP))
+            elapsed = time.perf_counter() - start
+            results[f"{layout} range read"] = elapsed
+            results[f"{layout} range read rows/s"] = int(read_rows/elapsed)
+
+            start = time.perf_counter()
+            data_collector.get_last_days_group_data(BENCHMARK_GROUP, num_days=30)
+            results[f"{layout} last 30 days"] = time.perf_counter() - start
+    results["rows"] = num_rows
+    return results
+
+def run_suite(num_years:int = BENCHMARK_YEARS)->dict[str:dict[str:float]]:
+    """Runs every benchmark that works offline.
+
+    Args:
+        num_years (int, optional): Years of daily snapshots of the HDF5 benchmarks. Defaults to BENCHMARK_YEARS.
+
+    Returns:
+        dict[str, dict[str, float]]: The results by benchmark title.
+    """
+    return {"Startup": benchmark_startup(),
+            "Pipeline": benchmark_pipeline(),
+            "Float parsing": benchmark_float_parsing(),
+            "Requests parsers": benchmark_requests_parsers(),
+            "HDF5 throughput": benchmark_hdf5(num_years=num_years),
+            "DataCollector session": benchmark_session(num_years=num_years),
+            "Bytes on disk": benchmark_storage(num_years=num_years),
+            "Deduplication": benchmark_deduplication(num_years=num_years)}
+
+def git_revision()->tuple[str,bool]:
+    """Returns the checked out commit and whether the working tree has changes.
+
+    Returns:
+        tuple[str, bool]: The commit hash, None outside of a git repository, and True for a dirty tree.
+    """
+    try:
+        commit = subprocess.run(["git", "rev-parse", "HEAD"], cwd=ROOT_DIRECTORY, capture_output=True, text=True,
+                                check=True).stdout.strip()
+        status = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], cwd=ROOT_DIRECTORY,
+                                capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None, False
+    return commit, bool(status)
+
+def save_results(suite:dict[str:dict[str:float]], path:str = None, synthetic:list[str] = None)->None:
+    """Appends the results of a run with its commit to the JSON lines file of all runs.
+
+    Args:
+        suite (dict[str, dict[str, float]]): The results by benchmark title.
+        path (str, optional): The results file. Defaults to RESULTS_PATH.
+        synthetic (list[str], optional): The sites benchmarked on a synthetic fixture. Defaults to None.
+    """
+    if path is None:
+        path = RESULTS_PATH
+    commit, dirty = git_revision()
+    record = {"commit": commit, "dirty": dirty, "time": datetime.now().isoformat(),
+              "python": platform.python_version(), "machine": platform.node(), "results": suite,
+              "synthetic_fixtures": synthetic or []}
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, "a", encoding="utf-8") as file:
+        file.write(json.dumps(record) + "\n")
+
+def load_results(path:str = None)->list[dict]:
+    """Reads all stored runs.
+
+    Args:
+        path (str, optional): The results file. Defaults to RESULTS_PATH.
+
+    Returns:
+        list[dict]: The runs in the order they were stored.
+    """
+    if path is None:
+        path = RESULTS_PATH
+    if not os.path.exists(path):
+        return []
+    with open(path, encoding="utf-8") as file:
+        return [json.loads(line) for line in file if line.strip()]
+
+def compare_results(suite:dict[str:dict[str:float]], baseline:dict[str:dict[str:float]],
+                    threshold:float = REGRESSION_THRESHOLD)->list[str]:
+    """Finds the cases of a run that are worse than a baseline run by more than a threshold.
+
+    Seconds and bytes are better when lower, cases ending with "/s" are better when higher.
+
+    Args:
+        suite (dict[str, dict[str, float]]): The results by benchmark title.
+        baseline (dict[str, dict[str, float]]): The results of the baseline run.
+        threshold (float, optional): The ratio a case may get worse by. Defaults to REGRESSION_THRESHOLD.
+
+    Returns:
+        list[str]: A description of every regression.
+    """
+    regressions = []
+    for title, results in suite.items():
+        for case, value in results.items():
+            old_value = baseline.get(title, {}).get(case)
+            if not old_value or not value:
+                continue
+            ratio = old_value/value if case.endswith("/s") else value/old_value
+            if ratio > threshold:
+                regressions.append(f"{title}: {case} is {ratio:.2f} times worse ({old_value} -> {value})")
+    return regressions
+
+def count_round_trips(driver:"WebDriver")->dict[str:int]:
+    """Counts every WebDriver command sent by a driver and its elements.
+
+    Args:
+        driver (WebDriver): The driver to observe.
+
+    Returns:
+        dict[str, int]: The counter, its "calls" are updated by every command.
+    """
+    counter = {"calls":0}
+    execute = driver.execute
+
+    def counting_execute(*args, **kwargs):
+        counter["calls"] += 1
+        return execute(*args, **kwargs)
+
+    driver.execute = counting_execute
+    return counter
+
+def benchmark_table_extraction(url:str, table_name:str, is_german:bool, encoding:str = "UTF-8",
+                               cockie_handler:str = None)->dict[str:float]:
+    """Compares the per element table extraction of SeleniumScraper with the bulk extraction.
+
+    Both paths read the first table page of a live page, so Chrome and a network connection are needed.
+
+    Args:
+        url (str): The URL of the page.
+        table_name (str): The class name of the table.
+        is_german (bool): Whether the data is in German format.
+        encoding (str, optional): The encoding of the data. Defaults to "UTF-8".
+        cockie_handler (str, optional): The handler for cookie acceptance. Defaults to None.
+
+    Returns:
+        dict[str, float]: The seconds and WebDriver round trips of each path.
+    """
+    from selenium_scraper import SeleniumScraper
+    results = {}
+    driver = SeleniumScraper.get_driver(url=url, cockie_handler=cockie_handler)
+    try:
+        counter = count_round_trips(driver=driver)
+        start = time.perf_counter()
+        SeleniumScraper.get_column_names(driver=driver, table_name=table_name, encoding=encoding)
+        SeleniumScraper.get_table_data(driver=driver, table_name=table_name, is_german=is_german,
+                                       change_page_handler=None, encoding=encoding)
+        results["per element"] = time.perf_counter() - start
+        results["per element round trips"] = counter["calls"]
+
+        counter["calls"] = 0
+        start = time.perf_counter()
+        SeleniumScraper.get_table_bulk(driver=driver, table_name=table_name, is_german=is_german,
+                                       change_page_handler=None, encoding=encoding)
+        results["bulk"] = time.perf_counter() - start
+        results["bulk round trips"] = counter["calls"]
+    finally:
+        driver.quit()
+    return results
+
+def print_results(title:str, results:dict[str:float])->None:
+    """Prints the results of a benchmark.
+
+    Args:
+        title (str): The name of the benchmark.
+        results (dict[str, float]): The seconds spent by each case, integers are printed as counts.
+    """
+    print(title)
+    for case, value in results.items():
+        if isinstance(value, int):
+            print(f"    {case:<40}{value:>12d}")
+        else:
+            print(f"    {case:<40}{value*1000:>12.2f} ms")
+
+
+def main()->None:
+    """Runs the offline benchmark suite, optionally stores the results and compares them with an earlier commit."""
+    parser = argparse.ArgumentParser(prog="benchmark", description="Benchmarks the scrape, parse and store path offline.")
+    parser.add_argument("--years", type=int, default=BENCHMARK_YEARS,
+                        help="years of daily snapshots in the synthetic HDF5 files")
+    parser.add_argument("--save", action="store_true", help=f"append the results to {RESULTS_PATH}")
+    parser.add_argument("--compare", metavar="COMMIT", nargs="?", const="",
+                        help="compare with the last stored run, or with the last stored run of COMMIT")
+    parser.add_argument("--capture", action="store_true",
+                        help="save the latest cached page of every site as its fixture first")
+    args = parser.parse_args()
+
+    if args.capture:
+        captured = capture_fixtures(wp_data=read_wp_data(), response_cache=ResponseCache(directory=CACHE_PATH))
+        print(f"Captured the fixtures of {captured}.")
+    suite = run_suite(num_years=args.years)
+    for title, results in suite.items():
+        print_results(title, results)
+    synthetic = synthetic_fixtures(wp_data=read_wp_data())
+    if synthetic:
+        print(f"Synthetic fixtures, run a collection and --capture for real pages: {synthetic}")
+
+    if args.compare is not None:
+        runs = [run for run in load_results() if (run["commit"] or "").startswith(args.compare)]
+        if not runs:
+            print("No stored run to compare with.")
+        else:
+            print(f"Compared with {runs[-1]['commit']} of {runs[-1]['time']}:")
+            for regression in compare_results(suite=suite, baseline=runs[-1]["results"]):
+                print(f"    {regression}")
+    if args.save:
+        save_results(suite=suite, synthetic=synthetic)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,181 @@
+from concurrent.futures import Executor
+from datetime import date, datetime
+import asyncio
+import aiohttp
+import numpy as np
+from functions import get_start_end_time
+from requests_scraper import RequestsScraper
+from site_config import REQUESTS_METHOD, SiteConfig
+from scraper import Scraper
+
+LIMIT:int = 100
+LIMIT_PER_HOST:int = 4
+TIMEOUT:float = 10
+
+class AsyncRequestsScraper(Scraper):
+    """An asynchronous variant of RequestsScraper for fetching many table pages concurrently.
+
+    The page is downloaded with aiohttp and the CPU-bound parsing of RequestsScraper runs in an
+    executor, so the event loop keeps downloading while pages are parsed. Instances are created
+    with the coroutine create(), the constructor only holds the results.
+
+    Args:
+        name (str): The name of the scraped webpage.
+        column_names (np.array): The column names of the data.
+        data_array (np.array): The data collected from the webpage.
+        scraping_time (datetime): The time when the data was scraped.
+
+    Attributes:
+        name (str): The name of the scraped webpage.
+        scraping_time (datetime.datetime): The time when the data was scraped.
+        column_names (np.array): The column names of the data as a numpy array.
+        data_array (np.array): The data collected from the webpage as a numpy array.
+    """
+
+    def __init__(self, name:str, column_names:np.array, data_array:np.array, scraping_time:datetime):
+        self.__name:str = name
+        self.__column_names:np.array = column_names
+        self.__data_array:np.array = data_array
+        self.__scraping_time:datetime = scraping_time
+
+    @classmethod
+    async def create(cls, session:aiohttp.ClientSession, name:str, url:str, table_class_name:str, is_german:bool,
+                     num_string_cols:int, num_float_cols:int, encoding:str = None, parser:str = None,
+                     executor:Executor = None)->"AsyncRequestsScraper":
+        """Downloads and parses a table page.
+
+        Args:
+            session (aiohttp.ClientSession): The session to download the page with.
+            name (str): The name of the scraped webpage.
+            url (str): The URL to scrape data from.
+            table_class_name (str): The class name of the table to scrape.
+            is_german (bool): Whether the data is in German format (affects number parsing).
+            num_string_cols (int): The number of string columns in the table.
+            num_float_cols (int): The number of float columns in the table.
+            encoding (str, optional): The encoding of the data. Defaults to None.
+            parser (str, optional): The parser of RequestsScraper. Defaults to None.
+            executor (Executor, optional): The executor the page is parsed in. Defaults to the loop's default executor.
+
+        Raises:
+            aiohttp.ClientError: If the page could not be downloaded.
+            asyncio.TimeoutError: If the download timed out.
+
+        Returns:
+            AsyncRequestsScraper: The scraper holding the results.
+        """
+        if encoding is None:
+            encoding = "UTF-8"
+        content = await cls.get_table(session=session, url=url)
+        scraping_time = datetime.now()
+        column_names, data_array = await asyncio.get_running_loop().run_in_executor(
+            executor, cls.get_table_data, content, table_class_name, num_string_cols, num_float_cols,
+            is_german, encoding, parser)
+        return cls(name=name, column_names=column_names, data_array=data_array, scraping_time=scraping_time)
+
+    @property
+    def name(self)->str:
+        return self.__name
+
+    @property
+    def column_names(self)->np.array:
+        return self.__column_names
+
+    @property
+    def data_array(self)->np.array:
+        return self.__data_array
+
+    @property
+    def scraping_time(self)->datetime:
+        return self.__scraping_time
+
+    @staticmethod
+    async def get_table(session:aiohttp.ClientSession, url:str)->bytes:
+        """Downloads the webpage holding the table.
+
+        Args:
+            session (aiohttp.ClientSession): The session to download the page with.
+            url (str): The URL of the webpage.
+
+        Raises:
+            aiohttp.ClientResponseError: If the server answers with an error code.
+
+        Returns:
+            bytes: The content of the webpage.
+        """
+        async with session.get(url) as response:
+            response.raise_for_status()
+            return await response.read()
+
+    @staticmethod
+    def get_column_names(content:bytes, table_name:str, encoding:str, parser:str = None)->np.array:
+        """Retrieves the column names from the table of a downloaded page.
+
+        Args:
+            content (bytes): The content of the webpage.
+            table_name (str): The class name of the table.
+            encoding (str): The encoding of the data.
+            parser (str, optional): The parser of RequestsScraper. Defaults to None.
+
+        Returns:
+            np.array: The column names.
+        """
+        table = RequestsScraper.parse_page(content=content, table_name=table_name, parser=parser)
+        return RequestsScraper.get_column_names(table=table, encoding=encoding)
+
+    @staticmethod
+    def get_table_data(content:bytes, table_name:str, num_string_cols:int, num_float_cols:int, is_german:bool,
+                       encoding:str, parser:str = None)->tuple[np.array]:
+        """Parses the column names and the data from the table of a downloaded page.
+
+        Args:
+            content (bytes): The content of the webpage.
+            table_name (str): The class name of the table.
+            num_string_cols (int): The number of string columns in the table.
+            num_float_cols (int): The number of float columns in the table.
+            is_german (bool): Whether the data is in German format.
+            encoding (str): The encoding of the data.
+            parser (str, optional): The parser of RequestsScraper. Defaults to None.
+
+        Returns:
+            tuple[np.array]: The column names and the table data.
+        """
+        return RequestsScraper.parse_content(content=content, table_name=table_name, num_string_cols=num_string_cols,
+                                             num_float_cols=num_float_cols, is_german=is_german, encoding=encoding,
+                                             parser=parser)
+
+async def scrape_pages(wp_data:dict[str:SiteConfig], limit:int = None, limit_per_host:int = None,
+                       executor:Executor = None, day:date = None)->dict[str:AsyncRequestsScraper|BaseException]:
+    """Scrapes all Requests pages of the given sites concurrently from one event loop, Selenium sites are skipped.
+
+    Args:
+        wp_data (dict[str, SiteConfig]): The page configurations by group name.
+        limit (int, optional): The maximal number of open connections. Defaults to LIMIT.
+        limit_per_host (int, optional): The maximal number of open connections per host. Defaults to LIMIT_PER_HOST.
+        executor (Executor, optional): The executor the pages are parsed in. Defaults to the loop's default executor.
+        day (date, optional): The day whose time range fills the URLs, see SiteConfig.url_for. Defaults to today.
+
+    Returns:
+        dict[str, AsyncRequestsScraper|BaseException]: The scraper or the raised exception by group name
+            of every Requests site.
+    """
+    wp_data = {key: data for key, data in wp_data.items() if data.method == REQUESTS_METHOD}
+    start, end = get_start_end_time(day)
+    if limit is None:
+        limit = LIMIT
+    if limit_per_host is None:
+        limit_per_host = LIMIT_PER_HOST
+    connector = aiohttp.TCPConnector(limit=limit, limit_per_host=limit_per_host)
+    timeout = aiohttp.ClientTimeout(total=None, sock_connect=TIMEOUT, sock_read=TIMEOUT)
+    async with aiohttp.ClientSession(connector=connector, timeout=timeout) as session:
+        results = await asyncio.gather(*(AsyncRequestsScraper.create(session=session, name=data.name,
+                                                                     url=data.url_for(start=start, end=end),
+                                                                     table_class_name=data.table_name,
+                                                                     is_german=data.is_german,
+                                                                     num_string_cols=data.num_str_cols,
+                                                                     num_float_cols=data.num_float_cols,
+                                                                     encoding=data.encoding,
+                                                                     parser=data.parser,
+                                                                     executor=executor)
+                                         for data in wp_data.values()),
+                                       return_exceptions=True)
+    return dict(zip(wp_data.keys(), results))
@@ -0,0 +1,215 @@
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from contextlib import contextmanager
+from datetime import date, datetime, timedelta
+from typing import Callable, Iterator
+from urllib.parse import urlsplit
+import threading
+import time
+import numpy as np
+from data_collector import DataCollector
+from page_parser import parse_pool as process_pool
+from response_cache import RawPages
+from site_config import SiteConfig
+
+MAX_WORKERS:int = 8
+MAX_PER_HOST:int = 2
+MIN_HOST_INTERVAL:float = 1.0
+BATCH_SIZE:int = 32
+
+class HostLimiter:
+    """Limits the requests sent to each host, however many sites or days share it.
+
+    At most max_per_host requests run at the same time and two requests to the same host
+    start at least min_interval seconds apart.
+
+    Args:
+        max_per_host (int, optional): The maximal number of concurrent requests per host. Defaults to MAX_PER_HOST.
+        min_interval (float, optional): The minimal seconds between two request starts per host. Defaults to MIN_HOST_INTERVAL.
+    """
+
+    def __init__(self, max_per_host:int = None, min_interval:float = None):
+        if max_per_host is None:
+            max_per_host = MAX_PER_HOST
+        if min_interval is None:
+            min_interval = MIN_HOST_INTERVAL
+        self.__max_per_host:int = max_per_host
+        self.__min_interval:float = min_interval
+        self.__lock:threading.Lock = threading.Lock()
+        self.__slots:dict[str:threading.BoundedSemaphore] = {}
+        self.__next_starts:dict[str:float] = {}
+
+    @contextmanager
+    def slot(self, url:str)->Iterator[None]:
+        """Waits until the host of url may get another request and holds one of its slots in the block.
+
+        Args:
+            url (str): The URL requested in the block.
+        """
+        host = urlsplit(url).hostname or ""
+        with self.__lock:
+            slots = self.__slots.setdefault(host, threading.BoundedSemaphore(self.__max_per_host))
+        with slots:
+            with self.__lock:
+                now = time.monotonic()
+                start = max(now, self.__next_starts.get(host, now))
+                self.__next_starts[host] = start + self.__min_interval
+            time.sleep(start - now)
+            yield
+
+def is_backfillable(data:SiteConfig)->bool:
+    """Checks whether a site serves past data, i.e. its URL has the START and END placeholders.
+
+    Args:
+        data (SiteConfig): The site configuration.
+
+    Returns:
+        bool: True if the URL can be pointed at a past day.
+    """
+    return len(data.url_parts) > 1
+
+def missing_dates(wp_data:dict[str:SiteConfig], data_collector:DataCollector, start:date,
+                  end:date)->list[tuple[str,date]]:
+    """Returns the site and date of every day from start to end a backfillable site has no data for.
+
+    Args:
+        wp_data (dict[str, SiteConfig]): The site configurations by group name.
+        data_collector (DataCollector): The data collector the data is stored in.
+        start (date): The first day.
+        end (date): The last day, included.
+
+    Raises:
+        ValueError: If end is before start.
+
+    Returns:
+        list[tuple[str, date]]: The group names and dates, day by day.
+    """
+    if end < start:
+        raise ValueError(f"The backfill ends on {end} before it starts on {start}.")
+    days = [start + i*timedelta(days=1) for i in range((end - start).days + 1)]
+    missing = []
+    with data_collector:
+        for day in days:
+            for key, data in wp_data.items():
+                if not is_backfillable(data):
+                    continue
+                if data_collector.is_saved_columns(group_name=key) \
+                        and data_collector.is_saved_data(group_name=key, data_date=day):
+                    continue
+                missing.append((key, day))
+    return missing
+
+def backfill(wp_data:dict[str:SiteConfig], data_collector:DataCollector,
+             fetch:Callable[...,RawPages|tuple[np.array]],
+             parse:Callable[[SiteConfig,RawPages],tuple[np.array]], start:date, end:date,
+             max_workers:int = None, host_limiter:HostLimiter = None, batch_size:int = None,
+             log:Callable[[str,datetime,bool],None] = None)->int:
+    """Scrapes the days from start to end that are missing for sites with a START/END URL and stores them.
+
+    The jobs of all days and sites are fetched concurrently on a thread pool, the requests to
+    each host are limited by the host limiter. Fetched pages are parsed on a process pool. The
+    results are written by the calling process in batches, each batch in one session of the
+    data collector, instead of opening the HDF5 file for every day. Failed days are logged and
+    stay missing, so running the backfill again retries them.
+
+    Args:
+        wp_data (dict[str, SiteConfig]): The site configurations by group name.
+        data_collector (DataCollector): The data collector the results are stored in.
+        fetch (Callable[..., RawPages|tuple[np.array]]): Fetches a site for a day, called with the
+            configuration and the keyword day. It returns the RawPages, or the column names, data
+            array and scraping time of a page that cannot be parsed separately.
+        parse (Callable[[SiteConfig, RawPages], tuple[np.array]]): Parses RawPages in a worker
+            process into the column names and data array. It must be picklable.
+        start (date): The first day.
+        end (date): The last day, included.
+        max_workers (int, optional): The number of concurrent fetches. Defaults to MAX_WORKERS.
+        host_limiter (HostLimiter, optional): Limits the requests per host. Defaults to a new HostLimiter.
+        batch_size (int, optional): The number of days written in one session. Defaults to BATCH_SIZE.
+        log (Callable[[str, datetime, bool], None], optional): Logs the success or failure of a day. Defaults to None.
+
+    Returns:
+        int: The number of stored days.
+    """
+    if max_workers is None:
+        max_workers = MAX_WORKERS
+    if host_limiter is None:
+        host_limiter = HostLimiter()
+    if batch_size is None:
+        batch_size = BATCH_SIZE
+
+    def fetch_day(data:SiteConfig, day:date)->RawPages|tuple[np.array]:
+        with host_limiter.slot(data.url):
+            return fetch(data, day=day)
+
+    queued = deque(missing_dates(wp_data=wp_data, data_collector=data_collector, start=start, end=end))
+    fetching:dict[Future:tuple[str,date]] = {}
+    parsing:dict[Future:tuple[str,date,datetime]] = {}
+    batch:list[tuple[str,date,np.array,np.array,datetime]] = []
+    stored = 0
+    fetch_pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="backfill")
+    parse_pool = process_pool()
+    try:
+        while queued or fetching or parsing:
+            while queued and len(fetching) + len(parsing) < 2*max_workers:
+                key, day = queued.popleft()
+                fetching[fetch_pool.submit(fetch_day, wp_data[key], day)] = (key, day)
+            done, _ = wait(list(fetching) + list(parsing), return_when=FIRST_COMPLETED)
+            for future in done:
+                if future in fetching:
+                    key, day = fetching.pop(future)
+                    try:
+                        result = future.result()
+                    except Exception:
+                        if log is not None:
+                            log(key, datetime.now(), False)
+                        continue
+                    if isinstance(result, RawPages):
+                        parsing[parse_pool.submit(parse, wp_data[key], result)] = (key, day, result.scraping_time)
+                    else:
+                        batch.append((key, day) + tuple(result))
+                else:
+                    key, day, scraping_time = parsing.pop(future)
+                    try:
+                        column_names, data = future.result()
+                    except Exception:
+                        if log is not None:
+                            log(key, scraping_time, False)
+                        continue
+                    batch.append((key, day, column_names, data, scraping_time))
+            if len(batch) >= batch_size or not (queued or fetching or parsing):
+                stored += store_batch(wp_data=wp_data, data_collector=data_collector, batch=batch, log=log)
+                batch = []
+    finally:
+        fetch_pool.shutdown(wait=False, cancel_futures=True)
+        parse_pool.shutdown(wait=True, cancel_futures=True)
+    return stored
+
+def store_batch(wp_data:dict[str:SiteConfig], data_collector:DataCollector,
+                batch:list[tuple[str,date,np.array,np.array,datetime]],
+                log:Callable[[str,datetime,bool],None] = None)->int:
+    """Writes the results of several days in one session of the data collector.
+
+    Each day is stored at the anchor time of its site's schedule, so sub-daily groups get the
+    bucket of the regular run and not the one of the scraping time.
+
+    Args:
+        wp_data (dict[str, SiteConfig]): The site configurations by group name.
+        data_collector (DataCollector): The data collector the results are stored in.
+        batch (list[tuple[str, date, np.array, np.array, datetime]]): The group name, day, column
+            names, data array and scraping time of every result.
+        log (Callable[[str, datetime, bool], None], optional): Logs the success of a day. Defaults to None.
+
+    Returns:
+        int: The number of stored days.
+    """
+    if not batch:
+        return 0
+    with data_collector:
+        for key, day, column_names, data, scraping_time in batch:
+            if not data_collector.is_saved_columns(group_name=key):
+                data_collector.store_column_names(column_names=column_names, group_name=key)
+            data_collector.store_data(data=data, group_name=key, scraping_time=scraping_time,
+                                      data_date=datetime.combine(day, wp_data[key].schedule.anchor))
+            if log is not None:
+                log(key, scraping_time, True)
+    return len(batch)
@@ -0,0 +1,449 @@
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from datetime import date, datetime
+from typing import Callable
+import heapq
+import time
+import numpy as np
+from data_collector import DataCollector
+from data_writer import DataWriter
+from http_session import PageNotModified
+from metrics import Metrics
+from page_parser import parse_pool as process_pool
+from response_cache import RawPages
+from retry_policy import CircuitBreaker, RetryPolicy
+from site_config import REQUESTS_METHOD, SELENIUM_METHOD, SiteConfig
+
+MAX_REQUESTS_WORKERS:int = 8
+MAX_SELENIUM_WORKERS:int = 2
+MAX_PARSE_BACKLOG:int = 16
+SITE_TIMEOUT:float = 600.0
+POLL_INTERVAL:float = 1.0
+STATISTICS:tuple[str] = ("fetched", "fetch_time", "parsed", "parse_time", "stored", "store_time",
+                         "max_parse_backlog", "back_pressure_time")
+
+class CollectionEngine:
+    """Collects all configured web pages concurrently and writes the results into one DataCollector.
+
+    The pages run through a pipeline of three stages. Pages scraped with Requests are fetched on
+    a thread pool, pages scraped with Selenium on a separate, smaller pool, because every Selenium
+    job holds a browser. Fetched raw pages are parsed on a process pool, so parsing scales with
+    the cores while fetching scales with the connections. Only the thread that calls run() writes
+    into the DataCollector, so the HDF5 file always has a single writer. With a DataWriter the
+    writes are handed to its thread instead, and the pipeline keeps fetching and parsing while a
+    result is written. No further page is fetched while max_parse_backlog pages wait for their
+    parsing.
+
+    A page that was not modified since the last scrape is stored again from its last snapshot.
+    A failed fetch is put back on a schedule of due retries instead of sleeping in its worker,
+    so the pools keep scraping other pages during the backoff. Pages whose circuit breaker is
+    open are skipped for the run.
+
+    A fetch times out site_timeout seconds after its worker started it. Its worker thread cannot
+    be interrupted and stays busy until the fetch returns, so the next pages of the pool wait for
+    a free worker, and their timeouts only start when they run.
+
+    The durations of the stages and the counters of every page are recorded on the Metrics,
+    the fetch of the profile site of the metrics runs under cProfile.
+
+    Args:
+        data_collector (DataCollector): The data collector the results are stored in.
+        fetch (Callable[[SiteConfig], RawPages|tuple[np.array]]): Fetches one configured page and
+            returns its RawPages, or the column names, data array and scraping time of a page
+            that cannot be parsed separately. It raises on failure.
+        log (Callable[[str, datetime, bool], None]): Logs the success or failure of a page.
+        max_requests_workers (int, optional): Size of the Requests pool. Defaults to MAX_REQUESTS_WORKERS.
+        max_selenium_workers (int, optional): Size of the Selenium pool. Defaults to MAX_SELENIUM_WORKERS.
+        site_timeout (float, optional): Seconds a started fetch may take before it is given up. Defaults to SITE_TIMEOUT.
+        retry_policies (dict[str, RetryPolicy], optional): The retry policy by group name, pages
+            without one are not retried. Defaults to None.
+        circuit_breaker (CircuitBreaker, optional): Skips pages that failed on several days since their last success. Defaults to None.
+        parse (Callable[[SiteConfig, RawPages], tuple[tuple[np.array], float, dict[str, dict]]], optional):
+            Parses RawPages in a worker process and returns the column names and data array with the
+            parsing time and the snapshot of the Metrics recorded while parsing. It must be picklable.
+            Defaults to None, then fetch has to return parsed pages.
+        parsed (Callable[[RawPages], None], optional): Called after parsed pages were stored,
+            e.g. to commit their validators. Defaults to None.
+        max_parse_workers (int, optional): Size of the parsing process pool. Defaults to the number of CPUs.
+        max_parse_backlog (int, optional): Fetched pages that may wait for parsing. Defaults to MAX_PARSE_BACKLOG.
+        metrics (Metrics, optional): The metrics the stages of every page are recorded on. Defaults to new Metrics.
+        data_writer (DataWriter, optional): The started writer of the data collector the results are
+            queued on. Defaults to None, then run() writes them itself.
+    """
+
+    def __init__(self, data_collector:DataCollector, fetch:Callable[[SiteConfig],RawPages|tuple[np.array]],
+                 log:Callable[[str,datetime,bool],None], max_requests_workers:int = None,
+                 max_selenium_workers:int = None, site_timeout:float = None,
+                 retry_policies:dict[str:RetryPolicy] = None, circuit_breaker:CircuitBreaker = None,
+                 parse:Callable[[SiteConfig,RawPages],tuple[tuple[np.array],float,dict[str:dict]]] = None,
+                 parsed:Callable[[RawPages],None] = None, max_parse_workers:int = None,
+                 max_parse_backlog:int = None, metrics:Metrics = None, data_writer:DataWriter = None):
+        self.__data_collector:DataCollector = data_collector
+        self.__fetch:Callable[[SiteConfig],RawPages|tuple[np.array]] = fetch
+        self.__log:Callable[[str,datetime,bool],None] = log
+        if max_requests_workers is None:
+            max_requests_workers = MAX_REQUESTS_WORKERS
+        self.__max_requests_workers:int = max_requests_workers
+        if max_selenium_workers is None:
+            max_selenium_workers = MAX_SELENIUM_WORKERS
+        self.__max_selenium_workers:int = max_selenium_workers
+        if site_timeout is None:
+            site_timeout = SITE_TIMEOUT
+        self.__site_timeout:float = site_timeout
+        self.__retry_policies:dict[str:RetryPolicy] = {} if retry_policies is None else retry_policies
+        self.__circuit_breaker:CircuitBreaker = circuit_breaker
+        self.__parse:Callable[[SiteConfig,RawPages],tuple[tuple[np.array],float,dict[str:dict]]] = parse
+        self.__parsed:Callable[[RawPages],None] = parsed
+        self.__max_parse_workers:int = max_parse_workers
+        if max_parse_backlog is None:
+            max_parse_backlog = MAX_PARSE_BACKLOG
+        self.__max_parse_backlog:int = max_parse_backlog
+        if metrics is None:
+            metrics = Metrics()
+        self.__metrics:Metrics = metrics
+        self.__data_writer:DataWriter = data_writer
+        self.__storing:dict[Future:tuple[str,np.array,datetime,float,RawPages]] = {}
+        self.__start_times:dict[Future:list[float]] = {}
+        self.__first_start_times:dict[str:float] = {}
+        self.__attempts:dict[str:int] = {}
+        self.__statistics:dict[str:float] = dict.fromkeys(STATISTICS, 0)
+        self.__paused_since:float = None
+
+    @property
+    def statistics(self)->dict[str:float]:
+        """Returns the counts and the summed seconds of every stage of the last run.
+
+        Returns:
+            dict[str, float]: The fetched, parsed and stored pages with their times, the largest
+                parse backlog and the seconds fetching was paused by it.
+        """
+        return dict(self.__statistics)
+
+    @property
+    def metrics(self)->Metrics:
+        """Returns the metrics the stages of every page are recorded on.
+
+        Returns:
+            Metrics: The metrics.
+        """
+        return self.__metrics
+
+    def run(self, wp_data:dict[str:SiteConfig], data_date:date|datetime)->None:
+        """Scrapes every page of wp_data that is not yet saved for data_date and stores the results.
+
+        Args:
+            wp_data (dict[str, SiteConfig]): The page configurations by group name.
+            data_date (date|datetime): The date the data is stored for, a datetime stores
+                several runs per day in groups with a sub-daily granularity.
+        """
+        self.__start_times = {}
+        self.__first_start_times = {}
+        self.__attempts = {}
+        self.__statistics = dict.fromkeys(STATISTICS, 0)
+        self.__paused_since = None
+        self.__storing = {}
+        fetch_pools = {REQUESTS_METHOD: ThreadPoolExecutor(max_workers=self.__max_requests_workers,
+                                                           thread_name_prefix="requests"),
+                       SELENIUM_METHOD: ThreadPoolExecutor(max_workers=self.__max_selenium_workers,
+                                                           thread_name_prefix="selenium")}
+        parse_pool = None if self.__parse is None else process_pool(max_workers=self.__max_parse_workers)
+        queued:list[str] = []
+        fetching:dict[Future:str] = {}
+        parsing:dict[Future:tuple[str,RawPages]] = {}
+        retries:list[tuple[float,str]] = []
+        try:
+            for key in wp_data:
+                if self.__data_collector.is_saved_columns(group_name=key) \
+                        and self.__data_collector.is_saved_data(key, data_date=data_date):
+                    print(f"{key} is saved in database at {str(data_date)}.")
+                    continue
+                if self.__circuit_breaker is not None and self.__circuit_breaker.is_open(key, day=data_date):
+                    print(f"{key} is skipped after repeated failures.")
+                    continue
+                queued.append(key)
+
+            while queued or fetching or parsing or retries or self.__storing:
+                while retries and retries[0][0] <= time.monotonic():
+                    queued.append(heapq.heappop(retries)[1])
+                self.__submit_fetches(wp_data=wp_data, queued=queued, fetching=fetching, parsing=parsing,
+                                      fetch_pools=fetch_pools)
+                timeout = POLL_INTERVAL
+                if retries:
+                    timeout = min(timeout, max(0.0, retries[0][0] - time.monotonic()))
+                if fetching or parsing or self.__storing:
+                    done, _ = wait(list(fetching) + list(parsing) + list(self.__storing), timeout=timeout,
+                                   return_when=FIRST_COMPLETED)
+                else:
+                    time.sleep(timeout)
+                    done = set()
+                for future in done:
+                    if future in fetching:
+                        key = fetching.pop(future)
+                        self.__fetched(key=key, future=future, data_date=data_date, data=wp_data[key],
+                                       retries=retries, parsing=parsing, parse_pool=parse_pool)
+                    elif future in self.__storing:
+                        self.__stored(future=future, data_date=data_date)
+                    else:
+                        key, raw_pages = parsing.pop(future)
+                        self.__parsed_pages(key=key, future=future, raw_pages=raw_pages, data_date=data_date)
+                self.__drop_timed_out(pending=fetching, data_date=data_date)
+        finally:
+            for pool in fetch_pools.values():
+                pool.shutdown(wait=False, cancel_futures=True)
+            if parse_pool is not None:
+                parse_pool.shutdown(wait=True, cancel_futures=True)
+
+    @staticmethod
+    def __stage(data:SiteConfig)->str:
+        """Returns the fetch pool of a page.
+
+        Args:
+            data (SiteConfig): The page configuration.
+
+        Returns:
+            str: SELENIUM_METHOD or REQUESTS_METHOD.
+        """
+        return SELENIUM_METHOD if data.method == SELENIUM_METHOD else REQUESTS_METHOD
+
+    def __submit_fetches(self, wp_data:dict[str:SiteConfig], queued:list[str], fetching:dict[Future:str],
+                         parsing:dict[Future:tuple[str,RawPages]],
+                         fetch_pools:dict[str:ThreadPoolExecutor])->None:
+        """Starts queued pages while their fetch pool has an idle worker and the parse backlog has room.
+
+        Running fetches count against the backlog, so it never exceeds max_parse_backlog.
+
+        Args:
+            wp_data (dict[str, SiteConfig]): The page configurations by group name.
+            queued (list[str]): The group names of the pages waiting to be fetched.
+            fetching (dict[Future, str]): The running fetch jobs and their group names.
+            parsing (dict[Future, tuple[str, RawPages]]): The parse jobs with group name and pages.
+            fetch_pools (dict[str, ThreadPoolExecutor]): The fetch pools by stage.
+        """
+        free_slots = self.__max_parse_backlog - len(parsing) - len(fetching)
+        if free_slots <= 0:
+            if queued and self.__paused_since is None:
+                self.__paused_since = time.monotonic()
+            return
+        if self.__paused_since is not None:
+            self.__statistics["back_pressure_time"] += time.monotonic() - self.__paused_since
+            self.__paused_since = None
+
+        limits = {REQUESTS_METHOD: self.__max_requests_workers, SELENIUM_METHOD: self.__max_selenium_workers}
+        running = dict.fromkeys(limits, 0)
+        for key in fetching.values():
+            running[self.__stage(wp_data[key])] += 1
+        for key in list(queued):
+            stage = self.__stage(wp_data[key])
+            if running[stage] < limits[stage] and free_slots > 0:
+                queued.remove(key)
+                started = []
+                future = fetch_pools[stage].submit(self.__run_job, key, wp_data[key], started)
+                self.__start_times[future] = started
+                fetching[future] = key
+                running[stage] += 1
+                free_slots -= 1
+
+    def __run_job(self, key:str, data:SiteConfig, started:list[float])->RawPages|tuple[np.array]:
+        """Records the start time of an attempt and fetches the page while its metrics are active.
+
+        Args:
+            key (str): The group name of the page.
+            data (SiteConfig): The page configuration.
+            started (list[float]): Receives the start time of the attempt, the list is kept by its future.
+
+        Returns:
+            RawPages|tuple[np.array]: The raw pages, or the column names, data array, and scraping time.
+        """
+        started.append(time.monotonic())
+        self.__first_start_times.setdefault(key, started[0])
+        self.__attempts[key] = self.__attempts.get(key, 0) + 1
+        with self.__metrics.active(key), self.__metrics.profile(key, "fetch"), self.__metrics.timer(key, "fetch"):
+            return self.__fetch(data)
+
+    def __drop_timed_out(self, pending:dict[Future:str], data_date:date)->None:
+        """Gives up every started page that exceeded the site timeout.
+
+        Jobs still waiting for a worker do not time out. The worker thread of a timed out job
+        cannot be interrupted, its late result is simply discarded.
+
+        Args:
+            pending (dict[Future, str]): The running jobs and their group names.
+            data_date (date): The date the data is stored for.
+        """
+        now = time.monotonic()
+        for future, key in list(pending.items()):
+            started = self.__start_times.get(future)
+            if started and now - started[0] > self.__site_timeout:
+                pending.pop(future)
+                self.__start_times.pop(future)
+                future.cancel()
+                self.__fail(key=key, data_date=data_date)
+
+    def __fetched(self, key:str, future:Future, data_date:date, data:SiteConfig, retries:list[tuple[float,str]],
+                  parsing:dict[Future:tuple[str,RawPages]], parse_pool:ProcessPoolExecutor)->None:
+        """Passes the result of a finished fetch on to the parse stage, or schedules its retry.
+
+        Args:
+            key (str): The group name of the page.
+            future (Future): The finished fetch job.
+            data_date (date): The date the data is stored for.
+            data (SiteConfig): The page configuration.
+            retries (list[tuple[float, str]]): The heap of due times and group names of the retries.
+            parsing (dict[Future, tuple[str, RawPages]]): The parse jobs with group name and pages.
+            parse_pool (ProcessPoolExecutor): The parsing pool, None without a parse stage.
+        """
+        started = self.__start_times.pop(future, None)
+        try:
+            result = future.result()
+        except PageNotModified:
+            self.__store_unchanged(key=key, data_date=data_date)
+            return
+        except Exception as error:
+            policy = self.__retry_policies.get(key)
+            attempt = self.__attempts.get(key, 1)
+            now = time.monotonic()
+            if policy is not None \
+                    and policy.should_retry(attempt, now - self.__first_start_times.get(key, now), error):
+                heapq.heappush(retries, (now + policy.delay(attempt), key))
+                self.__metrics.increment(key, "retries")
+                return
+            self.__fail(key=key, data_date=data_date)
+            return
+        self.__statistics["fetched"] += 1
+        if started:
+            self.__statistics["fetch_time"] += time.monotonic() - started[0]
+
+        if isinstance(result, RawPages):
+            if parse_pool is None:
+                self.__fail(key=key, data_date=data_date)
+                return
+            parsing[parse_pool.submit(self.__parse, data, result)] = (key, result)
+            self.__statistics["max_parse_backlog"] = max(self.__statistics["max_parse_backlog"], len(parsing))
+            return
+        self.__store(key=key, result=result, data_date=data_date)
+
+    def __parsed_pages(self, key:str, future:Future, raw_pages:RawPages, data_date:date)->None:
+        """Stores the result of a finished parse job, parsing errors are not retried.
+
+        Args:
+            key (str): The group name of the page.
+            future (Future): The finished parse job.
+            raw_pages (RawPages): The parsed pages.
+            data_date (date): The date the data is stored for.
+        """
+        try:
+            (column_data, data), parse_time, metrics = future.result()
+        except Exception:
+            self.__fail(key=key, data_date=data_date)
+            return
+        self.__statistics["parsed"] += 1
+        self.__statistics["parse_time"] += parse_time
+        self.__metrics.merge(metrics)
+        self.__metrics.observe(key, "parse", parse_time)
+        self.__store(key=key, result=(column_data, data, raw_pages.scraping_time), data_date=data_date,
+                     raw_pages=raw_pages)
+
+    def __store(self, key:str, result:tuple[np.array], data_date:date, raw_pages:RawPages = None)->None:
+        """Writes a parsed page into the data collector, or queues it on the data writer.
+
+        Args:
+            key (str): The group name of the page.
+            result (tuple[np.array]): The column names, data array, and scraping time.
+            data_date (date): The date the data is stored for.
+            raw_pages (RawPages, optional): The pages the result was parsed from. Defaults to None.
+
+        Raises:
+            ValueError: If the data writer stopped after an error, the run ends instead of waiting for it.
+        """
+        start = time.perf_counter()
+        column_data, data, scraping_time = result
+        if self.__data_writer is not None:
+            if not self.__data_collector.is_saved_columns(group_name=key):
+                self.__data_writer.store_column_names(column_names=column_data, group_name=key)
+            future = self.__data_writer.store_data(data=data, group_name=key, scraping_time=scraping_time,
+                                                   data_date=data_date)
+            self.__storing[future] = (key, data, scraping_time, start, raw_pages)
+            return
+        with self.__metrics.timer(key, "hdf5_write"):
+            if not self.__data_collector.is_saved_columns(group_name=key):
+                self.__data_collector.store_column_names(column_names=column_data, group_name=key)
+            self.__data_collector.store_data(data=data, group_name=key, scraping_time=scraping_time,
+                                             data_date=data_date)
+        self.__stored_page(key=key, data=data, scraping_time=scraping_time, start=start, raw_pages=raw_pages)
+
+    def __stored(self, future:Future, data_date:date)->None:
+        """Handles a write finished by the data writer.
+
+        Args:
+            future (Future): The finished write.
+            data_date (date): The date the data is stored for.
+        """
+        key, data, scraping_time, start, raw_pages = self.__storing.pop(future)
+        try:
+            future.result()
+        except Exception:
+            self.__fail(key=key, data_date=data_date)
+            return
+        self.__metrics.observe(key, "hdf5_write", time.perf_counter() - start)
+        if data is None:
+            self.__log(key, scraping_time, True)
+            if self.__circuit_breaker is not None:
+                self.__circuit_breaker.record_success(key)
+            return
+        self.__stored_page(key=key, data=data, scraping_time=scraping_time, start=start, raw_pages=raw_pages)
+
+    def __stored_page(self, key:str, data:np.array, scraping_time:datetime, start:float,
+                      raw_pages:RawPages = None)->None:
+        """Counts and logs a stored page and hands its raw pages to the parsed callback.
+
+        Args:
+            key (str): The group name of the page.
+            data (np.array): The stored data array.
+            scraping_time (datetime): The time when the data was scraped.
+            start (float): The perf_counter time the store started.
+            raw_pages (RawPages, optional): The pages the data was parsed from. Defaults to None.
+        """
+        self.__metrics.increment(key, "rows_parsed", len(data))
+        self.__statistics["stored"] += 1
+        self.__statistics["store_time"] += time.perf_counter() - start
+        self.__log(key, scraping_time, True)
+        if self.__circuit_breaker is not None:
+            self.__circuit_breaker.record_success(key)
+        if raw_pages is not None and self.__parsed is not None:
+            self.__parsed(raw_pages)
+
+    def __fail(self, key:str, data_date:date)->None:
+        """Logs a page that failed for good and counts the failure for its circuit breaker.
+
+        Args:
+            key (str): The group name of the page.
+            data_date (date): The date the data is stored for.
+        """
+        self.__log(key, datetime.now(), False)
+        self.__metrics.increment(key, "failures")
+        if self.__circuit_breaker is not None:
+            self.__circuit_breaker.record_failure(key, day=data_date)
+
+    def __store_unchanged(self, key:str, data_date:date)->None:
+        """Stores the last snapshot of an unchanged page again for data_date.
+
+        Args:
+            key (str): The group name of the page.
+            data_date (date): The date the data is stored for.
+        """
+        try:
+            _, data = self.__data_collector.get_latest(group_name=key, end=data_date)
+        except ValueError:
+            self.__fail(key=key, data_date=data_date)
+            return
+        if self.__data_writer is not None:
+            future = self.__data_writer.store_data(data=data, group_name=key, scraping_time=datetime.now(),
+                                                   data_date=data_date)
+            # The unchanged snapshot is not counted as stored data, see __stored.
+            self.__storing[future] = (key, None, datetime.now(), time.perf_counter(), None)
+            return
+        with self.__metrics.timer(key, "hdf5_write"):
+            self.__data_collector.store_data(data=data, group_name=key, scraping_time=datetime.now(),
+                                             data_date=data_date)
+        self.__log(key, datetime.now(), True)
+        if self.__circuit_breaker is not None:
+            self.__circuit_breaker.record_success(key)
@@ -1,5 +1,12 @@
+from bisect import bisect_left, bisect_right
+from contextlib import contextmanager
 from datetime import date, datetime, timedelta
+from typing import Iterator
+import hashlib
+import json
+import os
 import numpy as np
+import threading
 import time
 import h5py
 
@@ -12,6 +19,28 @@ GROUP_NAMES:dict[str:str] = {"SMARD.DE":"https://www.smard.de/",
                             }
 PARENT_NAME:str ="webpages to be informed"
 PATH:str = "data/webpage_data.h5"
+DAILY_LAYOUT:str = "daily"
+APPENDED_LAYOUT:str = "appended"
+COLUMNAR_LAYOUT:str = "columnar"
+LAYOUTS:tuple[str] = (DAILY_LAYOUT, APPENDED_LAYOUT, COLUMNAR_LAYOUT)
+INDEX_NAMES:tuple[str] = ("timestamps", "offsets", "lengths", "scraping_times", "content_hashes")
+COLUMNAR_NAMES:tuple[str] = ("labels", "label_codes", "values")
+RESERVED_NAMES:tuple[str] = ("column_names", "index")
+CHUNK_ROWS:int = 1024
+COMPRESSION:str = "gzip"
+COMPRESSIONS:tuple[str] = ("gzip", "lzf", None)
+FILTERS:dict[str:any] = {"compression": COMPRESSION, "compression_opts": 4, "shuffle": True}
+DAILY_GRANULARITY:int = 86400
+MINUTE_GRANULARITY:int = 60
+SWMR_SUPERBLOCK:int = 3
+RANGE_BATCH:int = 16
+MIGRATION_SUFFIX:str = ".migration"
+RETIRED_SUFFIX:str = ".retired"
+AGGREGATIONS:dict[str:callable] = {"mean": lambda values: np.nanmean(values, axis=0),
+                                   "min": lambda values: np.nanmin(values, axis=0),
+                                   "max": lambda values: np.nanmax(values, axis=0),
+                                   "first": lambda values: values[0],
+                                   "last": lambda values: values[-1]}
 
 class DataCollector:
     """
@@ -21,9 +50,60 @@ class DataCollector:
         path (str, optional): The path to the HDF5 file. Defaults to PATH.
         parent_name (str, optional): The name of the parent group in the HDF5 file. Defaults to PARENT_NAME.
         group_names (dict[str, str], optional): A dictionary of group names and their URLs. Defaults to GROUP_NAMES.
+        layout (str, optional): The storage layout of newly created groups. Defaults to DAILY_LAYOUT.
+        granularity (int, optional): The seconds of the time buckets snapshots of newly created
+            groups are keyed by. Defaults to DAILY_GRANULARITY.
+        filters (dict[str, any], optional): The HDF5 filters of the data of newly created groups in
+            the APPENDED_LAYOUT or COLUMNAR_LAYOUT, "compression" ("gzip", "lzf" or None),
+            "compression_opts" (the gzip level) and "shuffle". Defaults to FILTERS.
+        deduplicate (bool, optional): Whether a snapshot identical to the previous snapshot of its
+            group refers to the stored one instead of being written again. Defaults to True.
+        swmr (bool, optional): Whether the file is opened for HDF5 single-writer/multiple-reader
+            access. Defaults to False.
+        read_only (bool, optional): Whether the file is only read, no group is created. Defaults to False.
+
+    With the DAILY_LAYOUT every snapshot is stored as its own dataset named by the timestamp of its
+    date. With the APPENDED_LAYOUT all snapshots of a group are appended to one chunked, compressed
+    dataset "data", and the sorted datasets "timestamps", "offsets", "lengths" and "scraping_times"
+    index the rows of each snapshot. Existing groups keep the layout they were created with.
+    Daily groups keep the sorted timestamps of their datasets in the side dataset "index", so
+    all layouts answer range queries by bisection.
+
+    The COLUMNAR_LAYOUT uses the same index as the APPENDED_LAYOUT, but splits the rows into their
+    string and float fields. The string fields are dictionary encoded: every distinct row label is
+    stored once in "labels" and "label_codes" refers to it, as the labels rarely change from one
+    snapshot to the next. The float fields are stored as one float32 matrix "values", whose
+    compression filters are set per group. Reads rebuild the structured arrays of the scrapers.
+
+    Snapshots are keyed by the timestamp of their date. Groups with a granularity below
+    DAILY_GRANULARITY key them by the start of the time bucket of their scraping time instead,
+    e.g. per minute, so several snapshots per day can be stored. These groups use the
+    APPENDED_LAYOUT, which keeps the number of HDF5 objects constant however many snapshots are
+    stored, and their methods return datetimes where daily groups return dates. A granularity below a
+    day works with the COLUMNAR_LAYOUT as well.
+
+    Every snapshot is hashed when it is stored. A snapshot identical to the previous snapshot of its
+    group, e.g. a table that did not change over the weekend, is not written again: daily groups
+    store it as a hard link to the previous dataset, so both share its attributes and the scraping
+    time of the first, and appended groups point its index entry at the rows of the previous one.
+    Reads do not see a difference.
+
+    Used as a context manager (``with DataCollector(...) as data_collector:``) the HDF5 file is
+    opened once and shared by all method calls until the block is left. Writes are then flushed
+    once on exit instead of after every call. The session file is shared by all threads, calls
+    are serialized by a lock.
+
+    With swmr the file is written in the SWMR format, an existing file in an older format is
+    converted once by the writer. A writer session switched to SWMR mode with start_swmr() only
+    appends to the existing datasets of appended and columnar groups, see is_swmr_ready, while
+    other processes read the flushed data with ``DataCollector(path, group_names={}, swmr=True,
+    read_only=True)``. Read-only collectors open the file for every call, so each call sees the
+    data flushed last. DataWriter drives a writer session from one thread.
     """
 
-    def __init__(self, path:str = None,parent_name:str = None, group_names:dict[str:str]=None):
+    def __init__(self, path:str = None,parent_name:str = None, group_names:dict[str:str]=None, layout:str = None,
+                 granularity:int = None, filters:dict[str:any] = None, deduplicate:bool = True,
+                 swmr:bool = False, read_only:bool = False):
         if path is None:
             path = PATH
         self.path:str = path
@@ -33,8 +113,33 @@ class DataCollector:
         if group_names is None:
             group_names = GROUP_NAMES
         self.group_names:str = group_names
+        if layout is None:
+            layout = DAILY_LAYOUT
+        if not layout in LAYOUTS:
+            raise ValueError(f"Unknown layout \"{layout}\".")
+        self.layout:str = layout
+        if granularity is None:
+            granularity = DAILY_GRANULARITY
+        if granularity < DAILY_GRANULARITY and layout == DAILY_LAYOUT:
+            raise ValueError("A granularity below a day requires the APPENDED_LAYOUT or the COLUMNAR_LAYOUT.")
+        self.granularity:int = granularity
+        self.filters:dict[str:any] = self.__checked_filters(FILTERS if filters is None else filters)
+        self.deduplicate:bool = deduplicate
+        self.swmr:bool = swmr
+        self.read_only:bool = read_only
+        self.__file:h5py.File = None
+        self.__lock:threading.RLock = threading.RLock()
+        if read_only:
+            return
+        if swmr and os.path.exists(self.path):
+            self.__convert_for_swmr()
+        if os.path.exists(self.path):
+            with self.__open_file("r") as file:
+                if self.parent_name in file.keys() \
+                        and all(name in file[self.parent_name].keys() for name in self.group_names):
+                    return
 
-        with h5py.File(self.path,"a") as file:
+        with self.__open_file("a") as file:
 
             if not self.parent_name in file.keys():
                 root_group = file.create_group(name=self.parent_name)
@@ -43,10 +148,684 @@ class DataCollector:
                 root_group = file[self.parent_name]
 
             for name in self.group_names:
+                self.__finish_migration(file=file, group_name=name)
                 if not name in root_group.keys():
                     group = root_group.create_group(name=name)
                     group.attrs["url"] = self.group_names[name]
                     group.attrs["initialisation_date"] = date.today().timetuple()
+                    group.attrs["layout"] = self.layout
+                    group.attrs["granularity"] = self.granularity
+                    group.attrs["filters"] = json.dumps(self.filters)
+
+    def __enter__(self)->"DataCollector":
+        mode = "r" if self.read_only else "a"
+        with self.__lock:
+            self.__file = h5py.File(self.path, mode, **self.__file_options(mode))
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback)->None:
+        with self.__lock:
+            try:
+                if not self.read_only:
+                    self.__file.flush()
+            finally:
+                try:
+                    self.__file.close()
+                finally:
+                    self.__file = None
+
+    @property
+    def in_session(self)->bool:
+        """Whether the HDF5 file is kept open by a session.
+
+        Returns:
+            bool: True inside a ``with`` block, False otherwise.
+        """
+        return self.__file is not None
+
+    @property
+    def in_swmr_mode(self)->bool:
+        """Whether the session file is written in SWMR mode.
+
+        Returns:
+            bool: True after start_swmr() until the session ends, False otherwise.
+        """
+        with self.__lock:
+            return self.__file is not None and self.__file.swmr_mode
+
+    def start_swmr(self)->None:
+        """Switches the writer session to SWMR mode, readers of other processes can open the file from now on.
+
+        No group, dataset or attribute can be created until the session ends, so the missing
+        indexes of daily groups, which reads would build, are built before.
+
+        Raises:
+            ValueError: If no writer session of a collector with swmr is open.
+        """
+        with self.__lock:
+            if not self.swmr or self.read_only or self.__file is None:
+                raise ValueError("SWMR mode needs a writer session of a DataCollector with swmr.")
+            if not self.__file.swmr_mode:
+                self.__build_indexes(file=self.__file)
+                self.__file.swmr_mode = True
+
+    def __build_indexes(self, file:h5py.File)->None:
+        """Stores the missing indexes of the daily groups, see __index.
+
+        The opened groups and datasets are released on return, SWMR mode cannot be started while
+        objects of the file are open.
+
+        Args:
+            file (h5py.File): The HDF5 file, opened for writing.
+        """
+        if not self.parent_name in file:
+            return
+        parent = file[self.parent_name]
+        for group_name in self.group_names:
+            if group_name in parent:
+                self.__index(parent[group_name])
+
+    def flush(self)->None:
+        """Writes the buffered changes of the session to the file, so SWMR readers see them."""
+        with self.__lock:
+            if self.__file is not None and not self.read_only:
+                self.__file.flush()
+
+    def __file_options(self, mode:str)->dict[str:any]:
+        """Returns the keyword arguments of h5py.File for a mode.
+
+        Args:
+            mode (str): The h5py file mode.
+
+        Returns:
+            dict[str, any]: The file format and SWMR arguments, empty without swmr.
+        """
+        if not self.swmr:
+            return {}
+        if mode == "r":
+            return {"libver": "latest", "swmr": True}
+        return {"libver": "latest"}
+
+    def __convert_for_swmr(self)->None:
+        """Rewrites a file of an older format in the format SWMR needs, keeping all objects and links.
+
+        The objects below every top level group are copied at once, so hard links between them
+        stay shared.
+        """
+        with h5py.File(self.path, "r") as file:
+            if file.id.get_create_plist().get_version()[0] >= SWMR_SUPERBLOCK:
+                return
+            temporary_path = self.path + ".swmr"
+            with h5py.File(temporary_path, "w", libver="latest") as converted:
+                for name, value in file.attrs.items():
+                    converted.attrs[name] = value
+                for name in file:
+                    file.copy(file[name], converted, name=name)
+        os.replace(temporary_path, self.path)
+
+    @contextmanager
+    def __open_file(self, mode:str)->Iterator[h5py.File]:
+        """Yields the session file if a session is open, otherwise opens the file for one call.
+
+        Args:
+            mode (str): The h5py file mode used outside of a session.
+
+        Yields:
+            h5py.File: The opened HDF5 file.
+        """
+        with self.__lock:
+            if self.__file is not None:
+                yield self.__file
+            else:
+                if self.read_only:
+                    mode = "r"
+                with h5py.File(self.path, mode, **self.__file_options(mode)) as file:
+                    yield file
+
+    def __get_group(self, file:h5py.File, group_name:str)->h5py.Group:
+        """Returns the group with the given name below the parent group.
+
+        Args:
+            file (h5py.File): The opened HDF5 file.
+            group_name (str): The name of the group.
+
+        Raises:
+            ValueError: If group_name not in database.
+
+        Returns:
+            h5py.Group: The group.
+        """
+        try:
+            return file[self.parent_name][group_name]
+        except KeyError as exc:
+            raise ValueError(f"No group \"{self.parent_name}/{group_name}\" in database.") from exc
+
+    @staticmethod
+    def __is_appended(group:h5py.Group)->bool:
+        """Checks if a group keeps its snapshots in appended datasets with an index.
+
+        Args:
+            group (h5py.Group): The group to check.
+
+        Returns:
+            bool: True for the APPENDED_LAYOUT and the COLUMNAR_LAYOUT, False for the DAILY_LAYOUT.
+        """
+        return group.attrs.get("layout", DAILY_LAYOUT) in (APPENDED_LAYOUT, COLUMNAR_LAYOUT)
+
+    @staticmethod
+    def __is_columnar(group:h5py.Group)->bool:
+        """Checks if a group uses the COLUMNAR_LAYOUT.
+
+        Args:
+            group (h5py.Group): The group to check.
+
+        Returns:
+            bool: True for the COLUMNAR_LAYOUT, False otherwise.
+        """
+        return group.attrs.get("layout", DAILY_LAYOUT) == COLUMNAR_LAYOUT
+
+    @staticmethod
+    def __checked_filters(filters:dict[str:any])->dict[str:any]:
+        """Completes filters with the FILTERS defaults and validates them.
+
+        Args:
+            filters (dict[str, any]): The filters.
+
+        Raises:
+            ValueError: If a filter or the compression is unknown.
+
+        Returns:
+            dict[str, any]: The complete filters, the keyword arguments of h5py's create_dataset.
+        """
+        unknown = set(filters) - set(FILTERS)
+        if unknown:
+            raise ValueError(f"Unknown filters {sorted(unknown)}.")
+        filters = {**FILTERS, **filters}
+        if not filters["compression"] in COMPRESSIONS:
+            raise ValueError(f"Unknown compression \"{filters['compression']}\".")
+        if filters["compression"] != "gzip":
+            filters["compression_opts"] = None
+        return filters
+
+    @staticmethod
+    def __filters(group:h5py.Group)->dict[str:any]:
+        """Returns the filters of a group, groups without the attribute use FILTERS.
+
+        Args:
+            group (h5py.Group): The group.
+
+        Returns:
+            dict[str, any]: The filters.
+        """
+        if "filters" in group.attrs:
+            return json.loads(group.attrs["filters"])
+        return dict(FILTERS)
+
+    @staticmethod
+    def __granularity(group:h5py.Group)->int:
+        """Returns the seconds of the time buckets of a group, groups without the attribute are daily.
+
+        Args:
+            group (h5py.Group): The group.
+
+        Returns:
+            int: The granularity in seconds.
+        """
+        return int(group.attrs.get("granularity", DAILY_GRANULARITY))
+
+    @staticmethod
+    def __timestamp(group:h5py.Group, moment:date|datetime)->float:
+        """Returns the timestamp of the time bucket of a moment in a group.
+
+        Daily groups and plain dates map to the start of the day, datetimes in sub-daily groups
+        map to the start of their bucket, counted from midnight.
+
+        Args:
+            group (h5py.Group): The group.
+            moment (date|datetime): The moment.
+
+        Returns:
+            float: The timestamp.
+        """
+        midnight = time.mktime(date(moment.year, moment.month, moment.day).timetuple())
+        granularity = DataCollector.__granularity(group)
+        if granularity >= DAILY_GRANULARITY or not isinstance(moment, datetime):
+            return midnight
+        return midnight + ((time.mktime(moment.timetuple()) - midnight)//granularity)*granularity
+
+    @staticmethod
+    def __moment(group:h5py.Group, timestamp:float)->date|datetime:
+        """Converts a stored timestamp back into the date, or the datetime for sub-daily groups.
+
+        Args:
+            group (h5py.Group): The group.
+            timestamp (float): The timestamp.
+
+        Returns:
+            date|datetime: The date or datetime.
+        """
+        if DataCollector.__granularity(group) >= DAILY_GRANULARITY:
+            return date.fromtimestamp(timestamp)
+        return datetime.fromtimestamp(timestamp)
+
+    @staticmethod
+    def __positions(index:h5py.Dataset|np.ndarray, start:date|datetime = None,
+                    end:date|datetime = None)->tuple[int,int]:
+        """Locates a time range in a sorted timestamp index by bisection.
+
+        A date as end includes its whole day, a datetime as end includes the moment itself.
+
+        Args:
+            index (h5py.Dataset|np.ndarray): The sorted timestamps.
+            start (date|datetime, optional): The first moment of the range. Defaults to the first snapshot.
+            end (date|datetime, optional): The last moment of the range. Defaults to the last snapshot.
+
+        Returns:
+            tuple[int, int]: The first position in the range and the first position after it.
+        """
+        lower = 0 if start is None else bisect_left(index, time.mktime(start.timetuple()))
+        if end is None:
+            upper = len(index)
+        elif isinstance(end, datetime):
+            upper = bisect_right(index, time.mktime(end.timetuple()))
+        else:
+            upper = bisect_left(index, time.mktime((end + timedelta(days=1)).timetuple()))
+        return lower, max(lower, upper)
+
+    @staticmethod
+    def __create_appended_datasets(group:h5py.Group, data_type:np.dtype)->None:
+        """Creates the empty, resizable data and index datasets of the APPENDED_LAYOUT or COLUMNAR_LAYOUT.
+
+        Args:
+            group (h5py.Group): The group to create the datasets in.
+            data_type (np.dtype): The data type of the snapshots.
+
+        Raises:
+            ValueError: If the COLUMNAR_LAYOUT cannot store the data type.
+        """
+        filters = DataCollector.__filters(group)
+        if DataCollector.__is_columnar(group):
+            label_fields, value_columns = DataCollector.__columnar_fields(data_type)
+            width = sum(size for _, size in value_columns.values())
+            group.attrs["data_type"] = np.zeros(1, dtype=data_type)
+            if label_fields:
+                group.create_dataset(name="labels", shape=(0,), maxshape=(None,),
+                                     dtype=[(field, data_type[field]) for field in label_fields],
+                                     chunks=(CHUNK_ROWS,), **filters)
+            group.create_dataset(name="label_codes", shape=(0,), maxshape=(None,), dtype="i4",
+                                 chunks=(CHUNK_ROWS,), **filters)
+            group.create_dataset(name="values", shape=(0, width), maxshape=(None, width), dtype="f4",
+                                 chunks=(CHUNK_ROWS, width), **filters)
+        else:
+            group.create_dataset(name="data", shape=(0,), maxshape=(None,), dtype=data_type,
+                                 chunks=(CHUNK_ROWS,), **filters)
+        for name, index_type in zip(INDEX_NAMES, ("f8", "i8", "i8", "S32", "S32")):
+            group.create_dataset(name=name, shape=(0,), maxshape=(None,), dtype=index_type,
+                                 chunks=(CHUNK_ROWS,))
+
+    @staticmethod
+    def __columnar_fields(data_type:np.dtype)->tuple[list[str],dict[str:tuple[int,int]]]:
+        """Splits the fields of a data type into the label fields and the columns of the value matrix.
+
+        Args:
+            data_type (np.dtype): The structured data type of the snapshots.
+
+        Raises:
+            ValueError: If a field holds neither strings nor floats.
+
+        Returns:
+            tuple[list[str], dict[str, tuple[int, int]]]: The string fields, and the first matrix
+                column and the number of columns of every float field.
+        """
+        label_fields = []
+        value_columns = {}
+        width = 0
+        for field in data_type.names:
+            kind = data_type[field].base.kind
+            if kind == "S":
+                label_fields.append(field)
+            elif kind == "f":
+                size = int(np.prod(data_type[field].shape))
+                value_columns[field] = (width, size)
+                width += size
+            else:
+                raise ValueError(f"The COLUMNAR_LAYOUT stores string and float fields only, not \"{field}\".")
+        return label_fields, value_columns
+
+    @staticmethod
+    def __data_type(group:h5py.Group)->np.dtype:
+        """Returns the data type of the snapshots of a group in the APPENDED_LAYOUT or COLUMNAR_LAYOUT.
+
+        Args:
+            group (h5py.Group): The group.
+
+        Returns:
+            np.dtype: The data type, None before the first snapshot.
+        """
+        if DataCollector.__is_columnar(group):
+            return group.attrs["data_type"].dtype if "data_type" in group.attrs else None
+        return group["data"].dtype if "data" in group else None
+
+    @staticmethod
+    def __encode(group:h5py.Group, data:np.array)->tuple[np.array,np.array]:
+        """Encodes the rows of a snapshot for the COLUMNAR_LAYOUT and stores labels not seen before.
+
+        Args:
+            group (h5py.Group): The group in the COLUMNAR_LAYOUT.
+            data (np.array): The snapshot.
+
+        Returns:
+            tuple[np.array, np.array]: The label code of every row and the float32 value matrix.
+        """
+        label_fields, value_columns = DataCollector.__columnar_fields(data.dtype)
+        num_rows = data.shape[0]
+        codes = np.zeros(num_rows, dtype="i4")
+        if label_fields:
+            label_type = np.dtype([(field, data.dtype[field]) for field in label_fields])
+            labels = np.empty(num_rows, dtype=label_type)
+            for field in label_fields:
+                labels[field] = data[field]
+            key_type = np.dtype((np.void, label_type.itemsize))
+            dataset = group["labels"]
+            known = {key.tobytes(): code for code, key in enumerate(dataset[()].view(key_type))}
+            new_rows = []
+            for row, key in enumerate(labels.view(key_type)):
+                key = key.tobytes()
+                if not key in known:
+                    known[key] = len(known)
+                    new_rows.append(row)
+                codes[row] = known[key]
+            if new_rows:
+                size = dataset.shape[0]
+                dataset.resize((size + len(new_rows),))
+                dataset[size:] = labels[new_rows]
+
+        matrix = np.empty((num_rows, sum(size for _, size in value_columns.values())), dtype="f4")
+        for field, (first, size) in value_columns.items():
+            matrix[:, first:first+size] = data[field].reshape(num_rows, size)
+        return codes, matrix
+
+    @staticmethod
+    def __write_rows(group:h5py.Group, data:np.array)->int:
+        """Appends the rows of a snapshot to the data of a group in the APPENDED_LAYOUT or COLUMNAR_LAYOUT.
+
+        Args:
+            group (h5py.Group): The group.
+            data (np.array): The snapshot.
+
+        Returns:
+            int: The offset of the first written row.
+        """
+        if not DataCollector.__is_columnar(group):
+            dataset = group["data"]
+            offset = dataset.shape[0]
+            if data.shape[0]:
+                dataset.resize((offset + data.shape[0],))
+                dataset[offset:] = data
+            return offset
+
+        codes, matrix = DataCollector.__encode(group=group, data=data)
+        offset = group["label_codes"].shape[0]
+        if data.shape[0]:
+            for name, values in (("label_codes", codes), ("values", matrix)):
+                group[name].resize(offset + data.shape[0], axis=0)
+                group[name][offset:] = values
+        return offset
+
+    @staticmethod
+    def __read_rows(group:h5py.Group, rows:slice, selection:dict[str:list[int]] = None)->np.array:
+        """Reads rows of the data of a group in the APPENDED_LAYOUT or COLUMNAR_LAYOUT.
+
+        In the COLUMNAR_LAYOUT only the label codes and the matrix columns of the selected columns
+        are read, and the labels are looked up in the label dictionary.
+
+        Args:
+            group (h5py.Group): The group.
+            rows (slice): The rows to read.
+            selection (dict[str, list[int]], optional): The positions of the selected columns by
+                field name, see __column_selection. Defaults to all columns.
+
+        Returns:
+            np.array: The rows, with the data type of the stored snapshots or with the selected columns.
+        """
+        if not DataCollector.__is_columnar(group):
+            if selection is None:
+                return group["data"][rows]
+            return DataCollector.__read_columns(dataset=group["data"], selection=selection, rows=rows)
+
+        data_type = DataCollector.__data_type(group)
+        label_fields, value_columns = DataCollector.__columnar_fields(data_type)
+        codes = group["label_codes"][rows]
+        if selection is None:
+            selection = {field: list(range(int(np.prod(data_type[field].shape)))) for field in data_type.names}
+        else:
+            data_type = np.dtype([(field, data_type[field].base, (len(positions),))
+                                  for field, positions in selection.items()])
+        data = np.empty(codes.shape[0], dtype=data_type)
+
+        if any(field in label_fields for field in selection):
+            labels = group["labels"][()][codes]
+        columns = sorted({value_columns[field][0] + position for field, positions in selection.items()
+                          if field in value_columns for position in positions})
+        if len(columns) == group["values"].shape[1]:
+            matrix = group["values"][rows]
+        elif columns:
+            matrix = group["values"][rows, columns]
+        matrix_columns = {column: number for number, column in enumerate(columns)}
+
+        for field, positions in selection.items():
+            if field in value_columns:
+                values = matrix[:, [matrix_columns[value_columns[field][0] + position] for position in positions]]
+            else:
+                values = labels[field].reshape(codes.shape[0], -1)[:, positions]
+            data[field] = values.reshape(data[field].shape)
+        return data
+
+    @staticmethod
+    def __insert(dataset:h5py.Dataset, position:int, value:any)->None:
+        """Inserts a value into a resizable one dimensional dataset.
+
+        Args:
+            dataset (h5py.Dataset): The dataset.
+            position (int): The position of the new value.
+            value (any): The value to insert.
+        """
+        size = dataset.shape[0]
+        tail = dataset[position:size]
+        dataset.resize((size+1,))
+        if tail.size:
+            dataset[position+1:] = tail
+        dataset[position] = value
+
+    @staticmethod
+    def __find_snapshot(group:h5py.Group, timestamp:float)->int:
+        """Returns the index position of the snapshot with the given timestamp in the APPENDED_LAYOUT.
+
+        Args:
+            group (h5py.Group): The group to search.
+            timestamp (float): The timestamp of the snapshot.
+
+        Returns:
+            int: The index position, -1 if the snapshot is not stored.
+        """
+        if not "timestamps" in group:
+            return -1
+        timestamps = group["timestamps"]
+        position = bisect_left(timestamps, timestamp)
+        if position < len(timestamps) and timestamps[position] == timestamp:
+            return position
+        return -1
+
+    @staticmethod
+    def __index(group:h5py.Group)->h5py.Dataset|np.ndarray:
+        """Returns the sorted timestamp index of a group.
+
+        Daily groups written before the index existed get their index built from the dataset
+        names. It is stored as dataset "index" if the file is writable and not in SWMR mode.
+
+        Args:
+            group (h5py.Group): The group.
+
+        Returns:
+            h5py.Dataset|np.ndarray: The sorted timestamps of the stored snapshots.
+        """
+        if DataCollector.__is_appended(group):
+            return group["timestamps"] if "timestamps" in group else np.empty(0)
+        if "index" in group:
+            return group["index"]
+        timestamps = np.sort(np.array([float(name) for name in group.keys() if not name in RESERVED_NAMES],
+                                      dtype="f8"))
+        if group.file.mode == "r" or group.file.swmr_mode:
+            return timestamps
+        return group.create_dataset(name="index", data=timestamps, maxshape=(None,), chunks=(CHUNK_ROWS,))
+
+    @staticmethod
+    def __content_hash(data:np.array)->bytes:
+        """Hashes the data type and the content of a snapshot.
+
+        Args:
+            data (np.array): The snapshot.
+
+        Returns:
+            bytes: The hex digest.
+        """
+        fields = [(field, data.dtype[field].base.str, data.dtype[field].shape) for field in data.dtype.names or ()]
+        digest = hashlib.blake2b(f"{data.dtype.str}{fields}".encode(), digest_size=16)
+        digest.update(data.tobytes())
+        return digest.hexdigest().encode()
+
+    @staticmethod
+    def __content_hashes(group:h5py.Group)->h5py.Dataset:
+        """Returns the content hashes of the snapshots of a group in the APPENDED_LAYOUT or COLUMNAR_LAYOUT.
+
+        Groups written before the hashes existed get them computed from the stored snapshots.
+
+        Args:
+            group (h5py.Group): The group, opened for writing.
+
+        Returns:
+            h5py.Dataset: The hashes in index order.
+        """
+        if not "content_hashes" in group:
+            hashes = [DataCollector.__content_hash(DataCollector.__read_snapshot(group=group, position=position))
+                      for position in range(group["timestamps"].shape[0])]
+            group.create_dataset(name="content_hashes", data=np.array(hashes, dtype="S32"), maxshape=(None,),
+                                 chunks=(CHUNK_ROWS,))
+        return group["content_hashes"]
+
+    @staticmethod
+    def __daily_content_hash(dataset:h5py.Dataset)->bytes:
+        """Returns the content hash of a daily dataset, computing and storing it for datasets written without.
+
+        Args:
+            dataset (h5py.Dataset): The dataset, opened for writing.
+
+        Returns:
+            bytes: The hex digest.
+        """
+        if not "content_hash" in dataset.attrs:
+            dataset.attrs["content_hash"] = DataCollector.__content_hash(dataset[()]).decode()
+        return dataset.attrs["content_hash"].encode()
+
+    def __create_daily_dataset(self, group:h5py.Group, data_name:str, data:np.array, scraping_time:datetime,
+                               data_date:date)->None:
+        """Stores a snapshot of a group in the DAILY_LAYOUT, as a hard link if it equals the previous snapshot.
+
+        Args:
+            group (h5py.Group): The group, its index already holds the timestamp of the snapshot.
+            data_name (str): The name of the dataset.
+            data (np.array): The snapshot.
+            scraping_time (datetime): The time when the data was scraped.
+            data_date (date): The date of the data.
+        """
+        index = self.__index(group)
+        position = bisect_left(index, float(data_name))
+        content_hash = self.__content_hash(data)
+        if self.deduplicate and position > 0:
+            previous = group[str(float(index[position-1]))]
+            if previous.dtype == data.dtype and self.__daily_content_hash(previous) == content_hash:
+                group[data_name] = previous
+                return
+        dataset = group.create_dataset(name=data_name,data=data,
+                                       shape=data.shape)
+        dataset.attrs["scraping_time"] = scraping_time.isoformat()
+        dataset.attrs["inititialisation"] = data_date.timetuple()
+        dataset.attrs["content_hash"] = content_hash.decode()
+
+    def __append_snapshot(self, group:h5py.Group, data:np.array, timestamp:float, scraping_time:datetime)->None:
+        """Appends a snapshot to the data of a group in the APPENDED_LAYOUT and indexes it.
+
+        The rows are always appended at the end of "data", only the small index datasets are
+        kept sorted by timestamp. A snapshot equal to the previous one refers to its rows instead.
+
+        Args:
+            group (h5py.Group): The group to store the snapshot in.
+            data (np.array): The snapshot.
+            timestamp (float): The timestamp of the snapshot date.
+            scraping_time (datetime): The time when the data was scraped.
+
+        Raises:
+            ValueError: If the data type differs from the stored data.
+        """
+        if not "timestamps" in group:
+            DataCollector.__create_appended_datasets(group=group, data_type=data.dtype)
+        if DataCollector.__data_type(group) != data.dtype:
+            raise ValueError(f"Data type does not match the data stored in \"{group.name}\".")
+
+        content_hash = self.__content_hash(data)
+        hashes = self.__content_hashes(group)
+        position = bisect_left(group["timestamps"], timestamp)
+        if self.deduplicate and position > 0 and hashes[position-1] == content_hash:
+            offset = int(group["offsets"][position-1])
+        else:
+            offset = self.__write_rows(group=group, data=data)
+
+        values = (timestamp, offset, data.shape[0], scraping_time.isoformat().encode(), content_hash)
+        for name, value in zip(INDEX_NAMES, values):
+            DataCollector.__insert(dataset=group[name], position=position, value=value)
+
+    def __replace_snapshot(self, group:h5py.Group, position:int, data:np.array, scraping_time:datetime)->None:
+        """Replaces the snapshot at an index position of a group in the APPENDED_LAYOUT.
+
+        The new rows are appended and the index is pointed at them, or at the rows of the previous
+        snapshot if it is equal. The old rows stay unreferenced in "data" unless other snapshots
+        refer to them.
+
+        Args:
+            group (h5py.Group): The group to store the snapshot in.
+            position (int): The index position of the snapshot.
+            data (np.array): The new snapshot.
+            scraping_time (datetime): The time when the data was scraped.
+
+        Raises:
+            ValueError: If the data type differs from the stored data.
+        """
+        if DataCollector.__data_type(group) != data.dtype:
+            raise ValueError(f"Data type does not match the data stored in \"{group.name}\".")
+        content_hash = self.__content_hash(data)
+        hashes = self.__content_hashes(group)
+        if self.deduplicate and position > 0 and hashes[position-1] == content_hash:
+            offset = int(group["offsets"][position-1])
+        else:
+            offset = self.__write_rows(group=group, data=data)
+        group["offsets"][position] = offset
+        group["lengths"][position] = data.shape[0]
+        group["scraping_times"][position] = scraping_time.isoformat().encode()
+        hashes[position] = content_hash
+
+    @staticmethod
+    def __read_snapshot(group:h5py.Group, position:int)->np.array:
+        """Reads the snapshot at an index position of a group in the APPENDED_LAYOUT.
+
+        Args:
+            group (h5py.Group): The group to read from.
+            position (int): The index position of the snapshot.
+
+        Returns:
+            np.array: The snapshot.
+        """
+        offset = int(group["offsets"][position])
+        return DataCollector.__read_rows(group=group, rows=slice(offset, offset + int(group["lengths"][position])))
 
     def store_column_names(self,column_names:np.array,group_name:str)->None:
         """Stores the column names in the specified group.
@@ -58,11 +837,8 @@ class DataCollector:
         Raises:
             ValueError: If group_name not in database.
         """
-        with h5py.File(self.path, "a") as file:
-            try:
-                group = file[self.parent_name][group_name]
-            except KeyError as exc:
-                raise ValueError(f"No group \"{self.parent_name}/{group_name}\" in database.")
+        with self.__open_file("a") as file:
+            group = self.__get_group(file=file, group_name=group_name)
             if not "column_names" in group.keys():
                 column_names = column_names
                 dataset = group.create_dataset(name="column_names",data=column_names,
@@ -71,14 +847,18 @@ class DataCollector:
                 dataset.attrs["initialisation_date"] = date.today().timetuple()
 
 
-    def store_data(self, data:np.array, group_name:str, scraping_time: datetime, data_date:date = None)-> None:
+    def store_data(self, data:np.array, group_name:str, scraping_time: datetime, data_date:date|datetime = None,
+                   overwrite:bool = False)-> None:
         """Stores the data in the specified group.
 
         Args:
             data (np.array): The data to store.
             group_name (str): The name of the group to store the data in.
             scraping_time (datetime): The time when the data was scraped.
-            data_date (date, optional): The date of the data. Defaults to today.
+            data_date (date|datetime, optional): The date of the data, sub-daily groups key the data
+                by the bucket of a datetime or else of the scraping time. Defaults to today.
+            overwrite (bool, optional): Replaces data already stored for data_date, which is
+                otherwise kept. Defaults to False.
 
         Raises:
             ValueError: If group_name not in database.
@@ -86,28 +866,42 @@ class DataCollector:
         if data_date is None:
             data_date = date.today()
 
-        data_name = str(time.mktime(data_date.timetuple()))
-
-        with h5py.File(self.path, "a") as file:
+        with self.__open_file("a") as file:
             
-            try:
-                group = file[self.parent_name][group_name]
-            except KeyError as exc:
-                raise ValueError(f"No group \"{self.parent_name}/{group_name}\" in database.")
+            group = self.__get_group(file=file, group_name=group_name)
+            moment = data_date
+            if not isinstance(data_date, datetime) and self.__granularity(group) < DAILY_GRANULARITY:
+                moment = scraping_time
+            data_name = str(self.__timestamp(group=group, moment=moment))
+            data_date = date(data_date.year, data_date.month, data_date.day)
 
-            if not data_name in group.keys():
-                dataset = group.create_dataset(name=data_name,data=data,
-                                               shape=data.shape)
-                dataset.attrs["scraping_time"] = scraping_time.isoformat()
-                dataset.attrs["inititialisation"] = data_date.timetuple()
+            if self.__is_appended(group):
+                position = self.__find_snapshot(group=group, timestamp=float(data_name))
+                if position < 0:
+                    self.__append_snapshot(group=group, data=data, timestamp=float(data_name),
+                                           scraping_time=scraping_time)
+                elif overwrite:
+                    self.__replace_snapshot(group=group, position=position, data=data,
+                                            scraping_time=scraping_time)
+            elif data_name in group.keys() and overwrite:
+                del group[data_name]
+                self.__create_daily_dataset(group=group, data_name=data_name, data=data,
+                                            scraping_time=scraping_time, data_date=data_date)
+            elif not data_name in group.keys():
+                index = self.__index(group)
+                self.__insert(dataset=index, position=bisect_left(index, float(data_name)),
+                              value=float(data_name))
+                self.__create_daily_dataset(group=group, data_name=data_name, data=data,
+                                            scraping_time=scraping_time, data_date=data_date)
 
-    def get_data(self, group_name:str, data_date:date = None)->np.array:
+    def get_data(self, group_name:str, data_date:date|datetime = None)->np.array:
         """
         Retrieves the data from the specified group and date.
 
         Args:
             group_name (str): The name of the group to retrieve data from.
-            data_date (date, optional): The date of the data. Defaults to today.
+            data_date (date|datetime, optional): The date of the data, a datetime selects its bucket
+                in sub-daily groups, a date their last snapshot of the day. Defaults to today.
 
         Returns:
             np.array: The retrieved data.
@@ -118,13 +912,18 @@ class DataCollector:
         """
         if data_date is None:
             data_date = date.today()
-        data_name = str(time.mktime(data_date.timetuple()))
-        with h5py.File(self.path, "r") as file:
-            try:
-                group = file[self.parent_name][group_name]
-            except KeyError as exc:
-                raise ValueError(f"No group \"{self.parent_name}/{group_name}\" in database.")
-            if data_name in group.keys():
+        with self.__open_file("r") as file:
+            group = self.__get_group(file=file, group_name=group_name)
+            data_name = str(self.__timestamp(group=group, moment=data_date))
+            if self.__granularity(group) < DAILY_GRANULARITY and not isinstance(data_date, datetime):
+                lower, upper = self.__positions(index=self.__index(group), start=data_date, end=data_date)
+                if lower < upper:
+                    return self.__read_snapshot(group=group, position=upper - 1)
+            elif self.__is_appended(group):
+                position = self.__find_snapshot(group=group, timestamp=float(data_name))
+                if position >= 0:
+                    return self.__read_snapshot(group=group, position=position)
+            elif data_name in group.keys():
                 return group[data_name][()]
             raise ValueError("No dataset in database.")
         
@@ -141,11 +940,8 @@ class DataCollector:
         Returns:
             np.array: The column names.
         """
-        with h5py.File(self.path, "r") as file:
-            try:
-                group = file[self.parent_name][group_name]
-            except KeyError as exc:
-                raise ValueError(f"No group \"{self.parent_name}/{group_name}\" in database.")
+        with self.__open_file("r") as file:
+            group = self.__get_group(file=file, group_name=group_name)
             if "column_names" in group:
                 return group["column_names"][()]
             raise ValueError(f"No column names in group {group_name}.")
@@ -157,26 +953,413 @@ class DataCollector:
             ValueError: If group_name not in database.
 
         Returns:
-            dict[date, np.array]: A dictionary of dates and their corresponding data.
+            dict[date, np.array]: A dictionary of dates, or datetimes for sub-daily groups, and their
+                corresponding data.
 
         Raises:
             ValueError: If group_name not in database.
         """
-        last_weeks_dates = [str(time.mktime((date.today()-i*timedelta(days=1)).timetuple())) for i in range(num_days)]
+        first_date = date.today() - (num_days-1)*timedelta(days=1)
 
-        with h5py.File(self.path, "r") as file:
-            try:
-                group = file[self.parent_name][group_name]
-            except KeyError as exc:
-                raise ValueError(f"No group \"{self.parent_name}/{group_name}\" in database.")
-            return dict(sorted({date.fromtimestamp(float(name)) : group[name][()] for name in group.keys() if name in last_weeks_dates}.items()))
+        with self.__open_file("r") as file:
+            group = self.__get_group(file=file, group_name=group_name)
+            if self.__is_appended(group):
+                return self.__read_range(group=group, start=first_date, end=date.today())
+        return dict(self.get_range(group_name=group_name, start=first_date, end=date.today()))
+
+    def get_range(self, group_name:str, start:date|datetime = None, end:date|datetime = None,
+                  columns:list[str|bytes] = None)->Iterator[tuple[date|datetime,np.array]]:
+        """Yields the data of a group between two dates in date order.
+
+        The range is located by bisection in the sorted timestamp index, and the snapshots are read
+        in batches of RANGE_BATCH when they are requested, so iterating over years of data needs the
+        memory of one batch. The file is only opened and locked while a batch is read, a generator
+        that is not exhausted holds neither, and writers may store data between two batches.
+
+        If columns are given, only the fields holding them are read from the file and the yielded
+        arrays keep the field layout of the stored data with just the selected columns.
+
+        Args:
+            group_name (str): The name of the group to retrieve data from.
+            start (date|datetime, optional): The first moment of the range. Defaults to the first stored date.
+            end (date|datetime, optional): The last moment of the range, a date includes its whole day.
+                Defaults to today.
+            columns (list[str|bytes], optional): Names from get_column_names to read. Defaults to all columns.
+
+        Raises:
+            ValueError: If group_name not in database.
+            ValueError: If a column is not in the column names of the group.
+
+        Yields:
+            tuple[date|datetime, np.array]: The date, or the datetime for sub-daily groups, and the
+                data of each stored snapshot in the range.
+        """
+        if end is None:
+            end = date.today()
+        with self.__open_file("r") as file:
+            group = self.__get_group(file=file, group_name=group_name)
+            index = self.__index(group)
+            lower, upper = self.__positions(index=index, start=start, end=end)
+            timestamps = np.asarray(index[lower:upper])
+        selections = {}
+        for first in range(0, timestamps.shape[0], RANGE_BATCH):
+            with self.__open_file("r") as file:
+                group = self.__get_group(file=file, group_name=group_name)
+                snapshots = [(self.__moment(group=group, timestamp=timestamp),
+                              self.__read_at(group=group, timestamp=timestamp, columns=columns, selections=selections))
+                             for timestamp in timestamps[first:first+RANGE_BATCH]]
+            for moment, data in snapshots:
+                if data is not None:
+                    yield moment, data
+
+    def __read_at(self, group:h5py.Group, timestamp:float, columns:list[str|bytes],
+                  selections:dict[np.dtype:dict[str:list[int]]])->np.array:
+        """Reads the snapshot with a timestamp, or only the selected columns of it.
+
+        Args:
+            group (h5py.Group): The group to read from.
+            timestamp (float): The timestamp of the snapshot.
+            columns (list[str|bytes]): Names from get_column_names to read, None for all columns.
+            selections (dict[np.dtype, dict[str, list[int]]]): The column selections by data type,
+                filled as they are computed.
+
+        Raises:
+            ValueError: If a column is not in the column names of the group.
+
+        Returns:
+            np.array: The snapshot, None if it is not stored.
+        """
+        if self.__is_appended(group):
+            position = self.__find_snapshot(group=group, timestamp=float(timestamp))
+            if position < 0:
+                return None
+            offset = int(group["offsets"][position])
+            rows = slice(offset, offset + int(group["lengths"][position]))
+            selection = None
+            if columns is not None:
+                data_type = self.__data_type(group)
+                if not data_type in selections:
+                    selections[data_type] = self.__column_selection(group=group, data_type=data_type, columns=columns)
+                selection = selections[data_type]
+            return self.__read_rows(group=group, rows=rows, selection=selection)
+        name = str(float(timestamp))
+        if not name in group:
+            return None
+        dataset = group[name]
+        if columns is None:
+            return dataset[()]
+        if not dataset.dtype in selections:
+            selections[dataset.dtype] = self.__column_selection(group=group, data_type=dataset.dtype, columns=columns)
+        return self.__read_columns(dataset=dataset, selection=selections[dataset.dtype], rows=slice(None))
+
+    def get_rows(self, group_name:str, start:date|datetime = None, end:date|datetime = None,
+                 columns:list[str|bytes] = None)->tuple[np.ndarray,np.array,np.array]:
+        """Retrieves the rows of all snapshots of a group between two dates as one array.
+
+        In the APPENDED_LAYOUT and COLUMNAR_LAYOUT the rows of the whole range are read with one
+        slice and snapshots referring to the same rows are expanded by fancy indexing, without a
+        loop over the snapshots or the rows. In the DAILY_LAYOUT the snapshots are concatenated.
+
+        Args:
+            group_name (str): The name of the group to retrieve data from.
+            start (date|datetime, optional): The first moment of the range. Defaults to the first stored date.
+            end (date|datetime, optional): The last moment of the range, a date includes its whole day.
+                Defaults to today.
+            columns (list[str|bytes], optional): Names from get_column_names to read. Defaults to all columns.
+
+        Raises:
+            ValueError: If group_name not in database.
+            ValueError: If no column names are found in the group or they do not match the data.
+            ValueError: If a column is not in the column names of the group.
+            ValueError: If the snapshots of the range have different data types.
+
+        Returns:
+            tuple[np.ndarray, np.array, np.array]: The moment of every row as datetime64[s], the rows,
+                and the column names of the fields of the rows in order.
+        """
+        if end is None:
+            end = date.today()
+        with self.__open_file("r") as file:
+            group = self.__get_group(file=file, group_name=group_name)
+            if not "column_names" in group:
+                raise ValueError(f"No column names in group {group_name}.")
+            index = self.__index(group)
+            lower, upper = self.__positions(index=index, start=start, end=end)
+            timestamps = index[lower:upper]
+            moments = np.array([self.__moment(group=group, timestamp=timestamp) for timestamp in timestamps],
+                               dtype="datetime64[s]")
+
+            if self.__is_appended(group):
+                data_type = self.__data_type(group)
+                if data_type is None:
+                    return moments, np.empty(0, dtype=np.dtype([])), group["column_names"][()]
+                selection = None
+                if columns is not None:
+                    selection = self.__column_selection(group=group, data_type=data_type, columns=columns)
+                    data_type = np.dtype([(field, data_type[field].base, (len(positions),))
+                                          for field, positions in selection.items()])
+                names = self.__selected_names(group=group, data_type=self.__data_type(group), selection=selection)
+                if lower == upper:
+                    return moments, np.empty(0, dtype=data_type), names
+                offsets = group["offsets"][lower:upper]
+                lengths = group["lengths"][lower:upper]
+                first = int(offsets.min())
+                block = self.__read_rows(group=group, rows=slice(first, int((offsets + lengths).max())),
+                                         selection=selection)
+                starts = np.cumsum(lengths) - lengths
+                rows = np.repeat(offsets - first - starts, lengths) + np.arange(int(lengths.sum()))
+                if rows.shape[0] == block.shape[0] and (rows == np.arange(rows.shape[0])).all():
+                    return np.repeat(moments, lengths), block, names
+                return np.repeat(moments, lengths), block[rows], names
+
+            snapshots = []
+            selection = None
+            for timestamp in timestamps:
+                dataset = group[str(float(timestamp))]
+                if columns is None:
+                    snapshots.append(dataset[()])
+                else:
+                    selection = self.__column_selection(group=group, data_type=dataset.dtype, columns=columns)
+                    snapshots.append(self.__read_columns(dataset=dataset, selection=selection, rows=slice(None)))
+            if not snapshots:
+                return moments, np.empty(0, dtype=np.dtype([])), group["column_names"][()]
+            if any(snapshot.dtype != snapshots[0].dtype for snapshot in snapshots):
+                raise ValueError(f"The snapshots of group {group_name} between {start} and {end} have different data types.")
+            names = self.__selected_names(group=group, data_type=dataset.dtype, selection=selection)
+            return np.repeat(moments, [snapshot.shape[0] for snapshot in snapshots]), np.concatenate(snapshots), names
+
+    @staticmethod
+    def __selected_names(group:h5py.Group, data_type:np.dtype, selection:dict[str:list[int]] = None)->np.array:
+        """Returns the column names of the fields of the rows read with a column selection.
+
+        Args:
+            group (h5py.Group): The group holding the column names.
+            data_type (np.dtype): The structured data type of the stored snapshots.
+            selection (dict[str, list[int]], optional): The positions of the selected columns by
+                field name, see __column_selection. Defaults to all columns.
+
+        Raises:
+            ValueError: If the column names do not match the data type.
+
+        Returns:
+            np.array: The column names in the order of the fields and their positions.
+        """
+        names = group["column_names"][()]
+        if selection is None:
+            if len(names) != sum(int(np.prod(data_type[field].shape)) for field in data_type.names):
+                raise ValueError(f"The column names of group {group.name} do not match the stored data.")
+            return names
+        firsts = {}
+        first = 0
+        for field in data_type.names:
+            firsts[field] = first
+            first += int(np.prod(data_type[field].shape))
+        return names[[firsts[field] + position for field, positions in selection.items() for position in positions]]
+
+    def get_latest(self, group_name:str, end:date|datetime = None)->tuple[date|datetime,np.array]:
+        """Retrieves the most recent snapshot of a group up to a moment.
+
+        Args:
+            group_name (str): The name of the group to retrieve data from.
+            end (date|datetime, optional): The last moment to consider, a date includes its whole day.
+                Defaults to today.
+
+        Raises:
+            ValueError: If group_name not in database.
+            ValueError: If no dataset is stored up to the date.
+
+        Returns:
+            tuple[date|datetime, np.array]: The date, or the datetime for sub-daily groups, and the
+                data of the snapshot.
+        """
+        if end is None:
+            end = date.today()
+        with self.__open_file("r") as file:
+            group = self.__get_group(file=file, group_name=group_name)
+            index = self.__index(group)
+            position = self.__positions(index=index, end=end)[1] - 1
+            if position < 0:
+                raise ValueError("No dataset in database.")
+            timestamp = float(index[position])
+            if self.__is_appended(group):
+                return self.__moment(group=group, timestamp=timestamp), self.__read_snapshot(group=group, position=position)
+            return self.__moment(group=group, timestamp=timestamp), group[str(timestamp)][()]
+
+    def get_intraday_aggregate(self, group_name:str, start:date = None, end:date = None, how:str = "mean",
+                               columns:list[str|bytes] = None)->dict[date:np.array]:
+        """Aggregates the snapshots of every day into one snapshot per day.
+
+        Rows are matched by their string fields, the float fields of matching rows are
+        aggregated over the snapshots of the day, rows missing in a snapshot count as NaN.
+        The rows of the result are the rows of the last snapshot of the day plus the rows only
+        earlier snapshots had. Daily groups hold one snapshot per day, which is returned as is.
 
-    def is_saved_data(self, group_name:str, data_date:date)->bool:
+        Args:
+            group_name (str): The name of the group to retrieve data from.
+            start (date, optional): The first day. Defaults to the first stored date.
+            end (date, optional): The last day, inclusive. Defaults to today.
+            how (str, optional): One of AGGREGATIONS, "mean", "min", "max", "first" or "last". Defaults to "mean".
+            columns (list[str|bytes], optional): Names from get_column_names to read. Defaults to all columns.
+
+        Raises:
+            ValueError: If group_name not in database.
+            ValueError: If the aggregation is unknown.
+
+        Returns:
+            dict[date, np.array]: The aggregated snapshot of each day.
+        """
+        if not how in AGGREGATIONS:
+            raise ValueError(f"Unknown aggregation \"{how}\".")
+        days:dict[date:list[np.array]] = {}
+        for moment, data in self.get_range(group_name=group_name, start=start, end=end, columns=columns):
+            days.setdefault(date(moment.year, moment.month, moment.day), []).append(data)
+        return {day: self.__aggregate(snapshots=snapshots, how=how) for day, snapshots in days.items()}
+
+    @staticmethod
+    def __aggregate(snapshots:list[np.array], how:str)->np.array:
+        """Aggregates the float fields of snapshots row by row, rows are matched by their string fields.
+
+        Args:
+            snapshots (list[np.array]): The snapshots in time order.
+            how (str): One of AGGREGATIONS.
+
+        Returns:
+            np.array: The aggregated snapshot.
+        """
+        data_type = snapshots[-1].dtype
+        label_fields = [field for field in data_type.names if data_type[field].base.kind == "S"]
+        value_fields = [field for field in data_type.names if data_type[field].base.kind == "f"]
+        if len(snapshots) == 1 or not value_fields:
+            return snapshots[-1]
+
+        def labels(snapshot:np.array)->list[bytes]:
+            return [b"".join(row[field].tobytes() for field in label_fields) for row in snapshot]
+
+        last = snapshots[-1]
+        if all(snapshot.dtype == data_type and snapshot.shape == last.shape
+               and all(np.array_equal(snapshot[field], last[field]) for field in label_fields)
+               for snapshot in snapshots):
+            rows = {label: position for position, label in enumerate(labels(last))}
+            result = last.copy()
+            aligned = {field: np.stack([snapshot[field] for snapshot in snapshots]) for field in value_fields}
+        else:
+            rows = {}
+            templates = []
+            for snapshot in reversed(snapshots):
+                for label, row in zip(labels(snapshot), snapshot):
+                    if not label in rows:
+                        rows[label] = len(rows)
+                        templates.append(row)
+            result = np.array(templates, dtype=data_type)
+            aligned = {}
+            for field in value_fields:
+                values = np.full((len(snapshots), len(rows)) + data_type[field].shape, np.nan,
+                                 dtype=data_type[field].base)
+                for number, snapshot in enumerate(snapshots):
+                    positions = [rows[label] for label in labels(snapshot)]
+                    values[number, positions] = snapshot[field]
+                aligned[field] = values
+        for field in value_fields:
+            result[field] = AGGREGATIONS[how](aligned[field])
+        return result
+
+    @staticmethod
+    def __column_selection(group:h5py.Group, data_type:np.dtype, columns:list[str|bytes])->dict[str:list[int]]:
+        """Maps column names to the fields of the data type and the positions inside these fields.
+
+        The column names are counted through the fields in order, e.g. the string columns of "f0"
+        followed by the float columns of "f1".
+
+        Args:
+            group (h5py.Group): The group holding the column names.
+            data_type (np.dtype): The structured data type of the snapshots.
+            columns (list[str|bytes]): The selected column names.
+
+        Raises:
+            ValueError: If no column names are found in the group.
+            ValueError: If the column names do not match the data type.
+            ValueError: If a column is not in the column names of the group.
+
+        Returns:
+            dict[str, list[int]]: The positions of the selected columns by field name.
+        """
+        if not "column_names" in group:
+            raise ValueError(f"No column names in group {group.name}.")
+        names = list(group["column_names"][()])
+        field_sizes = [int(np.prod(data_type[field].shape)) for field in data_type.names]
+        if len(names) != sum(field_sizes):
+            raise ValueError(f"The column names of group {group.name} do not match the stored data.")
+
+        positions = []
+        for column in columns:
+            name = column.encode() if isinstance(column, str) else column
+            if not name in names:
+                raise ValueError(f"No column {column!r} in group {group.name}.")
+            positions.append(names.index(name))
+
+        selection = {}
+        first = 0
+        for field, size in zip(data_type.names, field_sizes):
+            field_positions = [position - first for position in positions if first <= position < first + size]
+            if field_positions:
+                selection[field] = field_positions
+            first += size
+        return selection
+
+    @staticmethod
+    def __read_columns(dataset:h5py.Dataset, selection:dict[str:list[int]], rows:slice)->np.array:
+        """Reads only the selected fields and rows of a dataset and keeps the selected columns.
+
+        Args:
+            dataset (h5py.Dataset): The dataset to read from.
+            selection (dict[str, list[int]]): The positions of the selected columns by field name.
+            rows (slice): The rows to read.
+
+        Returns:
+            np.array: A structured array with the selected columns.
+        """
+        fields = dataset.fields(list(selection))[rows]
+        data_type = np.dtype([(field, dataset.dtype[field].base, (len(positions),))
+                              for field, positions in selection.items()])
+        data = np.empty(fields.shape[0], dtype=data_type)
+        for field, positions in selection.items():
+            values = fields[field]
+            data[field] = values.reshape(values.shape[0], -1)[:, positions]
+        return data
+
+    @staticmethod
+    def __read_range(group:h5py.Group, start:date|datetime, end:date|datetime)->dict[date:np.array]:
+        """Reads all snapshots between two moments of a group in the APPENDED_LAYOUT with one slice.
+
+        Args:
+            group (h5py.Group): The group to read from.
+            start (date|datetime): The first moment of the range.
+            end (date|datetime): The last moment of the range, a date includes its whole day.
+
+        Returns:
+            dict[date, np.array]: A dictionary of dates, or datetimes for sub-daily groups, and their
+                corresponding data.
+        """
+        if not "timestamps" in group:
+            return {}
+        lower, upper = DataCollector.__positions(index=group["timestamps"], start=start, end=end)
+        if lower == upper:
+            return {}
+        timestamps = group["timestamps"][lower:upper]
+        offsets = group["offsets"][lower:upper]
+        lengths = group["lengths"][lower:upper]
+        start = int(offsets.min())
+        block = DataCollector.__read_rows(group=group, rows=slice(start, int((offsets + lengths).max())))
+        return {DataCollector.__moment(group=group, timestamp=timestamp) : block[offset-start:offset-start+length]
+                for timestamp, offset, length in zip(timestamps, offsets, lengths)}
+
+    def is_saved_data(self, group_name:str, data_date:date|datetime)->bool:
         """Checks if data for the specified date is saved in the group.
 
         Args:
             group_name (str): The name of the group to check.
-            data_date (date): The date of the data.
+            data_date (date|datetime): The date of the data, a datetime checks its bucket in
+                sub-daily groups, a date any snapshot of the day.
 
         Raises:
             ValueError: If group_name not in database.
@@ -186,12 +1369,14 @@ class DataCollector:
         """
         if data_date is None:
             data_date = date.today()
-        data_name = str(time.mktime(data_date.timetuple()))
-        with h5py.File(self.path, "r") as file:
-            try:
-                group = file[self.parent_name][group_name]
-            except KeyError as exc:
-                raise ValueError(f"No group \"{self.parent_name}/{group_name}\" in database.")
+        with self.__open_file("r") as file:
+            group = self.__get_group(file=file, group_name=group_name)
+            data_name = str(self.__timestamp(group=group, moment=data_date))
+            if self.__granularity(group) < DAILY_GRANULARITY and not isinstance(data_date, datetime):
+                lower, upper = self.__positions(index=self.__index(group), start=data_date, end=data_date)
+                return lower < upper
+            if self.__is_appended(group):
+                return self.__find_snapshot(group=group, timestamp=float(data_name)) >= 0
             return data_name in group.keys()
         
     def is_saved_columns(self, group_name:str)->bool:
@@ -206,9 +1391,171 @@ class DataCollector:
         Returns:
             bool: True if the column names are saved, False otherwise.
         """
-        with h5py.File(self.path, "r") as file:
-            try:
-                group = file[self.parent_name][group_name]
-            except KeyError as exc:
-                raise ValueError(f"No group \"{self.parent_name}/{group_name}\" in database.")
+        with self.__open_file("r") as file:
+            group = self.__get_group(file=file, group_name=group_name)
             return "column_names" in group.keys()
+
+    def get_granularity(self, group_name:str)->int:
+        """Returns the seconds of the time buckets the snapshots of a group are keyed by.
+
+        Args:
+            group_name (str): The name of the group.
+
+        Raises:
+            ValueError: If group_name not in database.
+
+        Returns:
+            int: The granularity in seconds, DAILY_GRANULARITY for daily groups.
+        """
+        with self.__open_file("r") as file:
+            return self.__granularity(self.__get_group(file=file, group_name=group_name))
+
+    def is_swmr_ready(self, group_name:str)->bool:
+        """Checks if snapshots can be stored in the group in SWMR mode, without creating any object.
+
+        Only appended and columnar groups that already hold their column names and a snapshot are
+        written by appending to existing datasets.
+
+        Args:
+            group_name (str): The name of the group to check.
+
+        Raises:
+            ValueError: If group_name not in database.
+
+        Returns:
+            bool: True if the group is only appended to, False otherwise.
+        """
+        with self.__open_file("r") as file:
+            group = self.__get_group(file=file, group_name=group_name)
+            return self.__is_appended(group) and "column_names" in group.keys() \
+                and all(name in group.keys() for name in INDEX_NAMES)
+
+    def migrate_layout(self, group_name:str, layout:str = None, filters:dict[str:any] = None)->None:
+        """Moves all snapshots of a group into the APPENDED_LAYOUT or the COLUMNAR_LAYOUT.
+
+        The snapshots are concatenated in date order and written with one call into a new group
+        beside the old one, named with MIGRATION_SUFFIX. Only once it is written, the old group
+        is renamed with RETIRED_SUFFIX, the new group takes its name and the old group is
+        deleted, so a failed migration leaves the group as it was. Rows of replaced snapshots
+        are dropped on the way and equal consecutive snapshots share their rows. HDF5 does not
+        shrink the file on deletion, run h5repack to reclaim the space.
+
+        Args:
+            group_name (str): The name of the group to migrate.
+            layout (str, optional): The new layout. Defaults to APPENDED_LAYOUT.
+            filters (dict[str, any], optional): New filters of the group, see DataCollector.
+                Defaults to the filters of the group.
+
+        Raises:
+            ValueError: If group_name not in database.
+            ValueError: If the layout is unknown or the DAILY_LAYOUT.
+            ValueError: If the daily datasets have different data types.
+            ValueError: If the COLUMNAR_LAYOUT cannot store the data type.
+        """
+        if layout is None:
+            layout = APPENDED_LAYOUT
+        if layout == DAILY_LAYOUT or not layout in LAYOUTS:
+            raise ValueError(f"Cannot migrate into the layout \"{layout}\".")
+        if filters is not None:
+            filters = self.__checked_filters(filters)
+        with self.__open_file("a") as file:
+            self.__finish_migration(file=file, group_name=group_name)
+            group = self.__get_group(file=file, group_name=group_name)
+            if group.attrs.get("layout", DAILY_LAYOUT) == layout and filters is None:
+                return
+            if self.__is_appended(group):
+                snapshots = [self.__read_snapshot(group=group, position=position)
+                             for position in range(self.__index(group).shape[0])]
+                timestamps = self.__index(group)[()]
+                scraping_times = group["scraping_times"][()] if snapshots else np.empty(0, dtype="S32")
+            else:
+                names = sorted((name for name in group.keys() if not name in RESERVED_NAMES), key=float)
+                if len({group[name].dtype for name in names}) > 1:
+                    raise ValueError(f"The datasets of group \"{group_name}\" have different data types.")
+                snapshots = [group[name][()] for name in names]
+                timestamps = np.array([float(name) for name in names], dtype="f8")
+                scraping_times = np.array([group[name].attrs["scraping_time"].encode() for name in names], dtype="S32")
+
+            parent = file[self.parent_name]
+            migration = parent.create_group(name=group_name + MIGRATION_SUFFIX)
+            try:
+                for name, value in group.attrs.items():
+                    if name != "data_type":
+                        migration.attrs[name] = value
+                migration.attrs["layout"] = layout
+                if filters is not None:
+                    migration.attrs["filters"] = json.dumps(filters)
+                if "column_names" in group:
+                    migration["column_names"] = group["column_names"][()]
+
+                if snapshots:
+                    lengths = np.array([snapshot.shape[0] for snapshot in snapshots], dtype="i8")
+                    hashes = np.array([self.__content_hash(snapshot) for snapshot in snapshots], dtype="S32")
+                    offsets = np.zeros(len(snapshots), dtype="i8")
+                    unique = []
+                    written = 0
+                    for position, snapshot in enumerate(snapshots):
+                        if self.deduplicate and position > 0 and hashes[position] == hashes[position-1]:
+                            offsets[position] = offsets[position-1]
+                            continue
+                        offsets[position] = written
+                        written += snapshot.shape[0]
+                        unique.append(snapshot)
+                    self.__create_appended_datasets(group=migration, data_type=snapshots[0].dtype)
+                    self.__write_rows(group=migration, data=np.concatenate(unique))
+                    index_values = (timestamps, offsets, lengths, scraping_times, hashes)
+                    for name, values in zip(INDEX_NAMES, index_values):
+                        migration[name].resize((values.shape[0],))
+                        migration[name][:] = values
+                file.flush()
+            except BaseException:
+                del parent[group_name + MIGRATION_SUFFIX]
+                raise
+
+            parent.move(group_name, group_name + RETIRED_SUFFIX)
+            parent.move(group_name + MIGRATION_SUFFIX, group_name)
+            del parent[group_name + RETIRED_SUFFIX]
+
+    def __finish_migration(self, file:h5py.File, group_name:str)->None:
+        """Cleans up after a migration of a group that was interrupted, e.g. by a crash.
+
+        A new group that was not completely written is deleted. If the old group was already
+        renamed, the new group is complete and takes its name.
+
+        Args:
+            file (h5py.File): The HDF5 file, opened for writing.
+            group_name (str): The name of the migrated group.
+        """
+        parent = file.get(self.parent_name)
+        if parent is None:
+            return
+        if group_name + RETIRED_SUFFIX in parent:
+            if not group_name in parent:
+                parent.move(group_name + MIGRATION_SUFFIX, group_name)
+            del parent[group_name + RETIRED_SUFFIX]
+        if group_name + MIGRATION_SUFFIX in parent:
+            del parent[group_name + MIGRATION_SUFFIX]
+
+    def set_granularity(self, group_name:str, granularity:int)->None:
+        """Sets the seconds of the time buckets new snapshots of a group are keyed by.
+
+        A granularity below a day moves a daily group into the APPENDED_LAYOUT first. The stored
+        snapshots keep their timestamps, snapshots of a daily group stay at the start of their day.
+
+        Args:
+            group_name (str): The name of the group.
+            granularity (int): The granularity in seconds, e.g. MINUTE_GRANULARITY.
+
+        Raises:
+            ValueError: If group_name not in database.
+            ValueError: If the granularity does not divide a day.
+        """
+        if granularity <= 0 or DAILY_GRANULARITY % granularity:
+            raise ValueError(f"The granularity {granularity} does not divide a day.")
+        with self.__open_file("r") as file:
+            is_appended = self.__is_appended(self.__get_group(file=file, group_name=group_name))
+        if granularity < DAILY_GRANULARITY and not is_appended:
+            self.migrate_layout(group_name=group_name)
+        with self.__open_file("a") as file:
+            group = self.__get_group(file=file, group_name=group_name)
+            group.attrs["granularity"] = granularity
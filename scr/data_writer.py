@@ -0,0 +1,234 @@
+from concurrent.futures import Future
+from datetime import date, datetime
+from typing import NamedTuple
+import queue
+import threading
+import numpy as np
+from data_collector import DataCollector
+
+MAX_BATCH:int = 64
+PLAIN_SESSION:str = "plain"
+SWMR_SESSION:str = "swmr"
+
+class WriteRequest(NamedTuple):
+    """A queued call of a write method of the DataCollector.
+
+    Attributes:
+        method (str): The name of the method, "store_data" or "store_column_names".
+        group_name (str): The group written to.
+        arguments (dict[str, any]): The keyword arguments of the call.
+        future (Future): Receives the result or the error of the call.
+    """
+    method:str
+    group_name:str
+    arguments:dict[str:any]
+    future:Future
+
+class DataWriter:
+    """Owns the HDF5 file of a DataCollector in one thread, which drains a queue of write requests.
+
+    Any thread may queue store_data and store_column_names calls, each returns a Future that
+    is resolved once the writer thread made the call. The writer keeps a session of the data
+    collector open and flushes it after every batch of queued requests, so readers see each
+    batch as a whole.
+
+    With a DataCollector opened with swmr, the session is switched to SWMR mode as soon as a
+    batch only appends to prepared groups, and readers of other processes can then open the file.
+    A batch that creates a group's datasets or column names is written in a plain session in
+    between, which blocks the readers for that batch only.
+
+    Reads of other threads of the process are served by the open session.
+
+    If a batch cannot be flushed or its session cannot be switched, the file is in an unknown
+    state: the requests of the batch and all queued requests fail with the error, the thread
+    stops, and further requests raise.
+
+    Args:
+        data_collector (DataCollector): The data collector whose file is written.
+        max_batch (int, optional): The maximal number of requests written between two flushes. Defaults to MAX_BATCH.
+    """
+
+    def __init__(self, data_collector:DataCollector, max_batch:int = None):
+        self.__data_collector:DataCollector = data_collector
+        if max_batch is None:
+            max_batch = MAX_BATCH
+        self.__max_batch:int = max_batch
+        self.__queue:queue.Queue = queue.Queue()
+        self.__thread:threading.Thread = None
+        self.__session:str = None
+        self.__lock:threading.Lock = threading.Lock()
+        self.__error:Exception = None
+
+    def __enter__(self)->"DataWriter":
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback)->None:
+        self.close()
+
+    def start(self)->None:
+        """Starts the writer thread."""
+        if self.__thread is None:
+            self.__error = None
+            self.__thread = threading.Thread(target=self.__run, name="data-writer", daemon=True)
+            self.__thread.start()
+
+    def close(self)->None:
+        """Writes all queued requests, ends the session and stops the writer thread."""
+        if self.__thread is not None:
+            self.__queue.put(None)
+            self.__thread.join()
+            self.__thread = None
+            while not self.__queue.empty():
+                # The stop request is left behind by a thread that stopped after an error.
+                self.__queue.get_nowait()
+
+    def store_data(self, data:np.array, group_name:str, scraping_time:datetime, data_date:date|datetime = None,
+                   overwrite:bool = False)->Future:
+        """Queues a call of DataCollector.store_data.
+
+        Args:
+            data (np.array): The data to store.
+            group_name (str): The name of the group to store the data in.
+            scraping_time (datetime): The time when the data was scraped.
+            data_date (date|datetime, optional): The date of the data. Defaults to today.
+            overwrite (bool, optional): Replaces data already stored for data_date. Defaults to False.
+
+        Returns:
+            Future: Resolved with None once the data is stored, or with the raised error.
+        """
+        return self.__put(method="store_data", group_name=group_name,
+                          arguments={"data": data, "scraping_time": scraping_time, "data_date": data_date,
+                                     "overwrite": overwrite})
+
+    def store_column_names(self, column_names:np.array, group_name:str)->Future:
+        """Queues a call of DataCollector.store_column_names.
+
+        Args:
+            column_names (np.array): The column names to store.
+            group_name (str): The name of the group to store the column names in.
+
+        Returns:
+            Future: Resolved with None once the column names are stored, or with the raised error.
+        """
+        return self.__put(method="store_column_names", group_name=group_name,
+                          arguments={"column_names": column_names})
+
+    def __put(self, method:str, group_name:str, arguments:dict[str:any])->Future:
+        """Queues a write request.
+
+        Args:
+            method (str): The name of the write method.
+            group_name (str): The group written to.
+            arguments (dict[str, any]): The keyword arguments of the call without the group name.
+
+        Raises:
+            ValueError: If the writer is not started or its thread stopped after an error.
+
+        Returns:
+            Future: The future of the request.
+        """
+        with self.__lock:
+            if self.__thread is None:
+                raise ValueError("The DataWriter is not started.")
+            if self.__error is not None or not self.__thread.is_alive():
+                raise ValueError(f"The DataWriter stopped after an error: {self.__error!r}.")
+            future = Future()
+            self.__queue.put(WriteRequest(method=method, group_name=group_name, arguments=arguments, future=future))
+        return future
+
+    def __run(self)->None:
+        """Drains the queue in batches until close() is called or writing fails, then ends the session."""
+        requests = []
+        try:
+            stop = False
+            while not stop:
+                requests = [self.__queue.get()]
+                while len(requests) < self.__max_batch:
+                    try:
+                        requests.append(self.__queue.get_nowait())
+                    except queue.Empty:
+                        break
+                stop = None in requests
+                requests = [request for request in requests if request is not None]
+                if requests:
+                    self.__write(requests=requests)
+                requests = []
+        except Exception as error:
+            self.__stop(error=error, requests=requests)
+        finally:
+            try:
+                self.__end_session()
+            except Exception as error:
+                self.__stop(error=error, requests=[])
+
+    def __stop(self, error:Exception, requests:list[WriteRequest])->None:
+        """Fails the unresolved requests of a batch and all queued requests, later requests raise.
+
+        Args:
+            error (Exception): The error writing failed with.
+            requests (list[WriteRequest]): The requests of the failed batch.
+        """
+        with self.__lock:
+            if self.__error is None:
+                self.__error = error
+            while True:
+                try:
+                    request = self.__queue.get_nowait()
+                except queue.Empty:
+                    break
+                if request is not None:
+                    requests.append(request)
+        for request in requests:
+            if not request.future.done():
+                request.future.set_exception(error)
+
+    def __write(self, requests:list[WriteRequest])->None:
+        """Makes the calls of a batch in a fitting session and flushes them.
+
+        The futures are resolved after the flush, a request that raised gets its error.
+
+        Args:
+            requests (list[WriteRequest]): The batch.
+
+        Raises:
+            Exception: If the session cannot be switched or the batch cannot be flushed.
+        """
+        session = PLAIN_SESSION
+        if self.__data_collector.swmr:
+            if self.__session is None:
+                self.__begin_session(session=PLAIN_SESSION)
+            if all(self.__data_collector.is_swmr_ready(group_name=request.group_name) for request in requests):
+                session = SWMR_SESSION
+        if self.__session != session:
+            self.__end_session()
+            self.__begin_session(session=session)
+        errors = {}
+        for request in requests:
+            try:
+                getattr(self.__data_collector, request.method)(group_name=request.group_name, **request.arguments)
+            except Exception as error:
+                errors[id(request)] = error
+        self.__data_collector.flush()
+        for request in requests:
+            if id(request) in errors:
+                request.future.set_exception(errors[id(request)])
+            else:
+                request.future.set_result(None)
+
+    def __begin_session(self, session:str)->None:
+        """Opens a session of the data collector.
+
+        Args:
+            session (str): PLAIN_SESSION or SWMR_SESSION.
+        """
+        self.__data_collector.__enter__()
+        self.__session = session
+        if session == SWMR_SESSION:
+            self.__data_collector.start_swmr()
+
+    def __end_session(self)->None:
+        """Flushes and closes the open session of the data collector."""
+        if self.__session is not None:
+            self.__session = None
+            self.__data_collector.__exit__(None, None, None)
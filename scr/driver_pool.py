@@ -0,0 +1,201 @@
+from contextlib import contextmanager
+from typing import Callable, Iterator
+import threading
+import time
+from selenium import webdriver
+from selenium.common.exceptions import WebDriverException
+from selenium.webdriver.chrome.webdriver import WebDriver
+
+POOL_SIZE:int = 2
+MAX_USES:int = 20
+
+def launch_chrome()->WebDriver:
+    """Launches a headless Chrome WebDriver.
+
+    Returns:
+        WebDriver: The launched WebDriver.
+    """
+    options = webdriver.ChromeOptions()
+    options.add_argument("--start-maximized")
+    options.add_argument("--headless=new")
+    return webdriver.Chrome(options=options)
+
+class DriverPool:
+    """A pool of warm headless browsers shared by all Selenium pages and their retries.
+
+    A released driver is reset (storage, cookies, extra tabs) and handed to the next caller
+    instead of launching a new browser. Drivers are quit after max_uses uses or when they no
+    longer respond. At most size drivers are checked out at the same time, acquire() blocks
+    until one is released.
+
+    Args:
+        size (int, optional): The maximal number of drivers. Defaults to POOL_SIZE.
+        max_uses (int, optional): The number of uses after which a driver is recycled. Defaults to MAX_USES.
+        launch (Callable[[], WebDriver], optional): Launches a new driver. Defaults to launch_chrome.
+    """
+
+    def __init__(self, size:int = None, max_uses:int = None, launch:Callable[[],WebDriver] = None):
+        if size is None:
+            size = POOL_SIZE
+        if max_uses is None:
+            max_uses = MAX_USES
+        if launch is None:
+            launch = launch_chrome
+        self.__max_uses:int = max_uses
+        self.__launch:Callable[[],WebDriver] = launch
+        self.__idle:list[WebDriver] = []
+        self.__uses:dict[int:int] = {}
+        self.__lock:threading.Lock = threading.Lock()
+        self.__slots:threading.BoundedSemaphore = threading.BoundedSemaphore(size)
+        self.__statistics:dict[str:float] = {"hits":0, "misses":0, "recycled":0, "crashed":0,
+                                              "launch_time":0.0}
+
+    @property
+    def statistics(self)->dict[str:float]:
+        """Returns the hit, miss, recycle and crash counts and the launch times of the pool.
+
+        Returns:
+            dict[str, float]: The pool statistics, launch times in seconds.
+        """
+        with self.__lock:
+            statistics = dict(self.__statistics)
+        statistics["mean_launch_time"] = statistics["launch_time"]/statistics["misses"] if statistics["misses"] else 0.0
+        return statistics
+
+    def acquire(self)->WebDriver:
+        """Returns a warm driver of the pool or launches a new one.
+
+        Returns:
+            WebDriver: The driver, to be given back with release().
+        """
+        self.__slots.acquire()
+        try:
+            while True:
+                with self.__lock:
+                    driver = self.__idle.pop() if self.__idle else None
+                if driver is None:
+                    break
+                if DriverPool.is_alive(driver):
+                    with self.__lock:
+                        self.__statistics["hits"] += 1
+                    return driver
+                self.__discard(driver=driver, reason="crashed")
+
+            start = time.perf_counter()
+            driver = self.__launch()
+            with self.__lock:
+                self.__statistics["misses"] += 1
+                self.__statistics["launch_time"] += time.perf_counter() - start
+                self.__uses[id(driver)] = 0
+            return driver
+        except BaseException:
+            self.__slots.release()
+            raise
+
+    def release(self, driver:WebDriver)->None:
+        """Gives a driver back to the pool.
+
+        The driver is quit instead if it crashed or reached max_uses.
+
+        Args:
+            driver (WebDriver): The driver returned by acquire().
+        """
+        try:
+            with self.__lock:
+                self.__uses[id(driver)] = self.__uses.get(id(driver), 0) + 1
+                worn_out = self.__uses[id(driver)] >= self.__max_uses
+            if worn_out:
+                self.__discard(driver=driver, reason="recycled")
+            elif DriverPool.reset(driver):
+                with self.__lock:
+                    self.__idle.append(driver)
+            else:
+                self.__discard(driver=driver, reason="crashed")
+        finally:
+            self.__slots.release()
+
+    @contextmanager
+    def driver(self)->Iterator[WebDriver]:
+        """Yields a driver of the pool and releases it afterwards.
+
+        Yields:
+            WebDriver: The driver.
+        """
+        driver = self.acquire()
+        try:
+            yield driver
+        finally:
+            self.release(driver)
+
+    def close(self)->None:
+        """Quits all idle drivers of the pool."""
+        with self.__lock:
+            idle, self.__idle = self.__idle, []
+        for driver in idle:
+            DriverPool.quit(driver)
+
+    def __discard(self, driver:WebDriver, reason:str)->None:
+        """Quits a driver and counts the reason.
+
+        Args:
+            driver (WebDriver): The driver to quit.
+            reason (str): "recycled" or "crashed".
+        """
+        with self.__lock:
+            self.__statistics[reason] += 1
+            self.__uses.pop(id(driver), None)
+        DriverPool.quit(driver)
+
+    @staticmethod
+    def is_alive(driver:WebDriver)->bool:
+        """Checks if the browser of a driver still responds.
+
+        Args:
+            driver (WebDriver): The driver to check.
+
+        Returns:
+            bool: True if the browser responds, False otherwise.
+        """
+        try:
+            driver.window_handles
+        except WebDriverException:
+            return False
+        return True
+
+    @staticmethod
+    def reset(driver:WebDriver)->bool:
+        """Clears storage and cookies, closes all but the first tab and opens a blank page.
+
+        Args:
+            driver (WebDriver): The driver to reset.
+
+        Returns:
+            bool: True if the driver could be reset, False if it crashed.
+        """
+        try:
+            try:
+                driver.execute_script("window.localStorage.clear(); window.sessionStorage.clear();")
+            except WebDriverException:
+                pass
+            driver.delete_all_cookies()
+            handles = driver.window_handles
+            for handle in handles[1:]:
+                driver.switch_to.window(handle)
+                driver.close()
+            driver.switch_to.window(handles[0])
+            driver.get("about:blank")
+        except WebDriverException:
+            return False
+        return True
+
+    @staticmethod
+    def quit(driver:WebDriver)->None:
+        """Quits a driver and ignores a browser that is already gone.
+
+        Args:
+            driver (WebDriver): The driver to quit.
+        """
+        try:
+            driver.quit()
+        except WebDriverException:
+            pass
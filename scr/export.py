@@ -0,0 +1,238 @@
+from datetime import date, datetime, timedelta
+from importlib.util import find_spec
+from urllib.parse import quote
+import os
+import numpy as np
+from data_collector import DataCollector
+
+ARROW_AVAILABLE:bool = find_spec("pyarrow") is not None
+EXPORT_DIRECTORY:str = "data/webpage_data.parquet"
+TIME_COLUMN:str = "time"
+COLUMN_COLUMN:str = "column"
+VALUE_COLUMN:str = "value"
+ENCODING:str = "utf-8"
+
+def unique_names(names:list[str], reserved:tuple[str] = ())->list[str]:
+    """Renames repeated names by appending "_1", "_2", ..., so every name is distinct.
+
+    Args:
+        names (list[str]): The names in order.
+        reserved (tuple[str], optional): Names that are taken already. Defaults to ().
+
+    Returns:
+        list[str]: The distinct names, names seen first keep their name.
+    """
+    used = set(reserved)
+    unique = []
+    for name in names:
+        if name in used:
+            number = 1
+            while f"{name}_{number}" in used:
+                number += 1
+            name = f"{name}_{number}"
+        used.add(name)
+        unique.append(name)
+    return unique
+
+def long_format(moments:np.ndarray, data:np.array, column_names:np.array,
+                encoding:str = None)->dict[str:np.ndarray|tuple[np.ndarray,np.ndarray]]:
+    """Melts rows read with DataCollector.get_rows into the long format, one row per row and float column.
+
+    The string columns identify a row and are repeated for each of its float columns, the float
+    columns become the "column" and "value" columns. Columns of repeated strings are returned
+    dictionary encoded as their codes and categories. All columns are built with numpy from the
+    arrays as read, without a loop over the rows. Only the distinct strings are decoded, and
+    strings that decode to the same text, e.g. bytes invalid in the encoding, share a category.
+    String columns named like another string column or like "time", "column" or "value", and
+    repeated float column names are renamed, see unique_names.
+
+    Args:
+        moments (np.ndarray): The moment of every row as datetime64[s].
+        data (np.array): The structured rows.
+        column_names (np.array): The column names of the fields of the rows in order.
+        encoding (str, optional): The encoding of the site the strings are stored in. Defaults to ENCODING.
+
+    Returns:
+        dict[str, np.ndarray|tuple[np.ndarray, np.ndarray]]: The "time" column, a column per string
+            column, the "column" and "value" columns, as arrays or as int32 codes and string categories.
+    """
+    if encoding is None:
+        encoding = ENCODING
+    names = [name.decode(encoding, errors="replace") for name in column_names]
+    label_columns = []
+    value_columns = []
+    first = 0
+    for field in data.dtype.names:
+        size = int(np.prod(data.dtype[field].shape))
+        values = data[field].reshape(data.shape[0], size)
+        if data.dtype[field].base.kind == "S":
+            label_columns += [(names[first + position], values[:, position]) for position in range(size)]
+        else:
+            value_columns += [(names[first + position], values[:, position]) for position in range(size)]
+        first += size
+
+    label_columns = list(zip(unique_names([name for name, _ in label_columns],
+                                          reserved=(TIME_COLUMN, COLUMN_COLUMN, VALUE_COLUMN)),
+                             [values for _, values in label_columns]))
+    value_columns = list(zip(unique_names([name for name, _ in value_columns]),
+                             [values for _, values in value_columns]))
+    num_columns = len(value_columns)
+    table = {TIME_COLUMN: np.repeat(moments, num_columns)}
+    for name, values in label_columns:
+        categories, codes = np.unique(values, return_inverse=True)
+        categories, decoded_codes = np.unique(np.char.decode(categories, encoding, errors="replace"),
+                                              return_inverse=True)
+        table[name] = (np.repeat(decoded_codes[codes].astype("i4"), num_columns), categories)
+    categories, codes = np.unique(np.array([name for name, _ in value_columns], dtype=str), return_inverse=True)
+    table[COLUMN_COLUMN] = (np.tile(codes.astype("i4"), data.shape[0]), categories)
+    if value_columns:
+        table[VALUE_COLUMN] = np.stack([values for _, values in value_columns], axis=1).ravel()
+    else:
+        table[VALUE_COLUMN] = np.empty(0, dtype="f4")
+    return table
+
+def to_arrow(data_collector:DataCollector, group_name:str, start:date|datetime = None, end:date|datetime = None,
+             columns:list[str|bytes] = None, encoding:str = None)->"pyarrow.Table":
+    """Exports the data of a group between two dates as an Arrow table in the long format, see long_format.
+
+    The numeric columns are handed to Arrow without copying, the string columns become
+    dictionary arrays.
+
+    Args:
+        data_collector (DataCollector): The data collector the data is stored in.
+        group_name (str): The name of the group.
+        start (date|datetime, optional): The first moment of the range. Defaults to the first stored date.
+        end (date|datetime, optional): The last moment of the range, a date includes its whole day. Defaults to today.
+        columns (list[str|bytes], optional): Names from get_column_names to export. Defaults to all columns.
+        encoding (str, optional): The encoding of the site the strings are stored in. Defaults to ENCODING.
+
+    Raises:
+        ImportError: If pyarrow is not installed.
+        ValueError: If group_name not in database or the data cannot be read, see DataCollector.get_rows.
+
+    Returns:
+        pyarrow.Table: The table.
+    """
+    if not ARROW_AVAILABLE:
+        raise ImportError("The Arrow export needs pyarrow, install it with \"pip install pyarrow\".")
+    import pyarrow as pa
+    moments, data, column_names = data_collector.get_rows(group_name=group_name, start=start, end=end,
+                                                          columns=columns)
+    table = long_format(moments=moments, data=data, column_names=column_names, encoding=encoding)
+    arrays = {}
+    for name, values in table.items():
+        if isinstance(values, tuple):
+            codes, categories = values
+            arrays[name] = pa.DictionaryArray.from_arrays(pa.array(codes), pa.array(categories, type=pa.string()))
+        else:
+            arrays[name] = pa.array(values)
+    return pa.table(arrays)
+
+def to_pandas(data_collector:DataCollector, group_name:str, start:date|datetime = None, end:date|datetime = None,
+              columns:list[str|bytes] = None, encoding:str = None)->"pandas.DataFrame":
+    """Exports the data of a group between two dates as a pandas DataFrame in the long format, see long_format.
+
+    The string columns become categoricals. pyarrow is not needed.
+
+    Args:
+        data_collector (DataCollector): The data collector the data is stored in.
+        group_name (str): The name of the group.
+        start (date|datetime, optional): The first moment of the range. Defaults to the first stored date.
+        end (date|datetime, optional): The last moment of the range, a date includes its whole day. Defaults to today.
+        columns (list[str|bytes], optional): Names from get_column_names to export. Defaults to all columns.
+        encoding (str, optional): The encoding of the site the strings are stored in. Defaults to ENCODING.
+
+    Raises:
+        ValueError: If group_name not in database or the data cannot be read, see DataCollector.get_rows.
+
+    Returns:
+        pandas.DataFrame: The data frame.
+    """
+    import pandas as pd
+    moments, data, column_names = data_collector.get_rows(group_name=group_name, start=start, end=end,
+                                                          columns=columns)
+    table = long_format(moments=moments, data=data, column_names=column_names, encoding=encoding)
+    return pd.DataFrame({name: pd.Categorical.from_codes(*values) if isinstance(values, tuple) else values
+                         for name, values in table.items()}, copy=False)
+
+def months(start:date, end:date)->list[tuple[date,date]]:
+    """Returns the first and the last day of every month from the month of start to the month of end.
+
+    Args:
+        start (date): A day of the first month.
+        end (date): A day of the last month.
+
+    Returns:
+        list[tuple[date, date]]: The first and last day of each month.
+    """
+    ranges = []
+    first = date(start.year, start.month, 1)
+    while first <= end:
+        following = (first + timedelta(days=32)).replace(day=1)
+        ranges.append((first, following - timedelta(days=1)))
+        first = following
+    return ranges
+
+def export_parquet(data_collector:DataCollector, directory:str = None, group_names:list[str] = None,
+                   start:date = None, end:date = None, encoding:str = None)->int:
+    """Exports the data of groups to Parquet files partitioned by group and month.
+
+    Each group and month is written to "group=<name>/month=<YYYY-MM>/data.parquet" in the long
+    format of to_arrow, so the directory reads as one dataset with hive partitioning, e.g. with
+    pyarrow.dataset or pandas.read_parquet. Whole months are exported and their files replaced,
+    exporting again after further runs refreshes the last month. Only one month is held in memory.
+
+    Args:
+        data_collector (DataCollector): The data collector the data is stored in.
+        directory (str, optional): The directory of the dataset. Defaults to EXPORT_DIRECTORY.
+        group_names (list[str], optional): The groups to export, groups without data are skipped.
+            Defaults to the groups of the data collector.
+        start (date, optional): A day of the first exported month. Defaults to the first stored date of each group.
+        end (date, optional): A day of the last exported month. Defaults to today.
+        encoding (str, optional): The encoding of the sites the strings are stored in, export
+            groups of sites with different encodings separately. Defaults to ENCODING.
+
+    Raises:
+        ImportError: If pyarrow is not installed.
+        ValueError: If the data of a group cannot be read.
+
+    Returns:
+        int: The number of written files.
+    """
+    if not ARROW_AVAILABLE:
+        raise ImportError("The Parquet export needs pyarrow, install it with \"pip install pyarrow\".")
+    import pyarrow.parquet as pq
+    if directory is None:
+        directory = EXPORT_DIRECTORY
+    if group_names is None:
+        group_names = list(data_collector.group_names)
+    if end is None:
+        end = date.today()
+    written = 0
+    for group_name in group_names:
+        try:
+            if not data_collector.is_saved_columns(group_name=group_name):
+                continue
+        except ValueError:
+            # The group of a site that was configured after the last run does not exist yet.
+            continue
+        first = start
+        if first is None:
+            snapshots = data_collector.get_range(group_name=group_name, end=end)
+            first = next(snapshots, (None, None))[0]
+            snapshots.close()
+            if first is None:
+                continue
+        for month_start, month_end in months(start=first, end=end):
+            table = to_arrow(data_collector=data_collector, group_name=group_name, start=month_start, end=month_end,
+                             encoding=encoding)
+            if table.num_rows == 0:
+                continue
+            path = os.path.join(directory, f"group={quote(group_name, safe='')}",
+                                f"month={month_start.strftime('%Y-%m')}", "data.parquet")
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            temporary_path = path + ".tmp"
+            pq.write_table(table, temporary_path)
+            os.replace(temporary_path, path)
+            written += 1
+    return written
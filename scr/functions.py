@@ -1,5 +1,15 @@
 from datetime import date, timedelta
+from itertools import accumulate
 from time import mktime
+import re
+import warnings
+import numpy as np
+
+CELL_SEPARATOR:str = "\x1f"
+NON_NUMERIC:re.Pattern = re.compile(r"[^0-9.,+\-\u2212\x1f]")
+VALID_FLOAT:re.Pattern = re.compile(r"[+-]?(\d+\.?\d*|\.\d+)")
+GERMAN_DECIMALS:dict[int:str] = str.maketrans({".":None, ",":".", "\u2212":"-"})
+ENGLISH_DECIMALS:dict[int:str] = str.maketrans({",":None, "\u2212":"-"})
 
 def get_float(text:str)->float:
     """Converts a string to a float, extracting digits and handling errors.
@@ -50,3 +60,57 @@ def get_start_end_time(day:date=None)->tuple[int]:
     end = int(mktime(end.timetuple())) - 1
     start = int(mktime(start.timetuple()))
     return start,end
+
+def get_float_array(texts:list[str], change_comma:bool = True)->np.ndarray:
+    """Converts a whole column of cell texts to floats at once.
+
+    All texts are joined and cleaned by one regular expression and one translation: units, percent
+    signs and spaces are dropped, thousands separators removed and the decimal comma of German
+    numbers becomes a point. NumPy then parses the joined string in one call. Texts that are no
+    number (empty cells, "-", "n/a") become NaN. If a text holds the CELL_SEPARATOR itself, the
+    texts are cleaned and parsed one by one instead.
+
+    Args:
+        texts (list[str]): The cell texts.
+        change_comma (bool, optional): Whether the texts use a decimal comma. Defaults to True.
+
+    Returns:
+        np.ndarray: The float32 values.
+    """
+    if len(texts) == 0:
+        return np.empty(0, dtype="f4")
+    table = GERMAN_DECIMALS if change_comma else ENGLISH_DECIMALS
+    joined = CELL_SEPARATOR.join(texts)
+    if joined.count(CELL_SEPARATOR) != len(texts) - 1:
+        cells = [NON_NUMERIC.sub("", text).replace(CELL_SEPARATOR, "").translate(table) for text in texts]
+        return np.array([float(cell) if VALID_FLOAT.fullmatch(cell) else np.nan for cell in cells], dtype="f4")
+    joined = CELL_SEPARATOR + NON_NUMERIC.sub("", joined).translate(table) + CELL_SEPARATOR
+    missing = CELL_SEPARATOR + "nan" + CELL_SEPARATOR
+    for empty in ("", "-", "+"):
+        cell = CELL_SEPARATOR + empty + CELL_SEPARATOR
+        joined = joined.replace(cell, missing).replace(cell, missing)
+    joined = joined[1:-1]
+    try:
+        with warnings.catch_warnings():
+            warnings.simplefilter("error", DeprecationWarning)
+            values = np.fromstring(joined, dtype="f8", sep=CELL_SEPARATOR)
+        if values.size == len(texts):
+            return values.astype("f4")
+    except (ValueError, DeprecationWarning):
+        pass
+    return np.array([float(text) if VALID_FLOAT.fullmatch(text) else np.nan
+                     for text in joined.split(CELL_SEPARATOR)], dtype="f4")
+
+def get_float_rows(rows:list[list[str]], change_comma:bool = True)->list[tuple[float]]:
+    """Converts the number cells of all table rows in one batch.
+
+    Args:
+        rows (list[list[str]]): The cell texts of each row.
+        change_comma (bool, optional): Whether the texts use a decimal comma. Defaults to True.
+
+    Returns:
+        list[tuple[float]]: The values of each row, NaN for cells that are not a number.
+    """
+    values = get_float_array(texts=[text for row in rows for text in row], change_comma=change_comma).tolist()
+    ends = list(accumulate(len(row) for row in rows))
+    return [tuple(values[start:end]) for start, end in zip([0] + ends[:-1], ends)]
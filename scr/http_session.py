@@ -0,0 +1,131 @@
+from importlib.util import find_spec
+import json
+import os
+import threading
+import requests
+from requests.adapters import HTTPAdapter
+
+if find_spec("brotli") or find_spec("brotlicffi"):
+    ACCEPT_ENCODING:str = "gzip, deflate, br"
+else:
+    ACCEPT_ENCODING:str = "gzip, deflate"
+
+VALIDATORS_PATH:str = "data/webpage_data.validators.json"
+POOL_CONNECTIONS:int = 10
+POOL_MAXSIZE:int = 10
+
+class PageNotModified(Exception):
+    """Raised when the server answers a conditional request with 304 Not Modified.
+
+    Args:
+        url (str): The URL of the unchanged page.
+    """
+
+    def __init__(self, url:str):
+        super().__init__(f"Page \"{url}\" not modified.")
+        self.url:str = url
+
+class HttpSession:
+    """A shared HTTP session with pooled keep-alive connections, compression and conditional requests.
+
+    The ETag and Last-Modified validators of every page are sent with the next request of the
+    same URL, so an unchanged page is answered with 304 and raises PageNotModified instead of
+    being downloaded and parsed again. Validators of a response only become active once the page
+    was parsed and commit() was called, and they are persisted as JSON next to the HDF5 file.
+
+    Args:
+        validators_path (str, optional): The JSON file of the validators. Defaults to VALIDATORS_PATH.
+        pool_connections (int, optional): The number of hosts with a connection pool. Defaults to POOL_CONNECTIONS.
+        pool_maxsize (int, optional): The number of connections kept per host. Defaults to POOL_MAXSIZE.
+    """
+
+    def __init__(self, validators_path:str = None, pool_connections:int = None, pool_maxsize:int = None):
+        if validators_path is None:
+            validators_path = VALIDATORS_PATH
+        self.validators_path:str = validators_path
+        if pool_connections is None:
+            pool_connections = POOL_CONNECTIONS
+        if pool_maxsize is None:
+            pool_maxsize = POOL_MAXSIZE
+
+        self.__session:requests.Session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize)
+        self.__session.mount("http://", adapter)
+        self.__session.mount("https://", adapter)
+        self.__session.headers["Accept-Encoding"] = ACCEPT_ENCODING
+
+        self.__lock:threading.Lock = threading.Lock()
+        self.__pending:dict[str:dict[str:str]] = {}
+        self.__validators:dict[str:dict[str:str]] = {}
+        if os.path.exists(self.validators_path):
+            with open(self.validators_path, encoding="utf-8") as file:
+                self.__validators = json.load(file)
+
+    def __enter__(self)->"HttpSession":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback)->None:
+        self.close()
+
+    def get(self, url:str, timeout:float = 10)->requests.Response:
+        """Sends a conditional GET request over the pooled connections.
+
+        Args:
+            url (str): The URL of the page.
+            timeout (float, optional): The timeout in seconds. Defaults to 10.
+
+        Raises:
+            PageNotModified: If the page did not change since the last committed response.
+            requests.HTTPError: If the server answers with an error code.
+
+        Returns:
+            requests.Response: The response.
+        """
+        with self.__lock:
+            validators = dict(self.__validators.get(url, {}))
+        headers = {}
+        if "etag" in validators:
+            headers["If-None-Match"] = validators["etag"]
+        if "last_modified" in validators:
+            headers["If-Modified-Since"] = validators["last_modified"]
+
+        response = self.__session.get(url=url, headers=headers, timeout=timeout)
+        if response.status_code == 304:
+            raise PageNotModified(url=url)
+        response.raise_for_status()
+
+        validators = {}
+        if "ETag" in response.headers:
+            validators["etag"] = response.headers["ETag"]
+        if "Last-Modified" in response.headers:
+            validators["last_modified"] = response.headers["Last-Modified"]
+        with self.__lock:
+            self.__pending[url] = validators
+        return response
+
+    def commit(self, url:str)->None:
+        """Activates the validators of the last response of a URL, after its page was parsed.
+
+        Args:
+            url (str): The URL of the page.
+        """
+        with self.__lock:
+            if url in self.__pending:
+                self.__validators[url] = self.__pending.pop(url)
+
+    def save(self)->None:
+        """Writes the committed validators to the JSON file."""
+        with self.__lock:
+            validators = dict(self.__validators)
+        directory = os.path.dirname(self.validators_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        temporary_path = self.validators_path + ".tmp"
+        with open(temporary_path, "w", encoding="utf-8") as file:
+            json.dump(validators, file, indent=2)
+        os.replace(temporary_path, self.validators_path)
+
+    def close(self)->None:
+        """Saves the validators and closes the pooled connections."""
+        self.save()
+        self.__session.close()
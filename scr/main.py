@@ -1,125 +1,411 @@
+from __future__ import annotations
 from datetime import date, datetime, timedelta
-import sys
-import time
-import csv
-import numpy as np
-from requests import RequestException
-from requests_scraper import RequestsScraper
-from selenium_scraper import SeleniumScraper
-from data_collector import DataCollector
-from inputimeout import inputimeout, TimeoutOccurred
+from typing import TYPE_CHECKING
+import argparse
+import os
+import functools
+import signal
+import tempfile
+import threading
+from functions import get_start_end_time
+from metrics import Metrics
+from response_cache import RawPages, ResponseCache
+from retry_policy import CircuitBreaker, RetryPolicy
+from scheduler import Schedule, Scheduler
+from site_config import REQUESTS_METHOD, SELENIUM_METHOD, SiteConfig, load_site_configs
+
+if TYPE_CHECKING:
+    import numpy as np
+    from driver_pool import DriverPool
+    from http_session import HttpSession
 
 PARENT_NAME = "webpages to be informed"
 DATA_PATH = "data/webpage_data.csv"
-COLUMN_NAMES = ["name","url","method","page_handler","cockie_handler",
-                "table_name", "is_german", "num_str_cols","num_float_cols","encoding"]
+DATA_COLLECTOR_PATH = "data/webpage_data.h5"
 LOG_FILE = "doc/scrape.log"
+LOG_LOCK = threading.Lock()
 
 def main():
     """
     Main function to execute the data collection process.
+    Runs as a headless service that scrapes every site when it is due, until SIGINT or SIGTERM.
+    With --once the due sites are scraped a single time, with --reparse the stored data is
+    rebuilt from the response cache instead. With --profile the fetch and parse of one site are
+    profiled with cProfile. The backfill command scrapes the missing days of a date range, the
+    export command writes the stored data to Parquet files.
+    Selenium, Requests and h5py are imported when a run needs them, not at start-up.
     
     """
-    with open(LOG_FILE,"a+") as file:
+    parser = argparse.ArgumentParser(prog="scraping", description="Scrapes the configured web pages when they are due.")
+    parser.add_argument("--reparse", action="store_true",
+                        help="rebuild the stored data from the response cache without network access")
+    parser.add_argument("--once", action="store_true",
+                        help="scrape the due web pages once and exit")
+    parser.add_argument("--profile", metavar="SITE",
+                        help="dump cProfile statistics of the fetch and parse of the site with this name")
+    commands = parser.add_subparsers(dest="command")
+    backfill_parser = commands.add_parser("backfill", help="scrape the missing days of a date range")
+    backfill_parser.add_argument("--from", dest="start", type=date.fromisoformat, required=True, metavar="DATE",
+                                 help="the first day, e.g. 2024-01-31")
+    backfill_parser.add_argument("--to", dest="end", type=date.fromisoformat, default=date.today(), metavar="DATE",
+                                 help="the last day, included, defaults to today")
+    backfill_parser.add_argument("--site", dest="sites", action="append", metavar="SITE",
+                                 help="backfill only this site, may be given several times")
+    export_parser = commands.add_parser("export", help="export the stored data to Parquet files per site and month")
+    export_parser.add_argument("--from", dest="start", type=date.fromisoformat, metavar="DATE",
+                               help="a day of the first month, defaults to the first stored day")
+    export_parser.add_argument("--to", dest="end", type=date.fromisoformat, default=date.today(), metavar="DATE",
+                               help="a day of the last month, defaults to today")
+    export_parser.add_argument("--site", dest="sites", action="append", metavar="SITE",
+                               help="export only this site, may be given several times")
+    export_parser.add_argument("--directory", metavar="DIRECTORY",
+                               help="the directory of the Parquet dataset, defaults to data/webpage_data.parquet")
+    args = parser.parse_args()
+    if args.reparse:
+        reparse_cache()
+        return
+    if args.command == "backfill":
+        backfill_dates(start=args.start, end=args.end, keys=args.sites)
+        return
+    if args.command == "export":
+        export_data(directory=args.directory, start=args.start, end=args.end, keys=args.sites)
+        return
+
+    with LOG_LOCK, open(LOG_FILE,"a+") as file:
         file.write(f"EXECUTED at \"{datetime.now().isoformat()}\":\n")
-    prozessing_time = datetime.combine(date.today(), datetime.min.time()) + timedelta(hours=10, minutes=00)
-    while True:
-        if datetime.now() < prozessing_time:
-            try:
-                inputimeout(prompt="To terminate prozess, insert anything", timeout=(prozessing_time-datetime.now()).total_seconds())
-            except TimeoutOccurred:
-                continue
-            with open(LOG_FILE,"a+") as file:
-                file.write(f"TERMINATED at \"{datetime.now().isoformat()}\":\n\n")
-            print("Process terminated.")
-            sys.exit()
-        prozessing_time = prozessing_time + timedelta(days=1)
-        collect()
+    wp_data = read_wp_data()
+    scheduler = Scheduler(schedules=get_schedules(wp_data), run=functools.partial(collect, profile_site=args.profile),
+                          state_path=os.path.splitext(DATA_COLLECTOR_PATH)[0] + ".schedule.json")
+    if args.once:
+        scheduler.run_pending()
+    else:
+        stop = threading.Event()
+        for signal_number in (signal.SIGINT, signal.SIGTERM):
+            signal.signal(signal_number, lambda signal_number, frame: stop.set())
+        scheduler.run_forever(stop=stop)
+    with LOG_LOCK, open(LOG_FILE,"a+") as file:
+        file.write(f"TERMINATED at \"{datetime.now().isoformat()}\":\n\n")
+    print("Process terminated.")
+
 
+def read_wp_data()->dict[str:SiteConfig]:
+    """
+    Reads the page configurations, the file is only parsed again after it changed.
+
+    Raises:
+        ValueError: If a configuration is malformed.
+
+    Returns:
+        dict[str, SiteConfig]: The page configurations by group name.
+    """
+    return load_site_configs(path=DATA_PATH)
 
-def collect()->None:
+def collect(keys:list[str] = None, due:datetime = None, profile_site:str = None)->None:
     """
     Collects data from specified web pages and stores it in the data collector.
+    The metrics of the run are exported to the metrics directory next to the data.
+    The results are written by a DataWriter in SWMR mode, other processes can read them during the run.
+
+    Args:
+        keys (list[str], optional): The group names of the web pages to collect. Defaults to all.
+        due (datetime, optional): The time the web pages were due, a past time for runs caught up
+            after a downtime. The data is always stored for the time it is scraped, per minute for
+            pages due more than once a day. Defaults to now.
+        profile_site (str, optional): The group name of the site that is profiled with cProfile. Defaults to None.
     """
-    wp_data = {}
+    from collection_engine import CollectionEngine, MAX_SELENIUM_WORKERS
+    from data_collector import DataCollector, COLUMNAR_LAYOUT, MINUTE_GRANULARITY
+    from data_writer import DataWriter
+    from http_session import HttpSession
+    from page_parser import parse_timed
+    wp_data = read_wp_data()
 
-    with open(DATA_PATH, encoding="utf-8-sig") as wp_data_file:
-        reader = csv.reader(wp_data_file, delimiter=";",dialect="excel")
+    data_collector = DataCollector(path=DATA_COLLECTOR_PATH, parent_name=PARENT_NAME,
+                                   group_names={key: data.url for key, data in wp_data.items()},
+                                   layout=COLUMNAR_LAYOUT, swmr=True)
 
-        for i,row in enumerate(reader):
-            if not i == 0:
-                wp_data[row[0]] = dict(zip(COLUMN_NAMES,row))
+    if keys is not None:
+        wp_data = {key: wp_data[key] for key in keys if key in wp_data}
+    run_time = datetime.now()
+    with LOG_LOCK, open(LOG_FILE,"a+") as file:
+        file.write(f"Collect {list(wp_data)} due at \"{(datetime.now() if due is None else due).isoformat()}\".\n")
 
-    wp_urls = [wp_data[key]["url"] for key in wp_data.keys()] 
-    data_collector = DataCollector(parent_name=PARENT_NAME, group_names= dict(zip(wp_data.keys(),wp_urls)))
+    driver_pool = None
+    if any(data.method == SELENIUM_METHOD for data in wp_data.values()):
+        from driver_pool import DriverPool
+        driver_pool = DriverPool(size=MAX_SELENIUM_WORKERS)
+    http_session = HttpSession(validators_path=os.path.splitext(data_collector.path)[0] + ".validators.json")
+    circuit_breaker = CircuitBreaker(path=os.path.splitext(data_collector.path)[0] + ".circuit_breaker.json")
+    granularities = {key: MINUTE_GRANULARITY for key, data in wp_data.items() if data.schedule.interval < timedelta(days=1)}
+    response_cache = ResponseCache(directory=os.path.splitext(data_collector.path)[0] + ".response_cache",
+                                   granularities=granularities)
+    metrics = Metrics(profile_site=profile_site, directory=os.path.splitext(data_collector.path)[0] + ".metrics")
+    data_writer = DataWriter(data_collector=data_collector)
+    engine = CollectionEngine(data_collector=data_collector,
+                              fetch=functools.partial(fetch_data, driver_pool=driver_pool,
+                                                      http_session=http_session,
+                                                      response_cache=response_cache),
+                              log=log_file,
+                              retry_policies=get_retry_policies(wp_data),
+                              circuit_breaker=circuit_breaker,
+                              parse=functools.partial(parse_timed, profile_site=profile_site,
+                                                      profile_directory=metrics.directory),
+                              parsed=lambda raw_pages: http_session.commit(url=raw_pages.url),
+                              metrics=metrics,
+                              data_writer=data_writer)
+    try:
+        with data_collector:
+            for key, granularity in granularities.items():
+                data_collector.set_granularity(group_name=key, granularity=granularity)
+        with data_writer:
+            engine.run(wp_data=wp_data, data_date=run_time)
+    finally:
+        if driver_pool is not None:
+            driver_pool.close()
+        http_session.close()
+        circuit_breaker.save()
+        response_cache.close()
+        metrics.write(run_time=run_time)
+        with LOG_LOCK, open(LOG_FILE,"a+") as file:
+            if driver_pool is not None:
+                file.write(f"Driver pool statistics: {driver_pool.statistics}\n")
+            file.write(f"Pipeline statistics: {engine.statistics}\n")
 
-    date_today = date.today()
+def reparse_cache()->None:
+    """
+    Rebuilds the stored data of every cached snapshot from the response cache.
+    """
+    from data_collector import DataCollector, COLUMNAR_LAYOUT
+    from reparse import reparse
+    wp_data = read_wp_data()
 
-    for key in wp_data:
-        if not data_collector.is_saved_columns(group_name=key):
-            column_data, data, scraping_time = get_data(wp_data[key])
-            data_collector.store_column_names(column_names=column_data, group_name=key)
-            data_collector.store_data(data=data,group_name=key,scraping_time=scraping_time,data_date=date_today)
+    data_collector = DataCollector(path=DATA_COLLECTOR_PATH, parent_name=PARENT_NAME,
+                                   group_names={key: data.url for key, data in wp_data.items()},
+                                   layout=COLUMNAR_LAYOUT)
 
-        elif not data_collector.is_saved_data(key,data_date=date_today):
-            _, data, scraping_time = get_data(wp_data[key])
-            data_collector.store_data(data=data,group_name=key,scraping_time=scraping_time,data_date=date_today)
-        
-        else:
-            print(f"{key} is saved in database at {str(date_today)}.")
+    granularities = {key: data_collector.get_granularity(group_name=key) for key in wp_data}
+    with ResponseCache(directory=os.path.splitext(data_collector.path)[0] + ".response_cache",
+                       granularities=granularities) as response_cache, data_collector:
+        rebuilt = reparse(wp_data=wp_data, data_collector=data_collector, response_cache=response_cache,
+                          log=log_file)
+    print(f"Rebuilt {rebuilt} snapshots from the response cache.")
 
-def get_data(data:dict[str])-> tuple[np.array]:
+def backfill_dates(start:date, end:date, keys:list[str] = None)->None:
     """
-    Retrieves data using the specified method (Selenium or Requests).
+    Scrapes the days from start to end that are missing in the stored data.
+    Only sites whose URL has the START and END placeholders serve past days, the others are skipped.
 
     Args:
-        data (dict[str]): The data configuration dictionary.
+        start (date): The first day.
+        end (date): The last day, included.
+        keys (list[str], optional): The group names of the sites to backfill. Defaults to all.
+    """
+    from backfill import backfill, is_backfillable
+    from data_collector import DataCollector, COLUMNAR_LAYOUT
+    from http_session import HttpSession
+    from page_parser import parse_pages
+    wp_data = read_wp_data()
+
+    data_collector = DataCollector(path=DATA_COLLECTOR_PATH, parent_name=PARENT_NAME,
+                                   group_names={key: data.url for key, data in wp_data.items()},
+                                   layout=COLUMNAR_LAYOUT)
+
+    if keys is not None:
+        wp_data = {key: wp_data[key] for key in keys if key in wp_data}
+    skipped = [key for key, data in wp_data.items() if not is_backfillable(data)]
+    if skipped:
+        print(f"{skipped} only serve the current data and are not backfilled.")
+    with LOG_LOCK, open(LOG_FILE,"a+") as file:
+        file.write(f"Backfill {[key for key in wp_data if not key in skipped]} "
+                   f"from \"{start.isoformat()}\" to \"{end.isoformat()}\".\n")
+
+    driver_pool = None
+    if any(data.method == SELENIUM_METHOD for data in wp_data.values()):
+        from collection_engine import MAX_SELENIUM_WORKERS
+        from driver_pool import DriverPool
+        driver_pool = DriverPool(size=MAX_SELENIUM_WORKERS)
+    # Past days are requested without the validators of the regular runs, they are never answered as not modified.
+    with tempfile.TemporaryDirectory() as directory, \
+            HttpSession(validators_path=os.path.join(directory, "validators.json")) as http_session:
+        try:
+            stored = backfill(wp_data=wp_data, data_collector=data_collector,
+                              fetch=functools.partial(fetch_data, driver_pool=driver_pool, http_session=http_session),
+                              parse=parse_pages, start=start, end=end, log=log_file)
+        finally:
+            if driver_pool is not None:
+                driver_pool.close()
+    print(f"Backfilled {stored} days.")
+
+def export_data(directory:str = None, start:date = None, end:date = None, keys:list[str] = None)->None:
+    """
+    Exports the stored data to Parquet files partitioned by site and month, see export.export_parquet.
+    The strings of every site are decoded with the encoding of its configuration.
+    The data file is read as an SWMR reader, so the export can run next to the service.
+
+    Args:
+        directory (str, optional): The directory of the Parquet dataset. Defaults to the one next to the data.
+        start (date, optional): A day of the first exported month. Defaults to the first stored day.
+        end (date, optional): A day of the last exported month. Defaults to today.
+        keys (list[str], optional): The group names of the sites to export. Defaults to all.
+    """
+    from data_collector import DataCollector
+    from export import export_parquet
+    wp_data = read_wp_data()
+    if keys is not None:
+        wp_data = {key: wp_data[key] for key in keys if key in wp_data}
+    if directory is None:
+        directory = os.path.splitext(DATA_COLLECTOR_PATH)[0] + ".parquet"
+
+    data_collector = DataCollector(path=DATA_COLLECTOR_PATH, parent_name=PARENT_NAME,
+                                   group_names={key: data.url for key, data in wp_data.items()},
+                                   swmr=True, read_only=True)
+    written = sum(export_parquet(data_collector=data_collector, directory=directory, group_names=[key],
+                                 start=start, end=end, encoding=data.encoding) for key, data in wp_data.items())
+    print(f"Exported {written} files to {directory}.")
+
+def fetch_data(data:SiteConfig, driver_pool:DriverPool = None, http_session:HttpSession = None,
+               response_cache:ResponseCache = None, day:date = None)-> RawPages|tuple[np.array]:
+    """
+    Fetches the raw pages of a web page in a single attempt, they are parsed by the parse stage
+    of the CollectionEngine. Selenium pages read element by element cannot be fetched without
+    parsing and are scraped completely with get_data.
+
+    Args:
+        data (SiteConfig): The page configuration.
+        driver_pool (DriverPool, optional): The pool Selenium takes its browsers from. Defaults to None.
+        http_session (HttpSession, optional): The session Requests sends its requests with. Defaults to None.
+        response_cache (ResponseCache, optional): The cache the raw pages are stored in. Defaults to None.
+        day (date, optional): The day whose time range replaces START and END in the URL. Defaults to today.
+
+    Raises:
+        PageNotModified: If a Requests page did not change since the last scrape.
+        ValueError: If the method of the page is unknown.
+
+    Returns:
+        RawPages|tuple[np.array]: The raw pages, or the column names, data array, and scraping time.
+    """
+    url = data.url_for(*get_start_end_time(day))
+    if data.method == REQUESTS_METHOD:
+        from requests_scraper import RequestsScraper
+        return RequestsScraper.fetch(name=data.name, url=url, http_session=http_session,
+                                     response_cache=response_cache)
+
+    from selenium_scraper import SeleniumScraper, PAGE_SOURCE_EXTRACTION, SCRIPT_EXTRACTION
+    if data.method == SELENIUM_METHOD and data.parser in ("", SCRIPT_EXTRACTION, PAGE_SOURCE_EXTRACTION):
+        return SeleniumScraper.fetch(name=data.name, url=url,
+                                     table_class_name=data.table_name,
+                                     cockie_handler=data.cockie_handler,
+                                     change_page_handler=data.page_handler,
+                                     driver_pool=driver_pool,
+                                     extraction=data.parser,
+                                     response_cache=response_cache)
+
+    return get_data(data=data, driver_pool=driver_pool, http_session=http_session, response_cache=response_cache,
+                    day=day)
+
+def get_data(data:SiteConfig, driver_pool:DriverPool = None, http_session:HttpSession = None,
+             response_cache:ResponseCache = None, day:date = None)-> tuple[np.array]:
+    """
+    Retrieves data using the specified method (Selenium or Requests) in a single attempt.
+    Retries are scheduled by the CollectionEngine with the retry policy of the page.
+
+    Args:
+        data (SiteConfig): The page configuration.
+        driver_pool (DriverPool, optional): The pool Selenium takes its browsers from. Defaults to None.
+        http_session (HttpSession, optional): The session Requests sends its requests with. Defaults to None.
+        response_cache (ResponseCache, optional): The cache the raw pages are stored in. Defaults to None.
+        day (date, optional): The day whose time range replaces START and END in the URL. Defaults to today.
+
+    Raises:
+        PageNotModified: If a Requests page did not change since the last scrape.
+        ValueError: If the method of the page is unknown.
 
     Returns:
         tuple[np.array]: The column names, data array, and scraping time.
     """
-    if data["method"] == "SELENIUM":
-        for i in range(5):
-            try:
-                scraper = SeleniumScraper(name=data["name"],url=data["url"],
-                                        table_class_name=data["table_name"],
-                                        is_german=data["is_german"],
-                                        cockie_handler=data["cockie_handler"],
-                                        change_page_handler=data["page_handler"],
-                                        encoding=data["encoding"]
-                                        )
-                log_file(name = data["name"], logging_datetime = scraper.scraping_time, success = True)
-                return (scraper.column_names, scraper.data_array, scraper.scraping_time)
-            # Warning: unspecified error handling. 
-            except Exception:
-                time.sleep(30)
-                continue
-        log_file(name = data["name"], logging_datetime = datetime.now(), success = False)
-
-    if data["method"] == "REQUESTS":
-        for i in range(5):
-            try:
-                scraper = RequestsScraper(name=data["name"],url=data["url"],
-                                        table_class_name=data["table_name"],
-                                        is_german=data["is_german"],
-                                        num_string_cols=int(data["num_str_cols"]),
-                                        num_float_cols=int(data["num_float_cols"]),
-                                        encoding=data["encoding"]
-                                        )
-                log_file(name = data["name"], logging_datetime = scraper.scraping_time, success = True)
-                return (scraper.column_names, scraper.data_array, scraper.scraping_time)
-            except RequestException:
-                time.sleep(30)
-                continue
-        log_file(name = data["name"], logging_datetime = datetime.now(), success = False)
-    
+    url = data.url_for(*get_start_end_time(day))
+    if data.method == SELENIUM_METHOD:
+        from selenium_scraper import SeleniumScraper
+        scraper = SeleniumScraper(name=data.name,url=url,
+                                table_class_name=data.table_name,
+                                is_german=data.is_german,
+                                cockie_handler=data.cockie_handler,
+                                change_page_handler=data.page_handler,
+                                encoding=data.encoding,
+                                driver_pool=driver_pool,
+                                extraction=data.parser,
+                                response_cache=response_cache
+                                )
+        return (scraper.column_names, scraper.data_array, scraper.scraping_time)
+
+    if data.method == REQUESTS_METHOD:
+        from requests_scraper import RequestsScraper
+        scraper = RequestsScraper(name=data.name,url=url,
+                                table_class_name=data.table_name,
+                                is_german=data.is_german,
+                                num_string_cols=data.num_str_cols,
+                                num_float_cols=data.num_float_cols,
+                                encoding=data.encoding,
+                                parser=data.parser,
+                                http_session=http_session,
+                                response_cache=response_cache
+                                )
+        return (scraper.column_names, scraper.data_array, scraper.scraping_time)
+
+    raise ValueError(f"Unknown method \"{data.method}\" of \"{data.name}\".")
+
+def get_schedules(wp_data:dict[str:SiteConfig])->dict[str:Schedule]:
+    """
+    Returns the schedule of every page, compiled from its INTERVAL column.
+
+    Args:
+        wp_data (dict[str, SiteConfig]): The page configurations by group name.
+
+    Returns:
+        dict[str, Schedule]: The schedule by group name.
+    """
+    return {key: data.schedule for key, data in wp_data.items()}
+
+def get_retryable_errors(method:str)->tuple[type[BaseException]]:
+    """
+    Returns the errors of the network or the browser of a method, importing only its backend.
+
+    Args:
+        method (str): REQUESTS_METHOD or SELENIUM_METHOD.
+
+    Returns:
+        tuple[type[BaseException]]: The errors worth a retry.
+    """
+    if method == SELENIUM_METHOD:
+        from selenium.common.exceptions import WebDriverException
+        return (WebDriverException,)
+    if method == REQUESTS_METHOD:
+        from requests import RequestException
+        return (RequestException,)
+    return ()
+
+def get_retry_policies(wp_data:dict[str:SiteConfig])->dict[str:RetryPolicy]:
+    """
+    Creates the retry policy of every page from its RETRY column.
+    Only errors of the network or the browser are retried, parsing errors fail at once.
+
+    Args:
+        wp_data (dict[str, SiteConfig]): The page configurations by group name.
+
+    Returns:
+        dict[str, RetryPolicy]: The retry policy by group name.
+    """
+    return {key: RetryPolicy.from_config(data.retry, retryable=get_retryable_errors(data.method))
+            for key, data in wp_data.items()}
+
 def log_file(name:str, logging_datetime:datetime, success:bool)->None:
-    if success:
-        with open(LOG_FILE,"a+") as file:
-            file.write(f"Write \"{name}\" on database from \"{logging_datetime.isoformat()}\".\n")
-    else:
-        with open(LOG_FILE,"a+") as file:
-            file.write(f"Failure: Could not write \"{name}\" on database from \"{logging_datetime.isoformat()}\".\n")
+    with LOG_LOCK:
+        if success:
+            with open(LOG_FILE,"a+") as file:
+                file.write(f"Write \"{name}\" on database from \"{logging_datetime.isoformat()}\".\n")
+        else:
+            with open(LOG_FILE,"a+") as file:
+                file.write(f"Failure: Could not write \"{name}\" on database from \"{logging_datetime.isoformat()}\".\n")
 
     
 
@@ -0,0 +1,246 @@
+from contextlib import AbstractContextManager, contextmanager, nullcontext
+from contextvars import ContextVar
+from datetime import datetime
+from typing import Iterator
+from urllib.parse import quote
+import cProfile
+import json
+import os
+import threading
+import time
+
+METRICS_DIRECTORY:str = "data/webpage_data.metrics"
+PREFIX:str = "scraping"
+STAGES:tuple[str] = ("fetch", "driver_launch", "page_load", "pagination", "parse", "numeric_conversion",
+                     "hdf5_write")
+COUNTERS:tuple[str] = ("bytes_downloaded", "rows_parsed", "retries", "failures")
+
+ACTIVE:ContextVar = ContextVar("active_metrics", default=None)
+
+class Metrics:
+    """Records the seconds spent in every stage of every site and counters like the downloaded bytes.
+
+    Code deep inside the scrapers does not know the site it works for. It reports through the
+    module functions stage and count, which record on the Metrics and the site activated for the
+    current thread by active, and do nothing outside of it. Metrics recorded in a worker process
+    are sent back as snapshot and added with merge.
+
+    Args:
+        profile_site (str, optional): The group name of the site whose stages run under cProfile. Defaults to None.
+        directory (str, optional): The directory of the exported metrics and the profiles. Defaults to METRICS_DIRECTORY.
+    """
+
+    def __init__(self, profile_site:str = None, directory:str = None):
+        self.profile_site:str = profile_site
+        if directory is None:
+            directory = METRICS_DIRECTORY
+        self.directory:str = directory
+        self.__lock:threading.Lock = threading.Lock()
+        self.__timings:dict[str:dict[str:list[float]]] = {}
+        self.__counters:dict[str:dict[str:float]] = {}
+
+    def observe(self, site:str, stage:str, seconds:float)->None:
+        """Records the duration of one pass through a stage.
+
+        Args:
+            site (str): The group name of the site.
+            stage (str): The stage, one of STAGES.
+            seconds (float): The duration.
+        """
+        with self.__lock:
+            timing = self.__timings.setdefault(site, {}).setdefault(stage, [0, 0.0, 0.0])
+            timing[0] += 1
+            timing[1] += seconds
+            timing[2] = max(timing[2], seconds)
+
+    def increment(self, site:str, counter:str, amount:float = 1)->None:
+        """Adds to a counter of a site.
+
+        Args:
+            site (str): The group name of the site.
+            counter (str): The counter, one of COUNTERS.
+            amount (float, optional): The amount added. Defaults to 1.
+        """
+        with self.__lock:
+            counters = self.__counters.setdefault(site, {})
+            counters[counter] = counters.get(counter, 0) + amount
+
+    @contextmanager
+    def timer(self, site:str, stage:str)->Iterator[None]:
+        """Records the duration of the block as one pass through a stage.
+
+        Args:
+            site (str): The group name of the site.
+            stage (str): The stage, one of STAGES.
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(site=site, stage=stage, seconds=time.perf_counter() - start)
+
+    @contextmanager
+    def active(self, site:str)->Iterator[None]:
+        """Makes stage and count record on these metrics for a site while the block runs in this thread.
+
+        Args:
+            site (str): The group name of the site.
+        """
+        token = ACTIVE.set((self, site))
+        try:
+            yield
+        finally:
+            ACTIVE.reset(token)
+
+    def profile(self, site:str, name:str)->AbstractContextManager:
+        """Returns a context manager that profiles the block for the profile site and dumps the statistics.
+
+        The statistics are written to "<site>.<name>.prof" in the directory, read them with pstats
+        or snakeviz. Other sites are not profiled.
+
+        Args:
+            site (str): The group name of the site.
+            name (str): The name of the profiled step, e.g. "fetch" or "parse".
+
+        Returns:
+            AbstractContextManager: The context manager.
+        """
+        if site != self.profile_site:
+            return nullcontext()
+        return self.__profiled(path=os.path.join(self.directory, f"{quote(site, safe='')}.{name}.prof"))
+
+    @staticmethod
+    @contextmanager
+    def __profiled(path:str)->Iterator[None]:
+        """Profiles the block and dumps the statistics to path.
+
+        Args:
+            path (str): The file of the statistics.
+        """
+        profile = cProfile.Profile()
+        profile.enable()
+        try:
+            yield
+        finally:
+            profile.disable()
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            profile.dump_stats(path)
+
+    def snapshot(self)->dict[str:dict]:
+        """Returns all recorded metrics.
+
+        Returns:
+            dict[str, dict]: The "timings" as count, seconds and max_seconds by site and stage,
+                and the "counters" by site and counter.
+        """
+        with self.__lock:
+            timings = {site: {stage: {"count": count, "seconds": seconds, "max_seconds": max_seconds}
+                              for stage, (count, seconds, max_seconds) in stages.items()}
+                       for site, stages in self.__timings.items()}
+            counters = {site: dict(values) for site, values in self.__counters.items()}
+        return {"timings": timings, "counters": counters}
+
+    def merge(self, snapshot:dict[str:dict])->None:
+        """Adds the metrics of a snapshot, e.g. of a worker process.
+
+        Args:
+            snapshot (dict[str, dict]): The snapshot.
+        """
+        with self.__lock:
+            for site, stages in snapshot["timings"].items():
+                for stage, values in stages.items():
+                    timing = self.__timings.setdefault(site, {}).setdefault(stage, [0, 0.0, 0.0])
+                    timing[0] += values["count"]
+                    timing[1] += values["seconds"]
+                    timing[2] = max(timing[2], values["max_seconds"])
+            for site, values in snapshot["counters"].items():
+                counters = self.__counters.setdefault(site, {})
+                for counter, amount in values.items():
+                    counters[counter] = counters.get(counter, 0) + amount
+
+    def to_prometheus(self)->str:
+        """Formats the metrics in the Prometheus text exposition format, e.g. for the textfile collector.
+
+        Returns:
+            str: The metrics.
+        """
+        snapshot = self.snapshot()
+        lines = [f"# HELP {PREFIX}_stage_seconds_total Seconds spent in a stage of the last run.",
+                 f"# TYPE {PREFIX}_stage_seconds_total counter"]
+        lines += [f"{PREFIX}_stage_seconds_total{{site=\"{escape(site)}\",stage=\"{stage}\"}} {values['seconds']}"
+                  for site, stages in snapshot["timings"].items() for stage, values in stages.items()]
+        lines += [f"# HELP {PREFIX}_stage_calls_total Passes through a stage in the last run.",
+                  f"# TYPE {PREFIX}_stage_calls_total counter"]
+        lines += [f"{PREFIX}_stage_calls_total{{site=\"{escape(site)}\",stage=\"{stage}\"}} {values['count']}"
+                  for site, stages in snapshot["timings"].items() for stage, values in stages.items()]
+        lines += [f"# HELP {PREFIX}_stage_max_seconds Longest pass through a stage in the last run.",
+                  f"# TYPE {PREFIX}_stage_max_seconds gauge"]
+        lines += [f"{PREFIX}_stage_max_seconds{{site=\"{escape(site)}\",stage=\"{stage}\"}} {values['max_seconds']}"
+                  for site, stages in snapshot["timings"].items() for stage, values in stages.items()]
+        for counter in COUNTERS:
+            lines += [f"# HELP {PREFIX}_{counter}_total The {counter.replace('_', ' ')} of the last run.",
+                      f"# TYPE {PREFIX}_{counter}_total counter"]
+            lines += [f"{PREFIX}_{counter}_total{{site=\"{escape(site)}\"}} {values[counter]}"
+                      for site, values in snapshot["counters"].items() if counter in values]
+        lines += [f"# HELP {PREFIX}_last_run_timestamp_seconds The time the last run was exported.",
+                  f"# TYPE {PREFIX}_last_run_timestamp_seconds gauge",
+                  f"{PREFIX}_last_run_timestamp_seconds {time.time()}"]
+        return "\n".join(lines) + "\n"
+
+    def write(self, run_time:datetime = None)->None:
+        """Exports the metrics of a run to the directory.
+
+        "metrics.prom" holds the last run in the Prometheus text format, "runs.jsonl" gets one
+        JSON summary per run appended.
+
+        Args:
+            run_time (datetime, optional): The start of the run. Defaults to now.
+        """
+        if run_time is None:
+            run_time = datetime.now()
+        os.makedirs(self.directory, exist_ok=True)
+        prometheus_path = os.path.join(self.directory, "metrics.prom")
+        temporary_path = prometheus_path + ".tmp"
+        with open(temporary_path, "w", encoding="utf-8") as file:
+            file.write(self.to_prometheus())
+        os.replace(temporary_path, prometheus_path)
+        with open(os.path.join(self.directory, "runs.jsonl"), "a", encoding="utf-8") as file:
+            file.write(json.dumps({"run_time": run_time.isoformat(), **self.snapshot()}) + "\n")
+
+def escape(value:str)->str:
+    """Escapes a Prometheus label value.
+
+    Args:
+        value (str): The value.
+
+    Returns:
+        str: The escaped value.
+    """
+    return value.replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+@contextmanager
+def stage(name:str)->Iterator[None]:
+    """Records the duration of the block as a stage of the active site, see Metrics.active.
+
+    Args:
+        name (str): The stage, one of STAGES.
+    """
+    active = ACTIVE.get()
+    if active is None:
+        yield
+        return
+    metrics, site = active
+    with metrics.timer(site=site, stage=name):
+        yield
+
+def count(name:str, amount:float = 1)->None:
+    """Adds to a counter of the active site, see Metrics.active.
+
+    Args:
+        name (str): The counter, one of COUNTERS.
+        amount (float, optional): The amount added. Defaults to 1.
+    """
+    active = ACTIVE.get()
+    if active is not None:
+        metrics, site = active
+        metrics.increment(site=site, counter=name, amount=amount)
@@ -0,0 +1,73 @@
+from concurrent.futures import ProcessPoolExecutor
+import multiprocessing
+import time
+import numpy as np
+from metrics import Metrics
+from response_cache import REQUESTS_PAGE, RawPages
+from site_config import SiteConfig
+
+START_METHOD:str = "forkserver"
+
+def parse_pool(max_workers:int = None)->ProcessPoolExecutor:
+    """Returns a process pool for the parse functions, whose workers are started by a fork server.
+
+    The workers are not forked from the calling process, which runs fetch and writer threads
+    and holds the HDF5 file open, so they inherit neither locks held by those threads nor the
+    file. The parse functions and their arguments are passed to the workers by pickling.
+
+    Args:
+        max_workers (int, optional): The number of worker processes. Defaults to the number of CPUs.
+
+    Returns:
+        ProcessPoolExecutor: The pool.
+    """
+    return ProcessPoolExecutor(max_workers=max_workers, mp_context=multiprocessing.get_context(START_METHOD))
+
+def parse_pages(data:SiteConfig, raw_pages:RawPages)->tuple[np.array]:
+    """Parses the raw pages of a site with the parser of its scraper.
+
+    Only the module of that scraper is imported, so a worker parsing Requests pages never loads Selenium.
+
+    Args:
+        data (SiteConfig): The page configuration.
+        raw_pages (RawPages): The fetched pages.
+
+    Raises:
+        ValueError: If the kind is unknown or the table is not found.
+
+    Returns:
+        tuple[np.array]: The column names and the table data.
+    """
+    if raw_pages.kind == REQUESTS_PAGE:
+        from requests_scraper import RequestsScraper
+        return RequestsScraper.parse_content(content=raw_pages.pages[0], table_name=data.table_name,
+                                             num_string_cols=data.num_str_cols,
+                                             num_float_cols=data.num_float_cols,
+                                             is_german=data.is_german, encoding=data.encoding,
+                                             parser=data.parser)
+    from selenium_scraper import SeleniumScraper
+    return SeleniumScraper.parse_raw_pages(raw_pages=raw_pages, table_name=data.table_name,
+                                           is_german=data.is_german, encoding=data.encoding)
+
+def parse_timed(data:SiteConfig, raw_pages:RawPages, profile_site:str = None,
+                profile_directory:str = None)->tuple[tuple[np.array],float,dict[str:dict]]:
+    """Parses the raw pages of a site and measures the parsing time in the worker process.
+
+    The stages inside the parser are recorded on metrics of the worker process, which are
+    returned to be merged into the Metrics of the run.
+
+    Args:
+        data (SiteConfig): The page configuration.
+        raw_pages (RawPages): The fetched pages.
+        profile_site (str, optional): The site whose parsing is profiled with cProfile. Defaults to None.
+        profile_directory (str, optional): The directory of the profile. Defaults to METRICS_DIRECTORY.
+
+    Returns:
+        tuple[tuple[np.array], float, dict[str, dict]]: The column names and table data, the parsing
+            time in seconds, and the snapshot of the metrics recorded while parsing.
+    """
+    metrics = Metrics(profile_site=profile_site, directory=profile_directory)
+    start = time.perf_counter()
+    with metrics.active(data.name), metrics.profile(data.name, "parse"):
+        result = parse_pages(data=data, raw_pages=raw_pages)
+    return result, time.perf_counter() - start, metrics.snapshot()
@@ -0,0 +1,73 @@
+from concurrent.futures import as_completed
+from datetime import datetime
+from typing import Callable
+import numpy as np
+from data_collector import DataCollector
+from page_parser import parse_pages, parse_pool
+from response_cache import RawPages, ResponseCache
+from site_config import SiteConfig
+
+def parse_cached(data:SiteConfig, kind:str, paths:list[str], scraping_time:datetime)->tuple[np.array]:
+    """Reads the cached pages of a site and parses them with the parser of its scraper.
+
+    Runs in a worker process, the pages are read there and only the results are sent back.
+
+    Args:
+        data (SiteConfig): The page configuration.
+        kind (str): What the pages hold, one of the KINDS of the ResponseCache.
+        paths (list[str]): The files of the cached pages.
+        scraping_time (datetime): The time when the pages were scraped.
+
+    Raises:
+        ValueError: If the kind is unknown or the table is not found.
+
+    Returns:
+        tuple[np.array]: The column names and the table data.
+    """
+    raw_pages = RawPages(kind=kind, pages=[ResponseCache.read_page(path) for path in paths],
+                         scraping_time=scraping_time, url=data.url)
+    return parse_pages(data=data, raw_pages=raw_pages)
+
+def reparse(wp_data:dict[str:SiteConfig], data_collector:DataCollector, response_cache:ResponseCache,
+            max_workers:int = None, log:Callable[[str,datetime,bool],None] = None)->int:
+    """Rebuilds the stored data of every cached snapshot from the response cache, without network access.
+
+    The pages are parsed on a process pool, the results are written by the calling process
+    only, replacing the data stored in the time bucket of each cache entry: the day of daily
+    sites, the bucket of the scraping time of sub-daily sites, see ResponseCache.bucket.
+
+    Args:
+        wp_data (dict[str, SiteConfig]): The page configurations by group name.
+        data_collector (DataCollector): The data collector the results are stored in.
+        response_cache (ResponseCache): The cache of the raw pages.
+        max_workers (int, optional): The number of worker processes. Defaults to the number of CPUs.
+        log (Callable[[str, datetime, bool], None], optional): Logs the success or failure of a page. Defaults to None.
+
+    Returns:
+        int: The number of rebuilt snapshots.
+    """
+    rebuilt = 0
+    with parse_pool(max_workers=max_workers) as pool:
+        jobs = {}
+        for site, bucket in response_cache.entries():
+            if not site in wp_data:
+                continue
+            kind, paths, scraping_time = response_cache.locate(site=site, data_date=bucket)
+            jobs[pool.submit(parse_cached, wp_data[site], kind, paths, scraping_time)] = (site, bucket, scraping_time)
+
+        for future in as_completed(jobs):
+            site, bucket, scraping_time = jobs[future]
+            try:
+                column_names, data = future.result()
+            except Exception:
+                if log is not None:
+                    log(site, scraping_time, False)
+                continue
+            if not data_collector.is_saved_columns(group_name=site):
+                data_collector.store_column_names(column_names=column_names, group_name=site)
+            data_collector.store_data(data=data, group_name=site, scraping_time=scraping_time,
+                                      data_date=bucket, overwrite=True)
+            rebuilt += 1
+            if log is not None:
+                log(site, scraping_time, True)
+    return rebuilt
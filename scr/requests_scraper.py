@@ -2,8 +2,16 @@ from datetime import datetime
 import numpy as np
 import requests
 from bs4 import BeautifulSoup, element
-from functions import get_float, get_point_deci, get_start_end_time
+from lxml import etree
+from functions import get_float_rows
+from http_session import HttpSession, PageNotModified
+from metrics import count, stage
+from response_cache import REQUESTS_PAGE, RawPages, ResponseCache
 from scraper import Scraper
+from table_parser import first_text, iterfind_table, joined_text
+
+BS4_PARSER:str = "BS4"
+LXML_PARSER:str = "LXML"
 
 class RequestsScraper(Scraper):
     """A concrete implementation of the Scraper abstract base class using Requests and BeautifulSoup for web scraping.
@@ -16,6 +24,12 @@ class RequestsScraper(Scraper):
         num_string_cols (int): The number of string columns in the table.
         num_float_cols (int): The number of float columns in the table.
         encoding (str, optional): The encoding of the data. Defaults to None.
+        parser (str, optional): LXML_PARSER parses the page incrementally with lxml and stops after
+            the table, BS4_PARSER builds the whole page with BeautifulSoup. Defaults to BS4_PARSER.
+        http_session (HttpSession, optional): The shared session for pooled, conditional requests.
+            Defaults to None, which sends a plain request.
+        response_cache (ResponseCache, optional): The cache the downloaded page is stored in before
+            it is parsed. Defaults to None.
 
     Attributes:
         name (str): The name of the scraped webpage.
@@ -24,21 +38,23 @@ class RequestsScraper(Scraper):
         data_array (np.array): The data collected from the webpage as a numpy array.
     """
 
-    def __init__(self,name:str, url:str, table_class_name:str, is_german:bool, num_string_cols:int, num_float_cols:int, encoding:str = None):
+    def __init__(self,name:str, url:str, table_class_name:str, is_german:bool, num_string_cols:int, num_float_cols:int, encoding:str = None, parser:str = None,
+                 http_session:HttpSession = None, response_cache:ResponseCache = None):
         self.__name:str = name
-        start, end = get_start_end_time()
-        url.replace("START",str(start)).replace("END",str(end))
         if encoding is None:
             encoding = "UTF-8"
-        table = RequestsScraper.get_table(url=url,table_name=table_class_name)
-        self.__scraping_time:datetime = datetime.now()
-        self.__column_names:np.array = RequestsScraper.get_column_names(table=table,encoding=encoding)
-        self.__data_array:np.array = RequestsScraper.get_table_data(table=table,
-                                                         num_string_cols=num_string_cols,
-                                                         num_float_cols=num_float_cols,
-                                                         is_german=is_german,
-                                                         encoding=encoding
-                                                         )
+        raw_pages = RequestsScraper.fetch(name=name, url=url, http_session=http_session, response_cache=response_cache)
+        self.__scraping_time:datetime = raw_pages.scraping_time
+        self.__column_names, self.__data_array = RequestsScraper.parse_content(content=raw_pages.pages[0],
+                                                                               table_name=table_class_name,
+                                                                               num_string_cols=num_string_cols,
+                                                                               num_float_cols=num_float_cols,
+                                                                               is_german=is_german,
+                                                                               encoding=encoding,
+                                                                               parser=parser
+                                                                               )
+        if http_session is not None:
+            http_session.commit(url=raw_pages.url)
 
     @property
     def name(self)->str:
@@ -57,45 +73,146 @@ class RequestsScraper(Scraper):
         return self.__scraping_time
 
     @staticmethod
-    def get_table(url:str, table_name:str)->element.Tag:
+    def fetch(name:str, url:str, http_session:HttpSession = None, response_cache:ResponseCache = None)->RawPages:
+        """Downloads the webpage without parsing it and stores it in the response cache.
+
+        Args:
+            name (str): The name of the scraped webpage.
+            url (str): The URL to scrape, with the time range filled in, see SiteConfig.url_for.
+            http_session (HttpSession, optional): The session to send the request with. Defaults to None.
+            response_cache (ResponseCache, optional): The cache the page is stored in. Defaults to None.
+
+        Raises:
+            PageNotModified: If the page did not change since the last request of the session.
+            requests.RequestException: If the page could not be downloaded.
+
+        Returns:
+            RawPages: The downloaded page.
+        """
+        try:
+            content = RequestsScraper.get_page(url=url,http_session=http_session)
+        except PageNotModified:
+            if response_cache is not None:
+                response_cache.link(site=name, scraping_time=datetime.now())
+            raise
+        raw_pages = RawPages(kind=REQUESTS_PAGE, pages=[content], scraping_time=datetime.now(), url=url)
+        if response_cache is not None:
+            response_cache.put(site=name, scraping_time=raw_pages.scraping_time, kind=raw_pages.kind,
+                               pages=raw_pages.pages)
+        return raw_pages
+
+    @staticmethod
+    def get_table(url:str, table_name:str, parser:str = None, http_session:HttpSession = None)->element.Tag|etree._Element:
         """Returns the table with the specified class name from the webpage with the given URL.
 
         Args:
             url (str): the URL of the webpage
             table_name (str): The class name of the table.
+            parser (str, optional): BS4_PARSER or LXML_PARSER. Defaults to BS4_PARSER.
+            http_session (HttpSession, optional): The session to send the request with. Defaults to None.
+
+        Raises:
+            PageNotModified: If the page did not change since the last request of the session.
+            requests.Timeout: Requests timeout.
+            requests.HTTPError: Code: {page.status_code}
+            requests.RequestException: Request Exception
+
+        Returns:
+            element.Tag|etree._Element: The table element from the webpage.
+        """
+        content = RequestsScraper.get_page(url=url, http_session=http_session)
+        return RequestsScraper.parse_page(content=content, table_name=table_name, parser=parser)
+
+    @staticmethod
+    def get_page(url:str, http_session:HttpSession = None)->bytes:
+        """Downloads the webpage with the given URL.
+
+        Args:
+            url (str): the URL of the webpage
+            http_session (HttpSession, optional): The session to send the request with. Defaults to None.
 
         Raises:
+            PageNotModified: If the page did not change since the last request of the session.
             requests.Timeout: Requests timeout.
             requests.HTTPError: Code: {page.status_code}
             requests.RequestException: Request Exception
 
         Returns:
-            element.Tag: The table element from the webpage.
+            bytes: The content of the webpage.
         """
         try:
-            page = requests.get(url=url,timeout=10)
-            page.raise_for_status()
+            with stage("page_load"):
+                if http_session is None:
+                    page = requests.get(url=url,timeout=10)
+                    page.raise_for_status()
+                else:
+                    page = http_session.get(url=url,timeout=10)
         except requests.Timeout as exc:
             raise requests.Timeout("Requests timeout.") from exc
         except requests.HTTPError as exc:
-            raise requests.HTTPError(f"Code: {page.status_code}") from exc
+            raise requests.HTTPError(f"Code: {exc.response.status_code}") from exc
         except requests.RequestException as exc:
             raise requests.RequestException("Request Exception") from exc
 
-        soup = BeautifulSoup(page.content,features="lxml")
+        count("bytes_downloaded", len(page.content))
+        return page.content
+
+    @staticmethod
+    def parse_page(content:bytes, table_name:str, parser:str = None)->element.Tag|etree._Element:
+        """Returns the table with the specified class name from the content of a webpage.
+
+        Args:
+            content (bytes): The content of the webpage.
+            table_name (str): The class name of the table.
+            parser (str, optional): BS4_PARSER or LXML_PARSER. Defaults to BS4_PARSER.
+
+        Returns:
+            element.Tag|etree._Element: The table element.
+        """
+        if parser == LXML_PARSER:
+            return iterfind_table(page=content, table_class_name=table_name)
+        soup = BeautifulSoup(content,features="lxml")
         return soup.find(class_=table_name)
 
     @staticmethod
-    def get_column_names(table:element.Tag, encoding:str)->np.array:
+    def parse_content(content:bytes, table_name:str, num_string_cols:int, num_float_cols:int, is_german:bool,
+                      encoding:str, parser:str = None)->tuple[np.array]:
+        """Parses the column names and the data of the table from the content of a webpage.
+
+        Args:
+            content (bytes): The content of the webpage.
+            table_name (str): The class name of the table.
+            num_string_cols (int): The number of string columns in the table.
+            num_float_cols (int): The number of float columns in the table.
+            is_german (bool): Whether the data is in German format.
+            encoding (str): The encoding of the data.
+            parser (str, optional): BS4_PARSER or LXML_PARSER. Defaults to BS4_PARSER.
+
+        Returns:
+            tuple[np.array]: The column names and the table data.
+        """
+        table = RequestsScraper.parse_page(content=content, table_name=table_name, parser=parser)
+        column_names = RequestsScraper.get_column_names(table=table, encoding=encoding)
+        data_array = RequestsScraper.get_table_data(table=table, num_string_cols=num_string_cols,
+                                                    num_float_cols=num_float_cols, is_german=is_german,
+                                                    encoding=encoding)
+        return column_names, data_array
+
+    @staticmethod
+    def get_column_names(table:element.Tag|etree._Element, encoding:str)->np.array:
         """Retrieves the column names from the table.
 
         Args:
-            table (element.Tag): The table element.
+            table (element.Tag|etree._Element): The table element of either parser.
             encoding (str): The encoding of the data.
 
         Returns:
             np.array: The column names.
         """
+        if isinstance(table, etree._Element):
+            column_names = [joined_text(name).encode(encoding=encoding) for name in table.xpath("(.//thead)[1]//th")]
+            return np.array(column_names, dtype="S20")
+
         head = table.find("thead")
         column_names = [str(name.getText(strip=True)).encode(encoding=encoding) for name in head.find_all("th")]
         
@@ -103,11 +220,11 @@ class RequestsScraper(Scraper):
 
 
     @staticmethod
-    def get_table_data(table:element.Tag, num_string_cols:int, num_float_cols:int, is_german:bool, encoding:str)->np.array:
+    def get_table_data(table:element.Tag|etree._Element, num_string_cols:int, num_float_cols:int, is_german:bool, encoding:str)->np.array:
         """Retrieves the data from the table.
 
         Args:
-            table (element.Tag): The table element.
+            table (element.Tag|etree._Element): The table element of either parser.
             num_string_cols (int): The number of string columns in the table.
             num_float_cols (int): The number of float columns in the table.
             is_german (bool): Whether the data is in German format.
@@ -117,24 +234,29 @@ class RequestsScraper(Scraper):
             np.array: The table data.
         """
 
-        data=[]
-        for row in table.find("tbody").find_all("tr"):
+        if isinstance(table, etree._Element):
+            rows = [[first_text(cell) for cell in row.xpath(".//td")] for row in table.xpath("(.//tbody)[1]//tr")]
+        else:
+            rows = [[list(cell.stripped_strings)[0] if cell.getText(strip=True) else "" for cell in row.find_all("td")]
+                    for row in table.find("tbody").find_all("tr")]
+
+        string_rows = []
+        float_rows = []
+        for row in rows:
             string_data = []
             float_data = []
-            for i,cell in enumerate(row.find_all("td")):
-                text = list(cell.stripped_strings)[0] if cell.getText(strip=True) else ""
+            for i,text in enumerate(row):
                 if i<num_string_cols:
                     string_data.append(text.encode(encoding=encoding))
                 elif i>= num_string_cols:
-                    text = get_point_deci(text=text,change_comma=(is_german=="TRUE"))
-                    try:
-                        text = get_float(text=text)
-                        float_data.append(text)
-                    except ValueError:
-                        float_data.append(None)
+                    float_data.append(text)
                 if i>=num_float_cols+num_string_cols-1:
                     break
-            data.append((tuple(string_data),tuple(float_data)))
+            string_rows.append(tuple(string_data))
+            float_rows.append(float_data)
+        with stage("numeric_conversion"):
+            float_rows = get_float_rows(rows=float_rows, change_comma=(is_german in (True, "TRUE")))
+        data = list(zip(string_rows, float_rows))
 
         data_type = np.dtype([("","S20",(num_string_cols,)),("","f4",(num_float_cols,))])
         return np.array(data, dtype=data_type)
@@ -0,0 +1,321 @@
+from datetime import date, datetime, timedelta
+import gzip
+import hashlib
+import json
+import os
+import threading
+import time
+from typing import NamedTuple
+
+CACHE_DIRECTORY:str = "data/webpage_data.response_cache"
+MAX_BYTES:int = 512*1024**2
+COMPRESSION_LEVEL:int = 6
+DAILY_GRANULARITY:int = 86400
+
+REQUESTS_PAGE:str = "requests_page"
+PAGE_SOURCES:str = "page_sources"
+TABLES:str = "tables"
+KINDS:tuple[str] = (REQUESTS_PAGE, PAGE_SOURCES, TABLES)
+
+class RawPages(NamedTuple):
+    """The raw pages of one scrape, fetched but not yet parsed.
+
+    Attributes:
+        kind (str): What the pages hold, one of KINDS.
+        pages (list[bytes]): The raw pages.
+        scraping_time (datetime): The time when the pages were scraped.
+        url (str): The URL the pages were fetched from.
+    """
+    kind:str
+    pages:list[bytes]
+    scraping_time:datetime
+    url:str
+
+class ResponseCache:
+    """An on-disk cache of the raw responses of every scraped page, keyed by site and time bucket.
+
+    The bucket of a scrape is its date for daily sites, and the start of the time bucket of its
+    scraping time for sites stored with a sub-daily granularity, like the groups of DataCollector,
+    so every stored snapshot keeps its own pages.
+
+    The pages are stored gzip compressed under the SHA-256 of their content, so a page that
+    did not change is stored only once, however many days refer to it. The entries are evicted
+    least recently used first once the compressed pages exceed max_bytes. The index of the
+    entries is persisted as JSON in the cache directory. Pages written after the index was last
+    saved, e.g. before a crash, are found again when the cache is opened: pages no entry refers
+    to are deleted, so max_bytes keeps bounding the disk use.
+
+    Args:
+        directory (str, optional): The directory of the cache. Defaults to CACHE_DIRECTORY.
+        max_bytes (int, optional): The maximal size of the compressed pages. Defaults to MAX_BYTES.
+        granularities (dict[str, int], optional): The seconds of the time buckets by site, sites
+            not listed are daily. Defaults to None.
+    """
+
+    def __init__(self, directory:str = None, max_bytes:int = None, granularities:dict[str:int] = None):
+        if directory is None:
+            directory = CACHE_DIRECTORY
+        self.directory:str = directory
+        if max_bytes is None:
+            max_bytes = MAX_BYTES
+        self.max_bytes:int = max_bytes
+        if granularities is None:
+            granularities = {}
+        self.granularities:dict[str:int] = granularities
+        self.__lock:threading.Lock = threading.Lock()
+        self.__entries:dict[str:dict] = {}
+        self.__sizes:dict[str:int] = {}
+        self.__pinned:dict[str:int] = {}
+        index_path = os.path.join(self.directory, "index.json")
+        if os.path.exists(index_path):
+            with open(index_path, encoding="utf-8") as file:
+                index = json.load(file)
+            self.__entries = index["entries"]
+            self.__sizes = index["sizes"]
+        self.__scan_objects()
+
+    def __enter__(self)->"ResponseCache":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback)->None:
+        self.close()
+
+    @property
+    def size(self)->int:
+        """Returns the size of all compressed pages in bytes.
+
+        Returns:
+            int: The size in bytes.
+        """
+        with self.__lock:
+            return sum(self.__sizes.values())
+
+    @staticmethod
+    def __key(site:str, bucket:date|datetime)->str:
+        return f"{site}/{bucket.isoformat()}"
+
+    @staticmethod
+    def __as_datetime(bucket:date|datetime)->datetime:
+        if isinstance(bucket, datetime):
+            return bucket
+        return datetime(bucket.year, bucket.month, bucket.day)
+
+    def bucket(self, site:str, scraping_time:datetime)->date|datetime:
+        """Returns the time bucket a scrape of a site is cached under.
+
+        Args:
+            site (str): The group name of the site.
+            scraping_time (datetime): The time when the pages were scraped.
+
+        Returns:
+            date|datetime: The date for daily sites, else the start of the bucket, counted from midnight.
+        """
+        granularity = self.granularities.get(site, DAILY_GRANULARITY)
+        if granularity >= DAILY_GRANULARITY:
+            return scraping_time.date()
+        midnight = datetime(scraping_time.year, scraping_time.month, scraping_time.day)
+        seconds = (scraping_time - midnight).total_seconds()
+        return midnight + timedelta(seconds=seconds//granularity*granularity)
+
+    def __path(self, digest:str)->str:
+        return os.path.join(self.directory, "objects", digest[:2], digest + ".gz")
+
+    def __scan_objects(self)->None:
+        """Brings the page sizes in line with the page files, after a run that did not save the index.
+
+        Unfinished temporary files and pages no entry refers to are deleted, the sizes of pages
+        that are gone are forgotten.
+        """
+        objects = os.path.join(self.directory, "objects")
+        referenced = {digest for entry in self.__entries.values() for digest in entry["pages"]}
+        found = set()
+        if os.path.isdir(objects):
+            for prefix in os.listdir(objects):
+                for name in os.listdir(os.path.join(objects, prefix)):
+                    path = os.path.join(objects, prefix, name)
+                    digest = name[:-len(".gz")]
+                    if name.endswith(".gz") and digest in referenced:
+                        found.add(digest)
+                        self.__sizes[digest] = os.path.getsize(path)
+                    else:
+                        os.remove(path)
+        self.__sizes = {digest: size for digest, size in self.__sizes.items() if digest in found}
+
+    def __write_page(self, page:bytes, digest:str)->int:
+        """Writes a page under its content hash, unless it is stored already.
+
+        The content hash has to be pinned, so eviction does not delete the page between the check
+        for its file and its registration.
+
+        Args:
+            page (bytes): The page.
+            digest (str): The content hash of the page.
+
+        Returns:
+            int: The compressed size.
+        """
+        path = self.__path(digest)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            temporary_path = f"{path}.{threading.get_ident()}.tmp"
+            with open(temporary_path, "wb") as file:
+                file.write(gzip.compress(page, compresslevel=COMPRESSION_LEVEL, mtime=0))
+            os.replace(temporary_path, path)
+        return os.path.getsize(path)
+
+    def put(self, site:str, scraping_time:datetime, kind:str, pages:list[bytes])->None:
+        """Stores the raw pages of a scrape, replacing an entry of the same site and bucket, see bucket.
+
+        Args:
+            site (str): The group name of the site.
+            scraping_time (datetime): The time when the pages were scraped.
+            kind (str): What the pages hold, one of KINDS.
+            pages (list[bytes]): The raw pages.
+
+        Raises:
+            ValueError: If the kind is unknown.
+        """
+        if not kind in KINDS:
+            raise ValueError(f"Unknown kind \"{kind}\" of cached pages.")
+        digests = [hashlib.sha256(page).hexdigest() for page in pages]
+        with self.__lock:
+            for digest in digests:
+                self.__pinned[digest] = self.__pinned.get(digest, 0) + 1
+        try:
+            sizes = [self.__write_page(page=page, digest=digest) for page, digest in zip(pages, digests)]
+            with self.__lock:
+                self.__sizes.update(zip(digests, sizes))
+                self.__entries[self.__key(site, self.bucket(site=site, scraping_time=scraping_time))] = {
+                    "kind": kind,
+                    "pages": digests,
+                    "scraping_time": scraping_time.isoformat(),
+                    "last_access": time.time()}
+                self.__evict()
+        finally:
+            with self.__lock:
+                for digest in digests:
+                    self.__pinned[digest] -= 1
+                    if not self.__pinned[digest]:
+                        self.__pinned.pop(digest)
+
+    def link(self, site:str, scraping_time:datetime)->bool:
+        """Refers the bucket of scraping_time to the latest earlier pages of a site, for unchanged pages.
+
+        Args:
+            site (str): The group name of the site.
+            scraping_time (datetime): The time when the page was found unchanged.
+
+        Returns:
+            bool: True if earlier pages were found, False otherwise.
+        """
+        bucket = self.bucket(site=site, scraping_time=scraping_time)
+        with self.__lock:
+            buckets = [moment for name, moment in self.__names()
+                       if name == site and self.__as_datetime(moment) < self.__as_datetime(bucket)]
+            if not buckets:
+                return False
+            entry = dict(self.__entries[self.__key(site, max(buckets, key=self.__as_datetime))])
+            entry["scraping_time"] = scraping_time.isoformat()
+            entry["last_access"] = time.time()
+            self.__entries[self.__key(site, bucket)] = entry
+            return True
+
+    def locate(self, site:str, data_date:date|datetime)->tuple[str,list[str],datetime]:
+        """Returns the files of the cached pages of a site and bucket, read them with read_page.
+
+        Args:
+            site (str): The group name of the site.
+            data_date (date|datetime): The bucket as returned by entries.
+
+        Raises:
+            ValueError: If no pages are cached for the site and bucket.
+
+        Returns:
+            tuple[str, list[str], datetime]: The kind, the page files, and the scraping time.
+        """
+        with self.__lock:
+            entry = self.__entries.get(self.__key(site, data_date))
+            if entry is None:
+                raise ValueError(f"No pages of \"{site}\" cached at {data_date.isoformat()}.")
+            entry["last_access"] = time.time()
+            return (entry["kind"], [self.__path(digest) for digest in entry["pages"]],
+                    datetime.fromisoformat(entry["scraping_time"]))
+
+    def get(self, site:str, data_date:date|datetime)->tuple[str,list[bytes]]:
+        """Returns the cached pages of a site and bucket.
+
+        Args:
+            site (str): The group name of the site.
+            data_date (date|datetime): The bucket as returned by entries.
+
+        Raises:
+            ValueError: If no pages are cached for the site and bucket.
+
+        Returns:
+            tuple[str, list[bytes]]: The kind and the raw pages.
+        """
+        kind, paths, _ = self.locate(site=site, data_date=data_date)
+        return kind, [ResponseCache.read_page(path) for path in paths]
+
+    @staticmethod
+    def read_page(path:str)->bytes:
+        """Reads and decompresses a cached page.
+
+        Args:
+            path (str): The file of the page.
+
+        Returns:
+            bytes: The raw page.
+        """
+        with open(path, "rb") as file:
+            return gzip.decompress(file.read())
+
+    def entries(self)->list[tuple[str,date|datetime]]:
+        """Returns the site and bucket of every cached entry.
+
+        Returns:
+            list[tuple[str, date|datetime]]: The sites and their dates, or the starts of their
+                buckets for sub-daily sites, sorted.
+        """
+        with self.__lock:
+            return sorted(self.__names(), key=lambda name: (name[0], self.__as_datetime(name[1])))
+
+    def __names(self)->list[tuple[str,date|datetime]]:
+        names = []
+        for key in self.__entries:
+            site, bucket = key.rsplit("/", 1)
+            names.append((site, datetime.fromisoformat(bucket) if "T" in bucket else date.fromisoformat(bucket)))
+        return names
+
+    def __evict(self)->None:
+        """Removes the least recently used entries until the pages fit into max_bytes.
+
+        Pages are deleted once no entry refers to them and no put() is writing them, the newest
+        entry is always kept. The directories of the pages are kept, so a concurrent write into
+        them cannot fail.
+        """
+        by_access = sorted(self.__entries, key=lambda key: self.__entries[key]["last_access"])
+        while len(by_access) > 1 and sum(self.__sizes.values()) > self.max_bytes:
+            self.__entries.pop(by_access.pop(0))
+            referenced = {digest for entry in self.__entries.values() for digest in entry["pages"]}
+            for digest in [digest for digest in self.__sizes
+                           if not digest in referenced and not digest in self.__pinned]:
+                self.__sizes.pop(digest)
+                path = self.__path(digest)
+                if os.path.exists(path):
+                    os.remove(path)
+
+    def save(self)->None:
+        """Writes the index of the entries to the cache directory."""
+        with self.__lock:
+            index = {"entries": dict(self.__entries), "sizes": dict(self.__sizes)}
+        os.makedirs(self.directory, exist_ok=True)
+        index_path = os.path.join(self.directory, "index.json")
+        temporary_path = index_path + ".tmp"
+        with open(temporary_path, "w", encoding="utf-8") as file:
+            json.dump(index, file)
+        os.replace(temporary_path, index_path)
+
+    def close(self)->None:
+        """Saves the index of the entries."""
+        self.save()
@@ -0,0 +1,177 @@
+from datetime import date
+import json
+import os
+import random
+import threading
+
+MAX_ATTEMPTS:int = 5
+INITIAL_DELAY:float = 5.0
+MAX_DELAY:float = 120.0
+MAX_ELAPSED:float = 600.0
+MULTIPLIER:float = 2.0
+JITTER:float = 0.5
+FAILURE_THRESHOLD:int = 3
+COOL_DOWN_DAYS:int = 3
+CIRCUIT_BREAKER_PATH:str = "data/webpage_data.circuit_breaker.json"
+
+class RetryPolicy:
+    """Decides if and when a failed scrape is tried again.
+
+    The delay grows exponentially with every attempt, is capped at max_delay and randomly
+    shortened by up to the jitter fraction, so retries of different sites do not line up.
+
+    Args:
+        retryable (tuple[type[BaseException]], optional): The errors worth a retry. Defaults to (Exception,).
+        max_attempts (int, optional): The maximal number of attempts. Defaults to MAX_ATTEMPTS.
+        initial_delay (float, optional): The seconds before the second attempt. Defaults to INITIAL_DELAY.
+        max_delay (float, optional): The maximal seconds between two attempts. Defaults to MAX_DELAY.
+        max_elapsed (float, optional): The seconds after the first attempt in which retries start. Defaults to MAX_ELAPSED.
+        multiplier (float, optional): The growth of the delay per attempt. Defaults to MULTIPLIER.
+        jitter (float, optional): The fraction the delay is randomly shortened by. Defaults to JITTER.
+    """
+
+    def __init__(self, retryable:tuple[type[BaseException]] = None, max_attempts:int = None,
+                 initial_delay:float = None, max_delay:float = None, max_elapsed:float = None,
+                 multiplier:float = None, jitter:float = None):
+        self.retryable:tuple[type[BaseException]] = (Exception,) if retryable is None else retryable
+        self.max_attempts:int = MAX_ATTEMPTS if max_attempts is None else max_attempts
+        self.initial_delay:float = INITIAL_DELAY if initial_delay is None else initial_delay
+        self.max_delay:float = MAX_DELAY if max_delay is None else max_delay
+        self.max_elapsed:float = MAX_ELAPSED if max_elapsed is None else max_elapsed
+        self.multiplier:float = MULTIPLIER if multiplier is None else multiplier
+        self.jitter:float = JITTER if jitter is None else jitter
+
+    @classmethod
+    def from_config(cls, text:str, retryable:tuple[type[BaseException]] = None)->"RetryPolicy":
+        """Creates a policy from the RETRY column of the page configuration.
+
+        The column holds "max_attempts|initial_delay|max_delay|max_elapsed", empty or missing
+        fields keep their defaults.
+
+        Args:
+            text (str): The configuration, may be empty.
+            retryable (tuple[type[BaseException]], optional): The errors worth a retry. Defaults to (Exception,).
+
+        Raises:
+            ValueError: If a field is not a number.
+
+        Returns:
+            RetryPolicy: The policy.
+        """
+        fields = (text or "").split("|")
+        fields += [""]*(4 - len(fields))
+        max_attempts, initial_delay, max_delay, max_elapsed = [field.strip() for field in fields[:4]]
+        return cls(retryable=retryable,
+                   max_attempts=int(max_attempts) if max_attempts else None,
+                   initial_delay=float(initial_delay) if initial_delay else None,
+                   max_delay=float(max_delay) if max_delay else None,
+                   max_elapsed=float(max_elapsed) if max_elapsed else None)
+
+    def delay(self, attempt:int)->float:
+        """Returns the seconds to wait after a failed attempt.
+
+        Args:
+            attempt (int): The number of the failed attempt, starting at 1.
+
+        Returns:
+            float: The delay in seconds.
+        """
+        delay = min(self.max_delay, self.initial_delay*self.multiplier**(attempt - 1))
+        return random.uniform(delay*(1 - self.jitter), delay)
+
+    def should_retry(self, attempt:int, elapsed:float, error:BaseException)->bool:
+        """Checks if a failed attempt is tried again.
+
+        Args:
+            attempt (int): The number of the failed attempt, starting at 1.
+            elapsed (float): The seconds since the first attempt started.
+            error (BaseException): The error of the failed attempt.
+
+        Returns:
+            bool: True if another attempt is made, False otherwise.
+        """
+        return isinstance(error, self.retryable) and attempt < self.max_attempts and elapsed < self.max_elapsed
+
+class CircuitBreaker:
+    """Skips sites that failed on several days since their last success.
+
+    A site is skipped for cool_down_days after its failure_threshold-th failing day since the
+    last success, the failing days need not be consecutive. Afterwards it is tried again, one
+    success closes the circuit and one more failing day opens it again. The failures are
+    persisted as JSON, so the state survives between runs.
+
+    Args:
+        path (str, optional): The JSON file of the failures. Defaults to CIRCUIT_BREAKER_PATH.
+        failure_threshold (int, optional): The failing days since the last success that open the circuit. Defaults to FAILURE_THRESHOLD.
+        cool_down_days (int, optional): The days a site is skipped. Defaults to COOL_DOWN_DAYS.
+    """
+
+    def __init__(self, path:str = None, failure_threshold:int = None, cool_down_days:int = None):
+        self.path:str = CIRCUIT_BREAKER_PATH if path is None else path
+        self.failure_threshold:int = FAILURE_THRESHOLD if failure_threshold is None else failure_threshold
+        self.cool_down_days:int = COOL_DOWN_DAYS if cool_down_days is None else cool_down_days
+        self.__lock:threading.Lock = threading.Lock()
+        self.__failures:dict[str:dict] = {}
+        if os.path.exists(self.path):
+            with open(self.path, encoding="utf-8") as file:
+                self.__failures = json.load(file)
+
+    def is_open(self, key:str, day:date = None)->bool:
+        """Checks if a site is skipped.
+
+        Args:
+            key (str): The group name of the site.
+            day (date, optional): The day of the run, a datetime counts as its day. Defaults to today.
+
+        Returns:
+            bool: True if the site is skipped, False otherwise.
+        """
+        if day is None:
+            day = date.today()
+        day = date(day.year, day.month, day.day)
+        with self.__lock:
+            failures = self.__failures.get(key)
+        if failures is None or failures["days"] < self.failure_threshold:
+            return False
+        return (day - date.fromisoformat(failures["last_failure"])).days < self.cool_down_days
+
+    def record_failure(self, key:str, day:date = None)->None:
+        """Counts a failing day of a site, several failures on one day count once.
+
+        Args:
+            key (str): The group name of the site.
+            day (date, optional): The day of the failure, a datetime counts as its day. Defaults to today.
+        """
+        if day is None:
+            day = date.today()
+        day = date(day.year, day.month, day.day)
+        with self.__lock:
+            failures = self.__failures.setdefault(key, {"days":0, "last_failure":None})
+            if failures["last_failure"] != day.isoformat():
+                failures["days"] += 1
+                failures["last_failure"] = day.isoformat()
+
+    def record_success(self, key:str)->None:
+        """Closes the circuit of a site.
+
+        Args:
+            key (str): The group name of the site.
+        """
+        with self.__lock:
+            self.__failures.pop(key, None)
+
+    def save(self)->None:
+        """Writes the failures to the JSON file.
+
+        The file is written under a temporary name and then replaced, so a crash while saving
+        leaves the previous failures intact.
+        """
+        with self.__lock:
+            failures = {key: dict(value) for key, value in self.__failures.items()}
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        temporary_path = self.path + ".tmp"
+        with open(temporary_path, "w", encoding="utf-8") as file:
+            json.dump(failures, file, indent=2)
+        os.replace(temporary_path, self.path)
@@ -0,0 +1,174 @@
+from datetime import datetime, time, timedelta
+from typing import Callable
+import heapq
+import json
+import os
+import re
+import threading
+import traceback
+
+DEFAULT_INTERVAL:str = "1d@10:00"
+SCHEDULE_PATH:str = "data/webpage_data.schedule.json"
+MAX_SLEEP:float = 60.0
+UNITS:dict[str:str] = {"s":"seconds", "m":"minutes", "h":"hours", "d":"days"}
+INTERVAL_PATTERN:re.Pattern = re.compile(r"^\s*(\d+)\s*([smhd])\s*(?:@\s*(\d{1,2}):(\d{2}))?\s*$")
+
+class Schedule:
+    """The times a site is due: every interval, counted from an anchor time of the day.
+
+    Args:
+        interval (timedelta): The time between two runs.
+        anchor (time, optional): The time of the day the runs are aligned to. Defaults to midnight.
+
+    Raises:
+        ValueError: If the interval is not positive.
+    """
+
+    def __init__(self, interval:timedelta, anchor:time = None):
+        if interval <= timedelta(0):
+            raise ValueError("The interval of a schedule has to be positive.")
+        self.interval:timedelta = interval
+        self.anchor:time = time.min if anchor is None else anchor
+
+    @classmethod
+    def from_config(cls, text:str)->"Schedule":
+        """Creates a schedule from the INTERVAL column of the page configuration.
+
+        The column holds a number with the unit s, m, h or d and optionally the anchor time,
+        e.g. "15m", "1h" or "1d@10:00". An empty column means DEFAULT_INTERVAL.
+
+        Args:
+            text (str): The configuration, may be empty.
+
+        Raises:
+            ValueError: If the configuration is malformed.
+
+        Returns:
+            Schedule: The schedule.
+        """
+        match = INTERVAL_PATTERN.match(text or DEFAULT_INTERVAL)
+        if match is None:
+            raise ValueError(f"Malformed interval \"{text}\".")
+        number, unit, hour, minute = match.groups()
+        anchor = None if hour is None else time(hour=int(hour), minute=int(minute))
+        return cls(interval=timedelta(**{UNITS[unit]: int(number)}), anchor=anchor)
+
+    def next_due(self, after:datetime)->datetime:
+        """Returns the first due time strictly after a time.
+
+        Args:
+            after (datetime): The time.
+
+        Returns:
+            datetime: The due time.
+        """
+        base = datetime.combine(after.date(), self.anchor)
+        return base + ((after - base)//self.interval + 1)*self.interval
+
+    def last_due(self, before:datetime)->datetime:
+        """Returns the last due time at or before a time.
+
+        Args:
+            before (datetime): The time.
+
+        Returns:
+            datetime: The due time.
+        """
+        return self.next_due(before) - self.interval
+
+class Scheduler:
+    """Runs the sites when they are due, keeping a priority queue of their next due times.
+
+    Sites due at the same time run together in one call of run. The time of the last run of
+    every site is persisted as JSON, so after a downtime every site that missed a due time
+    runs once at start-up. Missed due times are caught up by one run, not by one run each.
+
+    Args:
+        schedules (dict[str, Schedule]): The schedule by group name.
+        run (Callable[[list[str], datetime], None]): Runs the due sites, called with their group
+            names and the due time.
+        state_path (str, optional): The JSON file of the last runs. Defaults to SCHEDULE_PATH.
+    """
+
+    def __init__(self, schedules:dict[str:Schedule], run:Callable[[list[str],datetime],None],
+                 state_path:str = None):
+        self.__schedules:dict[str:Schedule] = schedules
+        self.__run:Callable[[list[str],datetime],None] = run
+        if state_path is None:
+            state_path = SCHEDULE_PATH
+        self.state_path:str = state_path
+        self.__last_runs:dict[str:str] = {}
+        if os.path.exists(self.state_path):
+            with open(self.state_path, encoding="utf-8") as file:
+                self.__last_runs = json.load(file)
+        self.__queue:list[tuple[datetime,str]] = []
+        now = datetime.now()
+        for key, schedule in schedules.items():
+            if key in self.__last_runs:
+                due = schedule.next_due(datetime.fromisoformat(self.__last_runs[key]))
+            else:
+                due = schedule.last_due(now)
+            heapq.heappush(self.__queue, (due, key))
+
+    @property
+    def next_due(self)->datetime:
+        """Returns the earliest due time of all sites.
+
+        Returns:
+            datetime: The due time, None without sites.
+        """
+        return self.__queue[0][0] if self.__queue else None
+
+    def run_pending(self)->list[str]:
+        """Runs every site that is due now.
+
+        An exception of run is printed and the sites count as run, so a failing run does not
+        repeat at once.
+
+        Returns:
+            list[str]: The group names of the sites that were run.
+        """
+        now = datetime.now()
+        keys = []
+        due = None
+        while self.__queue and self.__queue[0][0] <= now:
+            due, key = heapq.heappop(self.__queue)
+            keys.append(key)
+        if not keys:
+            return keys
+        try:
+            self.__run(keys, due)
+        except Exception:
+            traceback.print_exc()
+        finished = datetime.now()
+        for key in keys:
+            self.__last_runs[key] = finished.isoformat()
+            heapq.heappush(self.__queue, (self.__schedules[key].next_due(finished), key))
+        self.save()
+        return keys
+
+    def run_forever(self, stop:threading.Event)->None:
+        """Runs the due sites until stop is set, sleeping in between.
+
+        The sleep is cut into steps of MAX_SLEEP seconds, so a changed system clock or a
+        suspended machine is noticed.
+
+        Args:
+            stop (threading.Event): Set to stop the scheduler, e.g. by a signal handler.
+        """
+        while not stop.is_set():
+            self.run_pending()
+            if self.next_due is None:
+                stop.wait()
+                continue
+            stop.wait(min(MAX_SLEEP, max(0.0, (self.next_due - datetime.now()).total_seconds())))
+
+    def save(self)->None:
+        """Writes the last runs to the JSON file."""
+        directory = os.path.dirname(self.state_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        temporary_path = self.state_path + ".tmp"
+        with open(temporary_path, "w", encoding="utf-8") as file:
+            json.dump(self.__last_runs, file, indent=2)
+        os.replace(temporary_path, self.state_path)
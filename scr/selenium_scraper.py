@@ -1,11 +1,38 @@
 from datetime import datetime
+import json
 from selenium.common.exceptions import ElementClickInterceptedException, NoSuchElementException
-from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.chrome.webdriver import WebDriver
 import numpy as np
-from functions import get_float, get_point_deci, get_start_end_time
+from functions import get_float_rows
+from driver_pool import DriverPool, launch_chrome
+from metrics import count, stage
+from response_cache import PAGE_SOURCES, TABLES, RawPages, ResponseCache
 from scraper import Scraper
+from table_parser import find_table, parse_table
+
+ELEMENT_EXTRACTION:str = "ELEMENTS"
+SCRIPT_EXTRACTION:str = "SCRIPT"
+PAGE_SOURCE_EXTRACTION:str = "LXML"
+
+TABLE_SCRIPT:str = """
+const table = arguments[0];
+const head = [];
+const thead = table.querySelector("thead");
+if (thead) {
+    for (const cell of thead.querySelectorAll("th")) {
+        head.push([cell.innerText.trim(), parseInt(cell.getAttribute("colspan") || "1")]);
+    }
+}
+const body = [];
+for (const tbody of table.querySelectorAll("tbody")) {
+    for (const row of tbody.querySelectorAll("tr")) {
+        body.push([Array.from(row.querySelectorAll("th"), cell => cell.innerText.trim()),
+                   Array.from(row.querySelectorAll("td"), cell => cell.innerText.trim())]);
+    }
+}
+return [head, body];
+"""
 
 class SeleniumScraper(Scraper):
     """A concrete implementation of the Scraper abstract base class using Selenium for web scraping.
@@ -18,6 +45,14 @@ class SeleniumScraper(Scraper):
         cockie_handler (str, optional): The handler for cookie acceptance. Defaults to None.
         change_page_handler (str, optional): The handler for changing pages. Defaults to None.
         encoding (str, optional): The encoding of the data. Defaults to None.
+        driver_pool (DriverPool, optional): The pool the browser is taken from. Defaults to None,
+            which launches and quits a browser of its own.
+        extraction (str, optional): How the table is read. SCRIPT_EXTRACTION reads each page with
+            one in-page script, PAGE_SOURCE_EXTRACTION takes a snapshot of each page source, releases
+            the browser and parses the snapshots with lxml, ELEMENT_EXTRACTION asks the WebDriver for
+            every element. Defaults to SCRIPT_EXTRACTION.
+        response_cache (ResponseCache, optional): The cache the page sources or the extracted tables
+            are stored in before they are parsed, nothing is cached for ELEMENT_EXTRACTION. Defaults to None.
     
     Attributes:
         name (str): The name of the scraped webpage.
@@ -28,17 +63,31 @@ class SeleniumScraper(Scraper):
     """
 
     def __init__(self,name:str, url:str, table_class_name:str, is_german:bool,
-                 cockie_handler:str = None, change_page_handler:str=None, encoding:str = None):
+                 cockie_handler:str = None, change_page_handler:str=None, encoding:str = None,
+                 driver_pool:DriverPool = None, extraction:str = None, response_cache:ResponseCache = None):
         self.__name:str = name
-        start, end = get_start_end_time()
-        url = url.replace("START",str(start)).replace("END",str(end))
-        driver = self.get_driver(url=url, cockie_handler=cockie_handler)
-        self.__scraping_time:datetime = datetime.now()
         if encoding is None:
             encoding = "UTF-8"
-        self.__column_names:np.array = SeleniumScraper.get_column_names(driver=driver, table_name=table_class_name,encoding=encoding)
-        self.__data_array:np.array = SeleniumScraper.get_table_data(driver=driver, table_name=table_class_name, is_german=is_german,change_page_handler=change_page_handler, encoding=encoding)
-        driver.quit()
+        if not extraction:
+            extraction = SCRIPT_EXTRACTION
+        if extraction in (PAGE_SOURCE_EXTRACTION, SCRIPT_EXTRACTION):
+            raw_pages = SeleniumScraper.fetch(name=name, url=url, table_class_name=table_class_name,
+                                              cockie_handler=cockie_handler, change_page_handler=change_page_handler,
+                                              driver_pool=driver_pool, extraction=extraction,
+                                              response_cache=response_cache)
+            self.__scraping_time:datetime = raw_pages.scraping_time
+            self.__column_names, self.__data_array = SeleniumScraper.parse_raw_pages(raw_pages=raw_pages, table_name=table_class_name, is_german=is_german, encoding=encoding)
+            return
+        driver = self.get_driver(url=url, cockie_handler=cockie_handler, driver_pool=driver_pool)
+        try:
+            self.__scraping_time:datetime = datetime.now()
+            self.__column_names:np.array = SeleniumScraper.get_column_names(driver=driver, table_name=table_class_name,encoding=encoding)
+            self.__data_array:np.array = SeleniumScraper.get_table_data(driver=driver, table_name=table_class_name, is_german=is_german,change_page_handler=change_page_handler, encoding=encoding)
+        finally:
+            if driver_pool is None:
+                driver.quit()
+            else:
+                driver_pool.release(driver)
 
 
     @property
@@ -58,24 +107,104 @@ class SeleniumScraper(Scraper):
         return self.__scraping_time
     
     @staticmethod
-    def get_driver(url:str, cockie_handler:str)->WebDriver:
+    def fetch(name:str, url:str, table_class_name:str, cockie_handler:str = None, change_page_handler:str = None,
+              driver_pool:DriverPool = None, extraction:str = None, response_cache:ResponseCache = None)->RawPages:
+        """Reads the table pages in the browser without parsing them and stores them in the response cache.
+
+        The browser is released before the pages are parsed, see parse_raw_pages.
+
+        Args:
+            name (str): The name of the scraped webpage.
+            url (str): The URL to scrape, with the time range filled in, see SiteConfig.url_for.
+            table_class_name (str): The class name of the table.
+            cockie_handler (str, optional): The handler for cookie acceptance. Defaults to None.
+            change_page_handler (str, optional): The handler for changing pages. Defaults to None.
+            driver_pool (DriverPool, optional): The pool the browser is taken from. Defaults to None.
+            extraction (str, optional): PAGE_SOURCE_EXTRACTION or SCRIPT_EXTRACTION. Defaults to SCRIPT_EXTRACTION.
+            response_cache (ResponseCache, optional): The cache the pages are stored in. Defaults to None.
+
+        Raises:
+            ValueError: If the extraction cannot be separated from parsing, like ELEMENT_EXTRACTION.
+
+        Returns:
+            RawPages: The page sources for PAGE_SOURCE_EXTRACTION, the extracted tables as JSON for SCRIPT_EXTRACTION.
+        """
+        if not extraction:
+            extraction = SCRIPT_EXTRACTION
+        if not extraction in (PAGE_SOURCE_EXTRACTION, SCRIPT_EXTRACTION):
+            raise ValueError(f"Extraction \"{extraction}\" cannot be fetched without parsing.")
+        driver = SeleniumScraper.get_driver(url=url, cockie_handler=cockie_handler, driver_pool=driver_pool)
+        try:
+            scraping_time = datetime.now()
+            if extraction == PAGE_SOURCE_EXTRACTION:
+                page_sources = SeleniumScraper.get_page_sources(driver=driver, table_name=table_class_name, change_page_handler=change_page_handler)
+                raw_pages = RawPages(kind=PAGE_SOURCES, pages=[page_source.encode("utf-8") for page_source in page_sources],
+                                     scraping_time=scraping_time, url=url)
+            else:
+                tables = SeleniumScraper.extract_tables(driver=driver, table_name=table_class_name, change_page_handler=change_page_handler)
+                raw_pages = RawPages(kind=TABLES, pages=[json.dumps(tables).encode("utf-8")],
+                                     scraping_time=scraping_time, url=url)
+        finally:
+            if driver_pool is None:
+                driver.quit()
+            else:
+                driver_pool.release(driver)
+        count("bytes_downloaded", sum(len(page) for page in raw_pages.pages))
+        if response_cache is not None:
+            response_cache.put(site=name, scraping_time=raw_pages.scraping_time, kind=raw_pages.kind,
+                               pages=raw_pages.pages)
+        return raw_pages
+
+    @staticmethod
+    def parse_raw_pages(raw_pages:RawPages, table_name:str, is_german:bool, encoding:str)->tuple[np.array]:
+        """Parses the pages read by fetch, no browser is needed.
+
+        Args:
+            raw_pages (RawPages): The page sources or the extracted tables.
+            table_name (str): The class name of the table.
+            is_german (bool): Whether the data is in German format.
+            encoding (str): The encoding of the data.
+
+        Raises:
+            ValueError: If the kind of the pages is unknown.
+
+        Returns:
+            tuple[np.array]: The column names and the table data.
+        """
+        if raw_pages.kind == PAGE_SOURCES:
+            return SeleniumScraper.parse_page_sources(page_sources=[page.decode("utf-8") for page in raw_pages.pages],
+                                                      table_name=table_name, is_german=is_german, encoding=encoding)
+        if raw_pages.kind == TABLES:
+            return SeleniumScraper.build_table(tables=json.loads(raw_pages.pages[0]), is_german=is_german,
+                                               encoding=encoding)
+        raise ValueError(f"Unknown kind \"{raw_pages.kind}\" of Selenium pages.")
+
+    @staticmethod
+    def get_driver(url:str, cockie_handler:str, driver_pool:DriverPool = None)->WebDriver:
         """Initializes and returns a Selenium WebDriver.
 
         Args:
             url (str): The URL to navigate to.
             cockie_handler (str): The handler for cookie acceptance.
+            driver_pool (DriverPool, optional): The pool to take the driver from. Defaults to None.
 
         Returns:
             webdriver: The initialized WebDriver.
         """
-        options = webdriver.ChromeOptions()
-        options.add_argument("--start-maximized")
-        options.add_argument("--headless=new")
-        driver =  webdriver.Chrome(options=options)
-        driver.get(url=url)
-        driver.implicitly_wait(10)
-        if cockie_handler:
-            SeleniumScraper.cockie_handling(driver=driver,cockie_handler=cockie_handler)
+        with stage("driver_launch"):
+            driver = launch_chrome() if driver_pool is None else driver_pool.acquire()
+        try:
+            with stage("page_load"):
+                driver.get(url=url)
+                driver.implicitly_wait(10)
+                if cockie_handler:
+                    SeleniumScraper.cockie_handling(driver=driver,cockie_handler=cockie_handler)
+        except BaseException:
+            if driver_pool is None:
+                driver.quit()
+            else:
+                driver_pool.release(driver)
+            raise
         return driver
     
     @staticmethod
@@ -98,7 +227,8 @@ class SeleniumScraper(Scraper):
             object_type (str): The type of the object to interact with.
             object_name (str): The name of the object to interact with.
         """
-        driver.find_element(by=object_type,value=object_name).click()
+        with stage("pagination"):
+            driver.find_element(by=object_type,value=object_name).click()
 
     @staticmethod
     def get_table():
@@ -154,7 +284,8 @@ class SeleniumScraper(Scraper):
         
         num_pages = int(num_pages)
 
-        data = []
+        headers = []
+        bodies = []
 
         for num in range(1,num_pages+1):
             table = driver.find_element(by=By.CLASS_NAME,value=table_name)
@@ -164,22 +295,184 @@ class SeleniumScraper(Scraper):
                 rows = body.find_elements(by=By.TAG_NAME,value="tr")
 
                 for row in rows:
-                    data_header = [str(table_header.text).encode(encoding=encoding) for table_header in row.find_elements(by=By.TAG_NAME,value="th")]
-                    data_body = []
-                    for table_data in row.find_elements(by=By.TAG_NAME,value="td"):
-                        if table_data.text:
-                            element_data = get_point_deci(table_data.text, change_comma=(is_german=="TRUE"))
-                            try:
-                                element_data = get_float(element_data)
-                            except ValueError:
-                                element_data = None
-                            data_body.append(element_data)
-                    data.append((tuple(data_header),tuple(data_body)))
+                    headers.append(tuple(str(table_header.text).encode(encoding=encoding) for table_header in row.find_elements(by=By.TAG_NAME,value="th")))
+                    texts = [table_data.text for table_data in row.find_elements(by=By.TAG_NAME,value="td")]
+                    bodies.append([text for text in texts if text])
             if num_pages > num:
                 SeleniumScraper.next_page(driver=driver,object_type=next_page_object,object_name=next_page_name)
+
+        with stage("numeric_conversion"):
+            bodies = get_float_rows(rows=bodies, change_comma=(is_german in (True, "TRUE")))
+        data = list(zip(headers, bodies))
                 
         len_f0 = len(data[0][0])
         len_f1 = len(data[0][1])
 
         data_type = np.dtype([("f0","S20",(len_f0,)),("f1","f4",(len_f1,))])
         return np.array(data, dtype=data_type)
+
+    @staticmethod
+    def extract_table(driver:WebDriver, table_name:str)->list[list]:
+        """Reads the texts of the table head and body with a single in-page script.
+
+        Finding the table still waits implicitly until it is rendered, the texts of all cells
+        are then returned by one execute_script call.
+
+        Args:
+            driver (WebDriver): The WebDriver instance.
+            table_name (str): The class name of the table.
+
+        Returns:
+            list[list]: The head as [text, colspan] pairs and the body rows as [th texts, td texts].
+        """
+        table = driver.find_element(by=By.CLASS_NAME,value=table_name)
+        return driver.execute_script(TABLE_SCRIPT, table)
+
+    @staticmethod
+    def parse_column_names(head:list[list], encoding:str)->np.array:
+        """Builds the column names from the extracted table head, repeating cells spanning several columns.
+
+        Args:
+            head (list[list]): The [text, colspan] pairs of the head cells.
+            encoding (str): The encoding of the data.
+
+        Returns:
+            np.array: The column names.
+        """
+        column_names = []
+        for text, colspan in head:
+            if text:
+                column_names.extend([text.encode(encoding=encoding)]*int(colspan))
+        return np.array(column_names,dtype="S20")
+
+    @staticmethod
+    def parse_rows(rows:list[list[list[str]]], is_german:bool, encoding:str)->list[tuple]:
+        """Converts the extracted body rows to the tuples of the table data.
+
+        The numbers of all rows are parsed in one batch and split up again afterwards.
+
+        Args:
+            rows (list[list[list[str]]]): The [th texts, td texts] of each row.
+            is_german (bool): Whether the data is in German format.
+            encoding (str): The encoding of the data.
+
+        Returns:
+            list[tuple]: The (header, body) tuples of each row.
+        """
+        with stage("numeric_conversion"):
+            bodies = get_float_rows(rows=[[cell for cell in body if cell] for _, body in rows],
+                                    change_comma=(is_german in (True, "TRUE")))
+        return [(tuple(text.encode(encoding=encoding) for text in header), body)
+                for (header, _), body in zip(rows, bodies)]
+
+    @staticmethod
+    def get_table_bulk(driver:WebDriver, table_name:str, is_german:bool, change_page_handler:str, encoding:str)->tuple[np.array]:
+        """Retrieves the column names and the data of all table pages with one script call per page.
+
+        Args:
+            driver (WebDriver): The WebDriver instance.
+            table_name (str): The class name of the table.
+            is_german (bool): Whether the data is in German format.
+            change_page_handler (str): The handler for changing pages.
+            encoding (str): The encoding of the data.
+
+        Returns:
+            tuple[np.array]: The column names and the table data.
+        """
+        tables = SeleniumScraper.extract_tables(driver=driver, table_name=table_name, change_page_handler=change_page_handler)
+        return SeleniumScraper.build_table(tables=tables, is_german=is_german, encoding=encoding)
+
+    @staticmethod
+    def extract_tables(driver:WebDriver, table_name:str, change_page_handler:str)->list[list]:
+        """Extracts the head and body texts of all table pages with one script call per page.
+
+        Args:
+            driver (WebDriver): The WebDriver instance.
+            table_name (str): The class name of the table.
+            change_page_handler (str): The handler for changing pages.
+
+        Returns:
+            list[list]: The head and body rows of each page, see extract_table.
+        """
+        if change_page_handler:
+            num_pages, next_page_object, next_page_name = change_page_handler.split("|")
+        else:
+            num_pages = 1
+
+        num_pages = int(num_pages)
+
+        tables = []
+
+        for num in range(1,num_pages+1):
+            tables.append(SeleniumScraper.extract_table(driver=driver, table_name=table_name))
+            if num_pages > num:
+                SeleniumScraper.next_page(driver=driver,object_type=next_page_object,object_name=next_page_name)
+
+        return tables
+
+    @staticmethod
+    def get_page_sources(driver:WebDriver, table_name:str, change_page_handler:str)->list[str]:
+        """Takes a snapshot of the page source of every table page.
+
+        Args:
+            driver (WebDriver): The WebDriver instance.
+            table_name (str): The class name of the table, waited for before each snapshot.
+            change_page_handler (str): The handler for changing pages.
+
+        Returns:
+            list[str]: The HTML of each table page.
+        """
+        if change_page_handler:
+            num_pages, next_page_object, next_page_name = change_page_handler.split("|")
+        else:
+            num_pages = 1
+
+        num_pages = int(num_pages)
+
+        page_sources = []
+
+        for num in range(1,num_pages+1):
+            driver.find_element(by=By.CLASS_NAME,value=table_name)
+            page_sources.append(driver.page_source)
+            if num_pages > num:
+                SeleniumScraper.next_page(driver=driver,object_type=next_page_object,object_name=next_page_name)
+        return page_sources
+
+    @staticmethod
+    def parse_page_sources(page_sources:list[str], table_name:str, is_german:bool, encoding:str)->tuple[np.array]:
+        """Parses the table of page source snapshots with lxml, no browser is needed.
+
+        Args:
+            page_sources (list[str]): The HTML of each table page.
+            table_name (str): The class name of the table.
+            is_german (bool): Whether the data is in German format.
+            encoding (str): The encoding of the data.
+
+        Returns:
+            tuple[np.array]: The column names and the table data.
+        """
+        tables = [parse_table(find_table(page=page_source, table_class_name=table_name)) for page_source in page_sources]
+        return SeleniumScraper.build_table(tables=tables, is_german=is_german, encoding=encoding)
+
+    @staticmethod
+    def build_table(tables:list[tuple[list]], is_german:bool, encoding:str)->tuple[np.array]:
+        """Builds the column names and the table data from the extracted table pages.
+
+        Args:
+            tables (list[tuple[list]]): The head and body rows of each page, see extract_table.
+            is_german (bool): Whether the data is in German format.
+            encoding (str): The encoding of the data.
+
+        Returns:
+            tuple[np.array]: The column names of the first page and the data of all pages.
+        """
+        column_names = SeleniumScraper.parse_column_names(head=tables[0][0], encoding=encoding)
+        rows = [row for _, body in tables for row in body]
+
+        data = SeleniumScraper.parse_rows(rows=rows, is_german=is_german, encoding=encoding)
+
+        len_f0 = len(data[0][0])
+        len_f1 = len(data[0][1])
+
+        data_type = np.dtype([("f0","S20",(len_f0,)),("f1","f4",(len_f1,))])
+        return column_names, np.array(data, dtype=data_type)
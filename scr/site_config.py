@@ -0,0 +1,143 @@
+from typing import NamedTuple
+import csv
+import os
+import re
+import threading
+from retry_policy import RetryPolicy
+from scheduler import Schedule
+
+CONFIG_PATH:str = "data/webpage_data.csv"
+REQUESTS_METHOD:str = "REQUESTS"
+SELENIUM_METHOD:str = "SELENIUM"
+PARSERS:dict[str:tuple[str]] = {REQUESTS_METHOD: ("", "BS4", "LXML"),
+                                SELENIUM_METHOD: ("", "ELEMENTS", "SCRIPT", "LXML")}
+BOOLEANS:dict[str:bool] = {"TRUE": True, "FALSE": False}
+DEFAULT_ENCODING:str = "UTF-8"
+URL_PLACEHOLDER:re.Pattern = re.compile(r"(START|END)")
+
+class SiteConfig(NamedTuple):
+    """The validated configuration of one scraped site, one row of the configuration file.
+
+    Attributes:
+        name (str): The name of the site, its group name in the DataCollector.
+        url (str): The URL, START and END are replaced by the time range of the data.
+        method (str): REQUESTS_METHOD or SELENIUM_METHOD.
+        page_handler (str): The number of pages and the element of the next page button, "pages|by|value".
+        cockie_handler (str): The element of the cookie button, "by|value".
+        table_name (str): The class name of the table.
+        is_german (bool): Whether the numbers use a decimal comma.
+        num_str_cols (int): The number of string columns.
+        num_float_cols (int): The number of float columns.
+        encoding (str): The encoding of the data.
+        parser (str): The parser or the extraction of the scraper, one of PARSERS.
+        retry (str): The RETRY column, see RetryPolicy.from_config.
+        schedule (Schedule): The times the site is due.
+        url_parts (tuple[str]): The URL split at its placeholders, literal text at the even positions.
+    """
+    name:str
+    url:str
+    method:str
+    page_handler:str
+    cockie_handler:str
+    table_name:str
+    is_german:bool
+    num_str_cols:int
+    num_float_cols:int
+    encoding:str
+    parser:str
+    retry:str
+    schedule:Schedule
+    url_parts:tuple[str]
+
+    @classmethod
+    def from_row(cls, row:list[str])->"SiteConfig":
+        """Creates and validates the configuration of a site from a row of the configuration file.
+
+        The columns are NAME, URL, METHODE, page handler, cookie handler, TABLE_CLASS_NAME, GERMAN,
+        STRING_COLUMNS, FLOAT_COLUMNS, ENCODING and the optional PARSER, RETRY and INTERVAL.
+
+        Args:
+            row (list[str]): The columns of the row.
+
+        Raises:
+            ValueError: If a column is missing or malformed.
+
+        Returns:
+            SiteConfig: The configuration.
+        """
+        if len(row) < 10:
+            raise ValueError(f"The configuration of \"{row[0] if row else ''}\" has only {len(row)} columns.")
+        name, url, method, page_handler, cockie_handler, table_name, is_german, num_str_cols, num_float_cols, \
+            encoding = (column.strip() for column in row[:10])
+        parser, retry, interval = (row[10:] + ["", "", ""])[:3]
+        if not name:
+            raise ValueError("A configured site has no name.")
+        if not method in PARSERS:
+            raise ValueError(f"Unknown method \"{method}\" of \"{name}\".")
+        if not is_german.upper() in BOOLEANS:
+            raise ValueError(f"GERMAN of \"{name}\" is \"{is_german}\" instead of TRUE or FALSE.")
+        if not (num_str_cols.isdigit() and num_float_cols.isdigit()):
+            raise ValueError(f"The column counts of \"{name}\" are no numbers.")
+        if not parser.strip() in PARSERS[method]:
+            raise ValueError(f"Unknown parser \"{parser}\" of \"{name}\".")
+        RetryPolicy.from_config(retry)
+        return cls(name=name, url=url, method=method, page_handler=page_handler, cockie_handler=cockie_handler,
+                   table_name=table_name, is_german=BOOLEANS[is_german.upper()], num_str_cols=int(num_str_cols),
+                   num_float_cols=int(num_float_cols), encoding=encoding or DEFAULT_ENCODING,
+                   parser=parser.strip(), retry=retry.strip(), schedule=Schedule.from_config(interval),
+                   url_parts=tuple(URL_PLACEHOLDER.split(url)))
+
+    def url_for(self, start:int, end:int)->str:
+        """Returns the URL with the placeholders replaced by a time range.
+
+        Args:
+            start (int): The timestamp replacing START.
+            end (int): The timestamp replacing END.
+
+        Returns:
+            str: The URL.
+        """
+        values = {"START": str(start), "END": str(end)}
+        return "".join(part if i%2 == 0 else values[part] for i, part in enumerate(self.url_parts))
+
+CONFIG_CACHE:dict[str:tuple[tuple[int],dict[str:SiteConfig]]] = {}
+CONFIG_CACHE_LOCK:threading.Lock = threading.Lock()
+
+def load_site_configs(path:str = None)->dict[str:SiteConfig]:
+    """Returns the validated configuration of every site of the configuration file.
+
+    The file is parsed once and compiled into SiteConfigs, later calls return the same
+    configurations until the file changes on disk.
+
+    Args:
+        path (str, optional): The semicolon separated configuration file. Defaults to CONFIG_PATH.
+
+    Raises:
+        ValueError: If a row is malformed or a name is used twice.
+
+    Returns:
+        dict[str, SiteConfig]: The configuration by site name.
+    """
+    if path is None:
+        path = CONFIG_PATH
+    status = os.stat(path)
+    version = (status.st_mtime_ns, status.st_size)
+    with CONFIG_CACHE_LOCK:
+        if path in CONFIG_CACHE and CONFIG_CACHE[path][0] == version:
+            return dict(CONFIG_CACHE[path][1])
+        configs = {}
+        with open(path, encoding="utf-8-sig", newline="") as file:
+            reader = csv.reader(file, delimiter=";", dialect="excel")
+            next(reader, None)
+            for line, row in enumerate(reader, start=2):
+                if not any(row):
+                    continue
+                try:
+                    config = SiteConfig.from_row(row)
+                except ValueError as error:
+                    raise ValueError(f"Line {line} of {path}: {error}") from error
+                if config.name in configs:
+                    raise ValueError(f"Line {line} of {path}: \"{config.name}\" is configured twice.")
+                configs[config.name] = config
+        CONFIG_CACHE[path] = (version, configs)
+        return dict(configs)
@@ -0,0 +1,112 @@
+from io import BytesIO
+from lxml import etree
+import lxml.html
+from lxml.html import HtmlElement
+
+def class_xpath(table_class_name:str)->str:
+    """Builds an XPath that finds the elements having all classes of a class name.
+
+    Args:
+        table_class_name (str): One class or several classes separated by spaces.
+
+    Returns:
+        str: The XPath expression.
+    """
+    conditions = [f"contains(concat(' ', normalize-space(@class), ' '), ' {name} ')"
+                  for name in table_class_name.split()]
+    return f"//*[{' and '.join(conditions)}]"
+
+def find_table(page:str|bytes, table_class_name:str)->HtmlElement:
+    """Parses an HTML page with lxml and returns the first element with the given class name.
+
+    Args:
+        page (str|bytes): The HTML of the page, bytes are decoded as declared by the page.
+        table_class_name (str): The class name of the table.
+
+    Raises:
+        ValueError: If no element has the class name.
+
+    Returns:
+        HtmlElement: The table element.
+    """
+    tables = lxml.html.fromstring(page).xpath(class_xpath(table_class_name))
+    if not tables:
+        raise ValueError(f"No table \"{table_class_name}\" in page.")
+    return tables[0]
+
+def iterfind_table(page:bytes, table_class_name:str)->etree._Element:
+    """Parses an HTML page incrementally and stops as soon as the table with the class name is closed.
+
+    The rest of the page is never parsed, which pays off for tables near the top of large pages.
+
+    Args:
+        page (bytes): The HTML of the page.
+        table_class_name (str): One class or several classes separated by spaces.
+
+    Raises:
+        ValueError: If no element has the class name.
+
+    Returns:
+        etree._Element: The complete table element.
+    """
+    classes = set(table_class_name.split())
+    table = None
+    for event, element in etree.iterparse(BytesIO(page), events=("start", "end"), html=True):
+        if event == "start" and table is None and classes <= set(element.get("class", "").split()):
+            table = element
+        elif event == "end" and element is table:
+            return table
+    raise ValueError(f"No table \"{table_class_name}\" in page.")
+
+def first_text(cell:etree._Element)->str:
+    """Returns the first non-empty text of a cell, stripped, like the first of BeautifulSoup's stripped_strings.
+
+    Args:
+        cell (etree._Element): The cell.
+
+    Returns:
+        str: The text, empty if the cell has none.
+    """
+    for text in cell.itertext():
+        if text.strip():
+            return text.strip()
+    return ""
+
+def joined_text(cell:etree._Element)->str:
+    """Returns all stripped texts of a cell joined without separator, like BeautifulSoup's getText(strip=True).
+
+    Args:
+        cell (etree._Element): The cell.
+
+    Returns:
+        str: The text.
+    """
+    return "".join(text.strip() for text in cell.itertext())
+
+def cell_text(cell:HtmlElement)->str:
+    """Returns the stripped text of a table cell.
+
+    Args:
+        cell (HtmlElement): The cell.
+
+    Returns:
+        str: The text.
+    """
+    return cell.text_content().strip()
+
+def parse_table(table:HtmlElement)->tuple[list]:
+    """Extracts the texts of the table head and body.
+
+    The result has the same layout as the in-page script of SeleniumScraper, so both sources
+    are converted by the same code.
+
+    Args:
+        table (HtmlElement): The table element.
+
+    Returns:
+        tuple[list]: The head as [text, colspan] pairs and the body rows as [th texts, td texts].
+    """
+    head = [[cell_text(cell), int(cell.get("colspan", "1"))] for cell in table.xpath(".//thead//th")]
+    body = [[[cell_text(cell) for cell in row.xpath(".//th")], [cell_text(cell) for cell in row.xpath(".//td")]]
+            for row in table.xpath(".//tbody//tr")]
+    return head, body
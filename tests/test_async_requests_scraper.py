@@ -0,0 +1,81 @@
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import asyncio
+import threading
+import time
+from async_requests_scraper import AsyncRequestsScraper, scrape_pages
+from site_config import SiteConfig
+
+PAGE:bytes = (b"<html><body><table class=\"rates\"><thead><tr><th>Name</th><th>Kurs</th></tr></thead>"
+              b"<tbody><tr><td>EUR</td><td>1.5</td></tr><tr><td>USD</td><td>2</td></tr></tbody></table></body></html>")
+
+class StandInServer:
+    """Serves PAGE slowly on a local port and records the requested paths and the most parallel requests."""
+
+    def __init__(self):
+        self.paths = []
+        self.active = 0
+        self.most_active = 0
+        self.lock = threading.Lock()
+        stand_in = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self)->None:
+                with stand_in.lock:
+                    stand_in.paths.append(self.path)
+                    stand_in.active += 1
+                    stand_in.most_active = max(stand_in.most_active, stand_in.active)
+                time.sleep(0.2)
+                with stand_in.lock:
+                    stand_in.active -= 1
+                self.send_response(200)
+                self.send_header("Content-Length", str(len(PAGE)))
+                self.end_headers()
+                self.wfile.write(PAGE)
+
+            def log_message(self, format:str, *args)->None:
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def close(self)->None:
+        self.server.shutdown()
+        self.server.server_close()
+
+class CountingExecutor(ThreadPoolExecutor):
+    """Counts the calls submitted to the executor."""
+
+    def __init__(self):
+        super().__init__(max_workers=2)
+        self.submitted = 0
+
+    def submit(self, *args, **kwargs):
+        self.submitted += 1
+        return super().submit(*args, **kwargs)
+
+def site(name:str, url:str, method:str = "REQUESTS")->SiteConfig:
+    return SiteConfig.from_row([name, url, method, "", "", "rates", "FALSE", "1", "1", "UTF-8", "LXML"])
+
+def test_scrape_pages():
+    server = StandInServer()
+    executor = CountingExecutor()
+    try:
+        wp_data = {f"site {number}": site(name=f"site {number}", url=f"{server.url}/{number}?from=START&to=END")
+                   for number in range(6)}
+        wp_data["browser"] = site(name="browser", url=f"{server.url}/browser?from=START", method="SELENIUM")
+        results = asyncio.run(scrape_pages(wp_data=wp_data, limit_per_host=2, executor=executor))
+    finally:
+        executor.shutdown()
+        server.close()
+
+    assert sorted(results) == [f"site {number}" for number in range(6)]
+    for scraper in results.values():
+        assert isinstance(scraper, AsyncRequestsScraper)
+        assert list(scraper.column_names) == [b"Name", b"Kurs"]
+        assert scraper.data_array["f1"].ravel().tolist() == [1.5, 2]
+    assert executor.submitted == 6
+    assert server.most_active == 2
+    assert len(server.paths) == 6
+    assert not any("START" in path or "END" in path or "browser" in path for path in server.paths)
@@ -0,0 +1,128 @@
+from datetime import date, datetime, timedelta
+import h5py
+import numpy as np
+import pytest
+from data_collector import APPENDED_LAYOUT, COLUMNAR_LAYOUT, DAILY_LAYOUT, LAYOUTS, DataCollector
+
+GROUP:str = "site"
+COLUMN_NAMES:np.array = np.array([b"Name", b"Land", b"Wert", b"Min", b"Max"])
+DAYS:list[date] = [date(2024, 9, day) for day in range(1, 6)]
+
+def snapshot(seed:int, num_rows:int = 4)->np.array:
+    """Creates a table shaped like the output of the scrapers, with values depending on seed."""
+    data = np.zeros(num_rows, dtype=[("", "S10", (2,)), ("", "f4", (3,))])
+    data["f0"] = [[f"row {row}".encode(), b"DE"] for row in range(num_rows)]
+    data["f1"] = np.arange(num_rows*3, dtype="f4").reshape(num_rows, 3) + seed
+    return data
+
+def scraping_time(day:date)->datetime:
+    return datetime(day.year, day.month, day.day, 12)
+
+@pytest.fixture(params=LAYOUTS)
+def collector(request, tmp_path)->DataCollector:
+    data_collector = DataCollector(path=str(tmp_path / "data.h5"), parent_name="test", group_names={GROUP: "url"},
+                                   layout=request.param)
+    data_collector.store_column_names(column_names=COLUMN_NAMES, group_name=GROUP)
+    return data_collector
+
+def store(data_collector:DataCollector, days:list[date], overwrite:bool = False)->None:
+    for day in days:
+        data_collector.store_data(data=snapshot(seed=day.day), group_name=GROUP, scraping_time=scraping_time(day),
+                                  data_date=day, overwrite=overwrite)
+
+def test_out_of_order_inserts_read_in_date_order(collector):
+    store(collector, days=[DAYS[3], DAYS[0], DAYS[4], DAYS[2], DAYS[1]])
+    snapshots = list(collector.get_range(group_name=GROUP, start=DAYS[0], end=DAYS[-1]))
+    assert [day for day, _ in snapshots] == DAYS
+    for day, data in snapshots:
+        assert data.tobytes() == snapshot(seed=day.day).tobytes()
+    assert collector.get_data(group_name=GROUP, data_date=DAYS[2]).tobytes() == snapshot(seed=3).tobytes()
+    assert collector.get_latest(group_name=GROUP, end=DAYS[-1])[0] == DAYS[-1]
+
+def test_overwrite(collector):
+    store(collector, days=DAYS[:2])
+    collector.store_data(data=snapshot(seed=100), group_name=GROUP, scraping_time=scraping_time(DAYS[0]),
+                         data_date=DAYS[0])
+    assert collector.get_data(group_name=GROUP, data_date=DAYS[0]).tobytes() == snapshot(seed=1).tobytes()
+    collector.store_data(data=snapshot(seed=100), group_name=GROUP, scraping_time=scraping_time(DAYS[0]),
+                         data_date=DAYS[0], overwrite=True)
+    assert collector.get_data(group_name=GROUP, data_date=DAYS[0]).tobytes() == snapshot(seed=100).tobytes()
+    assert collector.get_data(group_name=GROUP, data_date=DAYS[1]).tobytes() == snapshot(seed=2).tobytes()
+
+def test_missing_data_raises(collector):
+    with pytest.raises(ValueError):
+        collector.get_data(group_name=GROUP, data_date=DAYS[0])
+    with pytest.raises(ValueError):
+        collector.get_data(group_name="unknown", data_date=DAYS[0])
+
+def test_equal_snapshots_are_stored_once(collector):
+    for day in DAYS[:3]:
+        collector.store_data(data=snapshot(seed=0), group_name=GROUP, scraping_time=scraping_time(day), data_date=day)
+    for day in DAYS[:3]:
+        assert collector.get_data(group_name=GROUP, data_date=day).tobytes() == snapshot(seed=0).tobytes()
+    with h5py.File(collector.path, "r") as file:
+        group = file["test"][GROUP]
+        if collector.layout == DAILY_LAYOUT:
+            names = sorted(name for name in group if not name in ("column_names", "index"))
+            assert all(group[name] == group[names[0]] for name in names)
+        else:
+            assert group["label_codes" if collector.layout == COLUMNAR_LAYOUT else "data"].shape[0] == 4
+
+def test_get_rows(collector):
+    store(collector, days=DAYS)
+    moments, rows, column_names = collector.get_rows(group_name=GROUP, start=DAYS[1], end=DAYS[2])
+    assert rows.tobytes() == np.concatenate([snapshot(seed=2), snapshot(seed=3)]).tobytes()
+    assert list(moments) == [np.datetime64(datetime(2024, 9, day), "s") for day in (2, 2, 2, 2, 3, 3, 3, 3)]
+    assert list(column_names) == list(COLUMN_NAMES)
+
+    moments, rows, column_names = collector.get_rows(group_name=GROUP, start=DAYS[0], end=DAYS[0],
+                                                     columns=["Land", "Max"])
+    assert list(column_names) == [b"Land", b"Max"]
+    assert list(rows["f0"].ravel()) == [b"DE"]*4
+    assert list(rows["f1"].ravel()) == list(snapshot(seed=1)["f1"][:, 2])
+
+@pytest.mark.parametrize("layout", [APPENDED_LAYOUT, COLUMNAR_LAYOUT])
+def test_migrate_layout(collector, layout):
+    store(collector, days=DAYS)
+    store(collector, days=DAYS[:1] + DAYS[2:3], overwrite=True)
+    expected = [(day, data.tobytes()) for day, data in collector.get_range(group_name=GROUP, end=DAYS[-1])]
+    collector.migrate_layout(group_name=GROUP, layout=layout, filters={"compression": "lzf"})
+    assert [(day, data.tobytes()) for day, data in collector.get_range(group_name=GROUP, end=DAYS[-1])] == expected
+    assert list(collector.get_column_names(group_name=GROUP)) == list(COLUMN_NAMES)
+    with h5py.File(collector.path, "r") as file:
+        assert file["test"][GROUP].attrs["layout"] == layout
+        assert list(file["test"]) == [GROUP]
+
+def test_failed_migration_keeps_the_group(tmp_path):
+    data_collector = DataCollector(path=str(tmp_path / "data.h5"), parent_name="test", group_names={GROUP: "url"})
+    data = np.zeros(2, dtype=[("", "S10", (1,)), ("", "i4", (1,))])
+    for day in DAYS[:2]:
+        data_collector.store_data(data=data, group_name=GROUP, scraping_time=scraping_time(day), data_date=day)
+    with pytest.raises(ValueError):
+        data_collector.migrate_layout(group_name=GROUP, layout=COLUMNAR_LAYOUT)
+    assert [day for day, _ in data_collector.get_range(group_name=GROUP, end=DAYS[-1])] == DAYS[:2]
+    with h5py.File(data_collector.path, "r") as file:
+        assert file["test"][GROUP].attrs["layout"] == DAILY_LAYOUT
+        assert list(file["test"]) == [GROUP]
+
+def test_session_reads_its_writes(collector):
+    with collector:
+        store(collector, days=DAYS[:2])
+        assert collector.is_saved_data(group_name=GROUP, data_date=DAYS[1])
+        assert not collector.is_saved_data(group_name=GROUP, data_date=DAYS[1] + timedelta(days=1))
+    assert collector.is_saved_columns(group_name=GROUP)
+
+def test_swmr_session_reads_daily_groups_without_index(tmp_path):
+    path = str(tmp_path / "data.h5")
+    data_collector = DataCollector(path=path, parent_name="test", group_names={GROUP: "url"})
+    store(data_collector, days=DAYS[:3])
+    with h5py.File(path, "a") as file:
+        del file["test"][GROUP]["index"]
+
+    data_collector = DataCollector(path=path, parent_name="test", group_names={GROUP: "url"}, swmr=True)
+    with data_collector:
+        data_collector.start_swmr()
+        assert data_collector.get_latest(group_name=GROUP, end=DAYS[-1])[0] == DAYS[2]
+    with h5py.File(path, "r") as file:
+        assert list(file["test"][GROUP]["index"][()]) == sorted(float(name) for name in file["test"][GROUP]
+                                                                if name != "index")
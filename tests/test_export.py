@@ -0,0 +1,61 @@
+from datetime import datetime
+import numpy as np
+from export import COLUMN_COLUMN, TIME_COLUMN, VALUE_COLUMN, long_format
+
+def table(names:list[bytes], values:list[list[float]], countries:list[bytes])->np.array:
+    data = np.zeros(len(names), dtype=[("", "S10", (2,)), ("", "f4", (2,))])
+    data["f0"] = [[name, country] for name, country in zip(names, countries)]
+    data["f1"] = values
+    return data
+
+def decoded(column:tuple[np.ndarray,np.ndarray])->list[str]:
+    codes, categories = column
+    return list(categories[codes])
+
+def test_long_format():
+    moments = np.array([datetime(2024, 9, 1), datetime(2024, 9, 2), datetime(2024, 9, 2)], dtype="datetime64[s]")
+    data = table(names=[b"a", b"b", b"a"], values=[[1, 2], [3, 4], [5, 6]], countries=[b"DE", b"DE", b"FR"])
+    result = long_format(moments=moments, data=data, column_names=np.array([b"Name", b"Land", b"Min", b"Max"]))
+
+    assert list(result) == [TIME_COLUMN, "Name", "Land", COLUMN_COLUMN, VALUE_COLUMN]
+    assert list(result[TIME_COLUMN]) == list(np.repeat(moments, 2))
+    assert decoded(result["Name"]) == ["a", "a", "b", "b", "a", "a"]
+    assert decoded(result["Land"]) == ["DE", "DE", "DE", "DE", "FR", "FR"]
+    assert decoded(result[COLUMN_COLUMN]) == ["Min", "Max"]*3
+    assert list(result[VALUE_COLUMN]) == [1, 2, 3, 4, 5, 6]
+    assert result["Name"][0].dtype == np.int32
+    assert list(result["Name"][1]) == ["a", "b"]
+
+def test_long_format_decodes_with_the_encoding():
+    data = table(names=["Köln".encode("latin-1"), b"Bonn"], values=[[1, 2], [3, 4]],
+                 countries=[b"DE", b"DE"])
+    column_names = np.array([b"Stadt", b"Land", "Höhe".encode("latin-1"), b"Max"])
+    result = long_format(moments=np.zeros(2, dtype="datetime64[s]"), data=data, column_names=column_names,
+                         encoding="latin-1")
+    assert decoded(result["Stadt"]) == ["Köln", "Köln", "Bonn", "Bonn"]
+    assert "Höhe" in list(result[COLUMN_COLUMN][1])
+
+def test_long_format_merges_strings_that_decode_alike():
+    data = table(names=[b"\xff", b"\xfe"], values=[[1, 2], [3, 4]], countries=[b"DE", b"DE"])
+    result = long_format(moments=np.zeros(2, dtype="datetime64[s]"), data=data,
+                         column_names=np.array([b"Name", b"Land", b"Min", b"Max"]))
+    assert list(result["Name"][1]) == ["�"]
+    assert list(result["Name"][0]) == [0, 0, 0, 0]
+
+def test_long_format_without_rows():
+    data = np.zeros(0, dtype=[("", "S10", (2,)), ("", "f4", (2,))])
+    result = long_format(moments=np.zeros(0, dtype="datetime64[s]"), data=data,
+                         column_names=np.array([b"Name", b"Land", b"Min", b"Max"]))
+    assert all(len(values[0] if isinstance(values, tuple) else values) == 0 for values in result.values())
+
+def test_long_format_renames_colliding_columns():
+    data = np.zeros(1, dtype=[("", "S10", (3,)), ("", "f4", (2,))])
+    data["f0"] = [[b"a", b"b", b"c"]]
+    data["f1"] = [[1, 2]]
+    result = long_format(moments=np.zeros(1, dtype="datetime64[s]"), data=data,
+                         column_names=np.array([b"time", b"Name", b"Name", b"Wert", b"Wert"]))
+    assert list(result) == [TIME_COLUMN, "time_1", "Name", "Name_1", COLUMN_COLUMN, VALUE_COLUMN]
+    assert result[TIME_COLUMN].dtype == np.dtype("datetime64[s]")
+    assert [decoded(result[name]) for name in ("time_1", "Name", "Name_1")] == [["a", "a"], ["b", "b"], ["c", "c"]]
+    assert decoded(result[COLUMN_COLUMN]) == ["Wert", "Wert_1"]
+    assert list(result[VALUE_COLUMN]) == [1, 2]
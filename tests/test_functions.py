@@ -0,0 +1,15 @@
+import numpy as np
+from functions import CELL_SEPARATOR, get_float_array, get_float_rows
+
+def test_get_float_array():
+    values = get_float_array(texts=["1.234,5 €", "-", "", "n/a", "−2,5 %"], change_comma=True)
+    assert np.array_equal(values, np.array([1234.5, np.nan, np.nan, np.nan, -2.5], dtype="f4"), equal_nan=True)
+    values = get_float_array(texts=["1,234.5", "+3"], change_comma=False)
+    assert list(values) == [1234.5, 3]
+
+def test_get_float_array_with_the_separator_in_a_cell():
+    values = get_float_array(texts=["1,5", f"2{CELL_SEPARATOR}3", "-"], change_comma=True)
+    assert np.array_equal(values, np.array([1.5, 23, np.nan], dtype="f4"), equal_nan=True)
+
+def test_get_float_rows():
+    assert get_float_rows(rows=[["1", "2"], [], ["3"]], change_comma=False) == [(1.0, 2.0), (), (3.0,)]
@@ -0,0 +1,70 @@
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import json
+import threading
+import pytest
+from http_session import HttpSession, PageNotModified
+
+LAST_MODIFIED:str = "Mon, 02 Sep 2024 10:00:00 GMT"
+
+class StandInServer:
+    """Serves one page with an ETag and a Last-Modified date, and answers matching conditional requests with 304."""
+
+    def __init__(self):
+        self.page = b"version 1"
+        self.headers = []
+        stand_in = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self)->None:
+                etag = f"\"{len(stand_in.page)}-{hash(stand_in.page)}\""
+                stand_in.headers.append((self.headers.get("If-None-Match"), self.headers.get("If-Modified-Since")))
+                if self.headers.get("If-None-Match") == etag:
+                    self.send_response(304)
+                    self.end_headers()
+                    return
+                self.send_response(200)
+                self.send_header("ETag", etag)
+                self.send_header("Last-Modified", LAST_MODIFIED)
+                self.send_header("Content-Length", str(len(stand_in.page)))
+                self.end_headers()
+                self.wfile.write(stand_in.page)
+
+            def log_message(self, format:str, *args)->None:
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}/page"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def close(self)->None:
+        self.server.shutdown()
+        self.server.server_close()
+
+@pytest.fixture
+def server()->StandInServer:
+    stand_in = StandInServer()
+    yield stand_in
+    stand_in.close()
+
+def test_conditional_get(server, tmp_path):
+    validators_path = str(tmp_path / "validators.json")
+    with HttpSession(validators_path=validators_path) as http_session:
+        assert http_session.get(url=server.url).content == b"version 1"
+        # The validators are only sent once the page was committed.
+        assert http_session.get(url=server.url).content == b"version 1"
+        http_session.commit(url=server.url)
+        with pytest.raises(PageNotModified):
+            http_session.get(url=server.url)
+    assert server.headers[:2] == [(None, None), (None, None)]
+    assert server.headers[2][1] == LAST_MODIFIED
+
+    with open(validators_path, encoding="utf-8") as file:
+        validators = json.load(file)
+    assert validators[server.url]["last_modified"] == LAST_MODIFIED
+    assert validators[server.url]["etag"] == server.headers[2][0]
+
+    with HttpSession(validators_path=validators_path) as http_session:
+        with pytest.raises(PageNotModified):
+            http_session.get(url=server.url)
+        server.page = b"version 2"
+        assert http_session.get(url=server.url).content == b"version 2"
@@ -0,0 +1,42 @@
+from datetime import date, datetime
+import json
+from data_collector import APPENDED_LAYOUT, MINUTE_GRANULARITY, DataCollector
+from reparse import reparse
+from response_cache import REQUESTS_PAGE, TABLES, ResponseCache
+from site_config import SiteConfig
+
+DAY:date = date(2024, 9, 2)
+
+def tables(value:str)->bytes:
+    """Creates the cached tables of a selenium site with one row holding value."""
+    return json.dumps([[[["Name", 1], ["Wert", 1]], [[["row"], [value]]]]]).encode()
+
+def test_sub_daily_sites_keep_an_entry_per_bucket(tmp_path):
+    cache = ResponseCache(directory=str(tmp_path), granularities={"intraday": 15*60})
+    for minute in (0, 14, 15, 40):
+        cache.put(site="intraday", scraping_time=datetime(2024, 9, 2, 10, minute), kind=REQUESTS_PAGE,
+                  pages=[f"{minute}".encode()])
+        cache.put(site="daily", scraping_time=datetime(2024, 9, 2, 10, minute), kind=REQUESTS_PAGE,
+                  pages=[f"{minute}".encode()])
+    assert cache.entries() == [("daily", DAY), ("intraday", datetime(2024, 9, 2, 10)),
+                               ("intraday", datetime(2024, 9, 2, 10, 15)), ("intraday", datetime(2024, 9, 2, 10, 30))]
+    assert cache.get(site="intraday", data_date=datetime(2024, 9, 2, 10)) == (REQUESTS_PAGE, [b"14"])
+    assert cache.get(site="daily", data_date=DAY) == (REQUESTS_PAGE, [b"40"])
+
+    assert cache.link(site="intraday", scraping_time=datetime(2024, 9, 2, 11, 5))
+    assert cache.get(site="intraday", data_date=datetime(2024, 9, 2, 11)) == (REQUESTS_PAGE, [b"40"])
+    cache.save()
+    assert ResponseCache(directory=str(tmp_path)).entries() == cache.entries()
+
+def test_reparse_rebuilds_every_bucket(tmp_path):
+    site = SiteConfig.from_row(["intraday", "url", "SELENIUM", "", "", "table", "FALSE", "1", "1", ""])
+    data_collector = DataCollector(path=str(tmp_path / "data.h5"), parent_name="test", group_names={"intraday": "url"},
+                                   layout=APPENDED_LAYOUT, granularity=MINUTE_GRANULARITY)
+    cache = ResponseCache(directory=str(tmp_path / "cache"), granularities={"intraday": MINUTE_GRANULARITY})
+    for minute in (0, 15, 30):
+        cache.put(site="intraday", scraping_time=datetime(2024, 9, 2, 10, minute, 20), kind=TABLES,
+                  pages=[tables(value=str(minute))])
+    assert reparse(wp_data={"intraday": site}, data_collector=data_collector, response_cache=cache, max_workers=1) == 3
+    snapshots = list(data_collector.get_range(group_name="intraday", start=DAY, end=DAY))
+    assert [(moment, float(data["f1"][0, 0])) for moment, data in snapshots] == \
+        [(datetime(2024, 9, 2, 10, minute), minute) for minute in (0, 15, 30)]